@@ -23,6 +23,8 @@ from .pixelaccess import *
 from .renderer import *
 from .sprite import *
 from .spritesystem import *
+from .atlas import *
+from .capture import *
 from .surface import *
 from .window import *
 from .mouse import *
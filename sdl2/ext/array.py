@@ -1,4 +1,5 @@
 import ctypes
+import struct
 
 __all__ = ["CTypesView", "to_ctypes", "to_list", "to_tuple", "create_array",
            "MemoryView"]
@@ -242,15 +243,53 @@ class CTypesView(object):
         return self._obj
 
 
+# The memoryview formats for items of a given size
+_ITEM_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+
+def _get_item_memory(source, itemsize, nbytes):
+    """Gets a flat memoryview of a source's items, or None if unsupported."""
+    fmt = _ITEM_FORMATS.get(itemsize)
+    if fmt is None or not hasattr(memoryview, "cast"):
+        return None
+    try:
+        mem = memoryview(source)
+    except TypeError:
+        return None
+    if not mem.c_contiguous:
+        return None
+    mem = mem.cast("B")
+    nbytes = min(nbytes, len(mem))
+    return mem[:nbytes - nbytes % itemsize].cast(fmt)
+
+
 class MemoryView(object):
     """A class that provides read-write access to indexable ``ctypes`` objects.
 
-    .. note::
-       ``MemoryView`` makes heavy use of recursion for multi-dimensional
-       access, making it slow for many use-cases. For better performance, the
-       ``numpy`` library can be used for fast access to many array-like data
-       types, but it may support fewer types of arbitrary objects than the
-       ``MemoryView`` class.
+    Each item of the view is retrieved (or set) as an ``itemsize``-byte slice
+    of the source, e.g. ``view[y][x]`` or ``view[y, x]`` for a 2D view.
+    Accessing an item takes constant time regardless of the number of
+    dimensions.
+
+    For sources that support the buffer protocol (e.g. ``ctypes`` arrays,
+    :obj:`bytearray` or :obj:`array.array` objects) with an item size of 1, 2,
+    4, or 8 bytes, views also support slicing (e.g. ``view[2:4]`` for rows or
+    ``view[2:4, 1:3]`` for a rectangular area), which returns a new view of
+    the same memory, and copying the raw data of multiple items at once from
+    or to bytes-like objects::
+
+        view = MemoryView(buf, 4, (height, width), srcsize=len(buf))
+        view[10:20, 10:20] = bytes(10 * 10 * 4)  # Clear a 10x10 area
+        view[:, 0] = column_data                 # Set the first column
+        data = view[10:20, 10:20].tobytes()
+
+    For other sources, slicing is not supported.
+
+    Single items are always read and written through the source itself, so
+    they keep the type of the source's slices (e.g. a :obj:`bytearray` for
+    a :obj:`bytearray` source). Typed access to the items is only available
+    through :meth:`to_memoryview` (or the buffer protocol on Python 3.12 and
+    newer), e.g. with :func:`numpy.asarray`.
 
     Args:
         source: An arbitrary indexable ``ctypes`` object to access.
@@ -269,20 +308,28 @@ class MemoryView(object):
                  srcsize=None):
         self._source = source
         self._itemsize = itemsize
-        self._strides = strides
+        self._strides = tuple(strides)
         self._srcsize = srcsize or len(source)
-        self._offset = 0
-
-        self._getfunc = getfunc or self._getbytes
-        self._setfunc = setfunc or self._setbytes
 
         tsum = 1
         for v in strides:
             tsum *= v
         if tsum > self._srcsize:
             raise ValueError("strides exceed the accesible source size")
-        #if itemsize > strides[-1]:
-        #    raise ValueError("itemsize exceeds the accessible stride length")
+
+        self._getfunc = getfunc or self._getbytes
+        self._setfunc = setfunc or self._setbytes
+        self._mem = None
+        if getfunc is None and setfunc is None:
+            self._mem = _get_item_memory(source, itemsize, self._srcsize)
+        # The distance (in items) between consecutive items of each dimension
+        steps = []
+        step = 1
+        for v in reversed(self._strides):
+            steps.insert(0, step)
+            step *= v
+        self._steps = tuple(steps)
+        self._offset = 0
 
     def _getbytes(self, start, end):
         """Gets the bytes within the range of start:end."""
@@ -294,75 +341,233 @@ class MemoryView(object):
         """
         self._source[start:end] = value
 
-    def _getindex(self, index):
+    def _getvalue(self, pos):
+        # Gets the item at a given position (in items) within the source
+        start = pos * self._itemsize
+        return self._getfunc(start, start + self._itemsize)
+
+    def _setvalue(self, pos, value):
+        # Sets the item at a given position (in items) within the source
+        start = pos * self._itemsize
+        self._setfunc(start, start + self._itemsize, value)
+
+    def _subview(self, offset, strides, steps):
+        # Creates a view sharing the source and memory of this view
+        view = object.__new__(self.__class__)
+        view.__dict__.update(self.__dict__)
+        view._offset = offset
+        view._strides = strides
+        view._steps = steps
+        return view
+
+    def _getindex(self, index, dim=0):
         # Perform typechecking and preprocessing of view indices
-        if type(index) is slice:
-            raise IndexError("MemoryView slicing is not currently supported.")
-        elif type(index) is not int:
-            e = "Array indices must be integers (got '{0}')."
-            raise TypeError(e.format(str(index)))
-        else:
-            final_idx = index
-            if index < 0:
-                final_idx = len(self) + index  # Handle negative indexing
-            if index >= len(self):
-                e = "Index {0} is out of bounds for a view of length {1}."
-                raise IndexError(e.format(index, len(self)))
+        if type(index) is not int:
+            try:
+                index = index.__index__()
+            except (AttributeError, TypeError):
+                e = "Array indices must be integers (got '{0}')."
+                raise TypeError(e.format(str(index)))
+        length = self._strides[dim]
+        final_idx = index
+        if index < 0:
+            final_idx = length + index  # Handle negative indexing
+        if final_idx >= length or final_idx < 0:
+            e = "Index {0} is out of bounds for a view of length {1}."
+            raise IndexError(e.format(index, length))
         return final_idx
 
+    def _resolve(self, index):
+        # Resolves an index into either the position of a single item, or
+        # the offset, lengths and steps of a sub-view
+        if type(index) is not tuple:
+            index = (index,)
+        if len(index) > self.ndim:
+            e = "Too many indices for a view with {0} dimensions."
+            raise IndexError(e.format(self.ndim))
+        offset = self._offset
+        strides = []
+        steps = []
+        for dim in range(self.ndim):
+            step = self._steps[dim]
+            if dim >= len(index):
+                strides.append(self._strides[dim])
+                steps.append(step)
+                continue
+            idx = index[dim]
+            if type(idx) is slice:
+                if self._mem is None:
+                    e = "Slicing requires a source with buffer support."
+                    raise IndexError(e)
+                start, stop, stride = idx.indices(self._strides[dim])
+                offset += start * step
+                strides.append(len(range(start, stop, stride)))
+                steps.append(step * stride)
+            else:
+                offset += self._getindex(idx, dim) * step
+        if not strides:
+            return offset, None, None
+        return offset, tuple(strides), tuple(steps)
+
     def __len__(self):
         """The length of the MemoryView over the current dimension
         (amount of items for the current dimension).
         """
-        return self.strides[0]
+        return self._strides[0]
 
     def __repr__(self):
-        retval = "["
-        slen = self.strides[0]
-        for dim in range(slen - 1):
-            retval += "%s, " % self[dim]
-        retval += str(self[slen - 1])
-        retval += "]"
-        return retval
+        return repr(self.tolist())
+
+    def __iter__(self):
+        for index in range(self._strides[0]):
+            yield self[index]
 
     def __getitem__(self, index):
         """Returns the item at the specified index."""
-        index = self._getindex(index)
-        if self.ndim == 1:
-            offset = self._offset + index * self.itemsize
-            return self._getfunc(offset, offset + self.itemsize)
-        else:
-            advance = self.itemsize
-            for b in self.strides[1:]:
-                advance *= b
-            offset = self._offset + advance * index
-            view = MemoryView(
-                self._source, self.itemsize, self.strides[1:],
-                self._getfunc, self._setfunc, self._srcsize
+        if type(index) is int and len(self._strides) == 1:
+            # Fast path for the most common type of access
+            return self._getvalue(
+                self._offset + self._getindex(index) * self._steps[0]
             )
-            view._offset = offset
-            return view
+        offset, strides, steps = self._resolve(index)
+        if strides is None:
+            return self._getvalue(offset)
+        return self._subview(offset, strides, steps)
 
     def __setitem__(self, index, value):
         """Sets the item at index to the specified value."""
-        index = self._getindex(index)
-        offset = self._offset + index * self.itemsize
+        offset, strides, steps = self._resolve(index)
+        if strides is None:
+            self._setvalue(offset, value)
+        else:
+            self._subview(offset, strides, steps)._assign(value)
+
+    def _assign(self, value):
+        # Assigns a sequence or bytes-like object to all items of the view
+        if self._mem is not None and not isinstance(value, MemoryView):
+            try:
+                raw = memoryview(value)
+            except TypeError:
+                raw = None
+            if raw is not None:
+                self._assign_raw(raw)
+                return
+        if len(value) != len(self):
+            raise ValueError("value does not match the view strides")
         if self.ndim == 1:
-            self._setfunc(offset, offset + self.itemsize, value)
+            for x in range(len(self)):
+                self[x] = value[x]
         else:
-            advance = self.itemsize
-            for b in self.strides[1:]:
-                advance *= b
-            offset = self._offset + advance * index
-            view = MemoryView(
-                self._source, self.itemsize, self.strides[1:],
-                self._getfunc, self._setfunc, self._srcsize
-            )
-            view._offset = offset
-            if len(value) != len(view):
-                raise ValueError("value does not match the view strides")
-            for x in range(len(view)):
-                view[x] = value[x]
+            for x in range(len(self)):
+                self[x]._assign(value[x])
+
+    def _fill(self, value):
+        # Sets all items of the view to the same unsigned integer value
+        if self._mem is not None:
+            fill = struct.pack(self._mem.format, value) * self._count()
+            self._assign_raw(memoryview(fill))
+        else:
+            for offset in self._row_offsets():
+                for x in range(self._strides[-1]):
+                    self._setvalue(offset + x * self._steps[-1], value)
+
+    def _assign_raw(self, raw):
+        # Copies the items from a bytes-like object into the view
+        if raw.format not in ("B", "b", "c") or raw.ndim != 1:
+            raw = raw.cast("B")
+        if len(raw) != self._count() * self._itemsize:
+            raise ValueError("value does not match the size of the view")
+        raw = raw.cast(self._mem.format)
+        rowitems = self._strides[-1]
+        for n, start in enumerate(self._row_offsets()):
+            src = raw[n * rowitems:(n + 1) * rowitems]
+            self._mem[self._rowslice(start)] = src
+
+    def _count(self):
+        # Gets the total number of items in the view
+        count = 1
+        for v in self._strides:
+            count *= v
+        return count
+
+    def _rowslice(self, start):
+        # Gets the slice of the flat memory for the row starting at start
+        step = self._steps[-1]
+        stop = start + self._strides[-1] * step
+        return slice(start, stop if stop >= 0 else None, step)
+
+    def _row_offsets(self, dim=0, offset=None):
+        # Yields the offsets of all 1-D rows (along the last dimension)
+        if offset is None:
+            offset = self._offset
+        if dim >= len(self._strides) - 1:
+            yield offset
+            return
+        step = self._steps[dim]
+        for i in range(self._strides[dim]):
+            for row in self._row_offsets(dim + 1, offset + i * step):
+                yield row
+
+    def _is_contiguous(self):
+        # Checks whether the items of the view are packed in C order
+        step = 1
+        for length, s in zip(reversed(self._strides), reversed(self._steps)):
+            if length > 1 and s != step:
+                return False
+            step *= length
+        return True
+
+    def tolist(self):
+        """Gets the items of the view as (nested) lists.
+
+        Returns:
+            list: The items of the view.
+
+        """
+        if self.ndim == 1:
+            get = self._getvalue
+            offset, step = self._offset, self._steps[0]
+            return [get(offset + i * step) for i in range(self._strides[0])]
+        return [row.tolist() for row in self]
+
+    def tobytes(self):
+        """Gets the raw data of the items of the view in C order.
+
+        Returns:
+            bytes: The raw data of the view.
+
+        """
+        if self._mem is None:
+            raise TypeError("the view's source does not support the buffer protocol")
+        if self._is_contiguous():
+            start = self._offset
+            return self._mem[start:start + self._count()].tobytes()
+        rows = [self._mem[self._rowslice(o)] for o in self._row_offsets()]
+        return b"".join(row.tobytes() for row in rows)
+
+    def to_memoryview(self):
+        """Gets a :obj:`memoryview` of the items of the view.
+
+        The returned memoryview has the same shape as the view and shares its
+        memory, and can be passed to any function supporting the buffer
+        protocol (e.g. :func:`numpy.asarray`). This is only possible for
+        views of contiguous items, i.e. not for views of sliced columns or
+        views with steps.
+
+        Returns:
+            :obj:`memoryview`: A memoryview of the items of the view.
+
+        """
+        if self._mem is None:
+            raise TypeError("the view's source does not support the buffer protocol")
+        if not self._is_contiguous():
+            raise BufferError("the items of the view are not contiguous")
+        start = self._offset
+        mem = self._mem[start:start + self._count()]
+        return mem.cast("B").cast(self._mem.format, self._strides)
+
+    def __buffer__(self, flags):
+        return self.to_memoryview()
 
     @property
     def size(self):
@@ -382,7 +587,7 @@ class MemoryView(object):
     @property
     def ndim(self):
         """int: The number of dimensions of the MemoryView."""
-        return len(self.strides)
+        return len(self._strides)
 
     @property
     def source(self):
@@ -0,0 +1,476 @@
+"""Texture atlases for packing many small images into a few large textures."""
+from ctypes import byref, addressof, c_ubyte
+
+from .. import surface as surf, render, pixels, blendmode
+from ..rect import SDL_Rect
+from ..stdinc import Uint32
+
+from .err import raise_sdl_err
+from .renderer import Renderer, Texture
+from .sprite import Sprite, TextureSprite
+from .surface import _get_target_surface
+
+__all__ = ["TextureAtlas", "AtlasSprite"]
+
+_PAGE_FORMAT = pixels.SDL_PIXELFORMAT_ARGB8888
+
+
+class _SkylinePacker(object):
+    """A skyline bin packer for placing rectangles within a fixed area.
+
+    The packer tracks the top edge (the 'skyline') of all previously-placed
+    rectangles and places each new rectangle at the lowest position along the
+    skyline where it fits, preferring the narrowest matching segment when
+    there is a tie. This is fast and works well for sprites of similar
+    heights, at the cost of not being able to reuse space below the skyline.
+
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.skyline = [[0, 0, width]]  # [x, y, width] segments
+
+    def _fit(self, index, w, h):
+        # Gets the y position at which a rect would fit at a given segment
+        x = self.skyline[index][0]
+        if x + w > self.width:
+            return None
+        y = 0
+        remaining = w
+        while remaining > 0:
+            if index >= len(self.skyline):
+                return None
+            y = max(y, self.skyline[index][1])
+            if y + h > self.height:
+                return None
+            remaining -= self.skyline[index][2]
+            index += 1
+        return y
+
+    def insert(self, w, h):
+        """Finds a location for a ``w`` by ``h`` rectangle and reserves it.
+
+        Returns the ``(x, y)`` position of the rectangle, or ``None`` if there
+        is not enough space for it.
+
+        """
+        best = None
+        for i, (x, _, seg_w) in enumerate(self.skyline):
+            y = self._fit(i, w, h)
+            if y is not None:
+                score = (y + h, seg_w)
+                if best is None or score < best[0]:
+                    best = (score, i, x, y)
+        if best is None:
+            return None
+        _, i, x, y = best
+        skyline = self.skyline
+        skyline.insert(i, [x, y + h, w])
+        # Shrink or remove the segments covered by the new rectangle
+        j = i + 1
+        while j < len(skyline):
+            prev_end = skyline[j - 1][0] + skyline[j - 1][2]
+            if skyline[j][0] >= prev_end:
+                break
+            overlap = prev_end - skyline[j][0]
+            skyline[j][0] += overlap
+            skyline[j][2] -= overlap
+            if skyline[j][2] > 0:
+                break
+            del skyline[j]
+        # Merge neighbouring segments of the same height
+        j = 0
+        while j < len(skyline) - 1:
+            if skyline[j][1] == skyline[j + 1][1]:
+                skyline[j][2] += skyline[j + 1][2]
+                del skyline[j + 1]
+            else:
+                j += 1
+        return (x, y)
+
+    def grow(self, width, height):
+        """Expands the packing area without moving any placed rectangles."""
+        if width > self.width:
+            self.skyline.append([self.width, 0, width - self.width])
+        self.width = width
+        self.height = height
+
+
+class _AtlasPage(object):
+    """A single texture (and its backing surface) within a TextureAtlas."""
+    def __init__(self, renderer, size):
+        w, h = size
+        self.renderer = renderer
+        self.packer = _SkylinePacker(w, h)
+        self.surface = _new_page_surface(w, h)
+        self.texture = Texture(renderer, self.surface)
+        self.regions = set()
+        self.wasted = 0
+
+    @property
+    def size(self):
+        sf = self.surface.contents
+        return (sf.w, sf.h)
+
+    def upload(self, area=None):
+        # Copies the page surface (or a region of it) to the page texture
+        sf = self.surface.contents
+        x, y, w, h = area if area else (0, 0, sf.w, sf.h)
+        pxaddr = sf.pixels + y * sf.pitch + x * 4
+        pitch = sf.pitch
+        fmt = Uint32()
+        render.SDL_QueryTexture(self.texture.tx, byref(fmt), None, None, None)
+        if fmt.value != _PAGE_FORMAT:
+            # Convert the pixels if the renderer picked a different format
+            pitch = w * 4
+            buf = (c_ubyte * (pitch * h))()
+            ret = surf.SDL_ConvertPixels(
+                w, h, _PAGE_FORMAT, pxaddr, sf.pitch, fmt.value, buf, pitch
+            )
+            if ret < 0:
+                raise_sdl_err("converting the atlas pixels")
+            pxaddr = addressof(buf)
+        r = SDL_Rect(x, y, w, h)
+        ret = render.SDL_UpdateTexture(self.texture.tx, r, pxaddr, pitch)
+        if ret < 0:
+            raise_sdl_err("updating the atlas texture")
+
+    def flush(self):
+        # Submits any deferred draw calls still using the page texture
+        self.renderer._flush_pending()
+
+    def resize(self, renderer, size):
+        # Grows the page surface and texture, keeping the existing contents
+        w, h = size
+        new_sf = _new_page_surface(w, h)
+        _copy_pixels(self.surface, None, new_sf, (0, 0))
+        surf.SDL_FreeSurface(self.surface)
+        self.surface = new_sf
+        self.packer.grow(w, h)
+        self.flush()
+        self.texture.destroy()
+        self.texture = Texture(renderer, self.surface)
+
+    def free(self):
+        if self.texture is not None:
+            self.flush()
+            self.texture.destroy()
+            self.texture = None
+        if self.surface is not None:
+            surf.SDL_FreeSurface(self.surface)
+            self.surface = None
+
+
+def _new_page_surface(w, h):
+    sf = surf.SDL_CreateRGBSurfaceWithFormat(0, w, h, 32, _PAGE_FORMAT)
+    if not sf:
+        raise_sdl_err("creating the atlas surface")
+    surf.SDL_SetSurfaceBlendMode(sf, blendmode.SDL_BLENDMODE_BLEND)
+    return sf
+
+
+def _copy_pixels(src, srcrect, dst, pos):
+    # Copies pixels between surfaces without any blending
+    mode = blendmode.SDL_BlendMode()
+    surf.SDL_GetSurfaceBlendMode(src, byref(mode))
+    surf.SDL_SetSurfaceBlendMode(src, blendmode.SDL_BLENDMODE_NONE)
+    if srcrect is not None:
+        srcrect = SDL_Rect(*srcrect)
+    dstrect = SDL_Rect(pos[0], pos[1], 0, 0)
+    ret = surf.SDL_BlitSurface(src, srcrect, dst, dstrect)
+    surf.SDL_SetSurfaceBlendMode(src, mode)
+    if ret < 0:
+        raise_sdl_err("copying the image to the atlas")
+
+
+class _AtlasRegion(object):
+    """The location of a single image within a TextureAtlas."""
+    def __init__(self, page, x, y, w, h):
+        self.page = page
+        self.rect = SDL_Rect(x, y, w, h)
+
+
+class AtlasSprite(TextureSprite):
+    """A :obj:`~sdl2.ext.TextureSprite` for an image within a texture atlas.
+
+    Atlas sprites are created using :meth:`TextureAtlas.add` or
+    :meth:`TextureAtlas.sprite`, and can be used anywhere a regular
+    :obj:`~sdl2.ext.TextureSprite` can be used (e.g. with
+    :meth:`Renderer.copy` or a :obj:`~sdl2.ext.TextureSpriteRenderSystem`).
+    Since atlas sprites only refer to a region of a larger texture, their
+    :attr:`texture` and :attr:`srcrect` attributes always reflect the current
+    location of the image within the atlas, even if the atlas has been grown
+    or repacked since the sprite was created.
+
+    Atlas sprites never free their textures, which are owned by the atlas.
+
+    """
+    def __init__(self, atlas, key):
+        Sprite.__init__(self)
+        self._atlas = atlas
+        self._key = key
+        self.free = False
+        self.angle = 0.0
+        self.flip = render.SDL_FLIP_NONE
+        self._center = None
+
+    def __del__(self):
+        pass
+
+    def __repr__(self):
+        return "AtlasSprite(key=%r, size=%s)" % (self._key, self.size)
+
+    @property
+    def _region(self):
+        return self._atlas._regions[self._key]
+
+    @property
+    def key(self):
+        """The key of the image within the atlas."""
+        return self._key
+
+    @property
+    def texture(self):
+        """:obj:`~sdl2.SDL_Texture`: The atlas texture containing the image."""
+        return self._region.page.texture.tx
+
+    @property
+    def srcrect(self):
+        """:obj:`~sdl2.SDL_Rect`: The region of the atlas texture containing
+        the image.
+
+        """
+        return self._region.rect
+
+    @property
+    def size(self):
+        """tuple: The size of the image as a ``(width, height)`` tuple."""
+        r = self._region.rect
+        return (r.w, r.h)
+
+    @property
+    def texture_size(self):
+        """tuple: The size of the full atlas texture containing the image."""
+        return self._region.page.size
+
+
+class TextureAtlas(object):
+    """A collection of images packed into a small number of large textures.
+
+    Drawing many sprites that each have their own texture forces the renderer
+    to switch textures between every draw call, which prevents SDL from
+    batching draw calls together. A ``TextureAtlas`` avoids this by packing
+    many images into a few large textures ('pages'), returning
+    :obj:`AtlasSprite` objects that refer to regions of those pages::
+
+       atlas = TextureAtlas(renderer)
+       ship = atlas.add("ship", load_img("ship.png"))
+       bullet = atlas.add("bullet", load_img("bullet.png"))
+       renderer.copy(ship, dstrect=(100, 100))
+
+    Images are placed using a skyline packer. If an image does not fit on any
+    existing page, the last page is grown (doubling its width or height) up
+    to the maximum page size before a new page is created. Since growing a
+    page never moves previously-added images, only the new image needs to be
+    uploaded to the page texture. Space freed by :meth:`remove` is reclaimed
+    the next time the atlas is repacked with :meth:`repack`.
+
+    A CPU-side copy of each page is kept in memory to allow for growing and
+    repacking, so the surfaces passed to :meth:`add` can be freed as soon as
+    they have been added.
+
+    Args:
+        renderer (:obj:`~sdl2.ext.Renderer`): The renderer with which to
+            create the atlas textures.
+        size (tuple, optional): The initial ``(width, height)`` of each atlas
+            page. Defaults to ``(256, 256)``.
+        max_size (tuple, optional): The maximum ``(width, height)`` to which
+            a page can be grown. Defaults to ``(2048, 2048)``, or the maximum
+            texture size supported by the renderer if smaller.
+        padding (int, optional): The number of empty pixels to leave between
+            images, preventing neighbouring images from bleeding into each
+            other when scaled with linear filtering. Defaults to 1.
+
+    """
+    def __init__(self, renderer, size=(256, 256), max_size=(2048, 2048),
+                 padding=1):
+        if not isinstance(renderer, Renderer):
+            raise TypeError("'renderer' must be a valid Renderer object.")
+        self._renderer = renderer
+        info = render.SDL_RendererInfo()
+        ret = render.SDL_GetRendererInfo(renderer.sdlrenderer, byref(info))
+        if ret < 0:
+            raise_sdl_err("retrieving the renderer info")
+        max_w, max_h = max_size
+        if info.max_texture_width > 0:
+            max_w = min(max_w, info.max_texture_width)
+        if info.max_texture_height > 0:
+            max_h = min(max_h, info.max_texture_height)
+        self._size = (min(size[0], max_w), min(size[1], max_h))
+        self._max_size = (max_w, max_h)
+        self._padding = padding
+        self._pages = []
+        self._regions = {}
+
+    def __del__(self):
+        self.destroy()
+
+    def __len__(self):
+        """The number of images in the atlas."""
+        return len(self._regions)
+
+    def __contains__(self, key):
+        return key in self._regions
+
+    @property
+    def pages(self):
+        """list: The :obj:`~sdl2.ext.Texture` objects for each atlas page."""
+        return [page.texture for page in self._pages]
+
+    def _place(self, w, h):
+        # Finds a page and location for an image, growing the atlas if needed
+        pw, ph = (w + self._padding, h + self._padding)
+        for page in self._pages:
+            pos = page.packer.insert(pw, ph)
+            if pos is not None:
+                return page, pos, False
+        # If it doesn't fit, try growing the most recent page
+        if len(self._pages):
+            page = self._pages[-1]
+            w_cur, h_cur = page.size
+            max_w, max_h = self._max_size
+            skyline = [list(seg) for seg in page.packer.skyline]
+            while w_cur < max_w or h_cur < max_h:
+                if (h_cur < w_cur or w_cur >= max_w) and h_cur < max_h:
+                    h_cur = min(h_cur * 2, max_h)
+                else:
+                    w_cur = min(w_cur * 2, max_w)
+                page.packer.grow(w_cur, h_cur)
+                pos = page.packer.insert(pw, ph)
+                if pos is not None:
+                    page.resize(self._renderer, (w_cur, h_cur))
+                    return page, pos, True
+            # If the image doesn't fit even at the max size, undo the growth
+            page.packer.skyline = skyline
+            page.packer.width, page.packer.height = page.size
+        # Otherwise, create a new page for the image
+        if pw > self._max_size[0] or ph > self._max_size[1]:
+            e = "Image size ({0}, {1}) exceeds the maximum atlas page size {2}."
+            raise ValueError(e.format(w, h, self._max_size))
+        page_w = max(self._size[0], min(pw, self._max_size[0]))
+        page_h = max(self._size[1], min(ph, self._max_size[1]))
+        page = _AtlasPage(self._renderer, (page_w, page_h))
+        self._pages.append(page)
+        return page, page.packer.insert(pw, ph), True
+
+    def add(self, key, image):
+        """Adds an image to the atlas.
+
+        If an image with the same key already exists within the atlas, it
+        will be replaced.
+
+        Args:
+            key: A unique hashable key (e.g. a file name) for the image.
+            image (:obj:`~sdl2.SDL_Surface`): The surface containing the
+                image to add to the atlas.
+
+        Returns:
+            :obj:`AtlasSprite`: A sprite for the newly-added image.
+
+        """
+        sf = _get_target_surface(image, "image")
+        if key in self._regions:
+            self.remove(key)
+        page, (x, y), full_upload = self._place(sf.w, sf.h)
+        _copy_pixels(sf, None, page.surface, (x, y))
+        if full_upload:
+            page.upload()
+        else:
+            page.upload((x, y, sf.w, sf.h))
+        region = _AtlasRegion(page, x, y, sf.w, sf.h)
+        page.regions.add(key)
+        self._regions[key] = region
+        return AtlasSprite(self, key)
+
+    def sprite(self, key):
+        """Creates a new sprite for an image in the atlas.
+
+        Args:
+            key: The key of the image within the atlas.
+
+        Returns:
+            :obj:`AtlasSprite`: A sprite for the requested image.
+
+        """
+        if key not in self._regions:
+            raise KeyError("No image with the key '{0}' in the atlas.".format(key))
+        return AtlasSprite(self, key)
+
+    def remove(self, key):
+        """Removes an image from the atlas.
+
+        Any existing sprites for the removed image can no longer be used.
+        The space used by the image will not be reused until the atlas is
+        repacked with :meth:`repack`.
+
+        Args:
+            key: The key of the image to remove.
+
+        """
+        region = self._regions.pop(key)
+        region.page.regions.discard(key)
+        r = region.rect
+        region.page.wasted += (r.w + self._padding) * (r.h + self._padding)
+
+    def repack(self):
+        """Repacks any atlas pages with space left over from removed images.
+
+        Pages are repacked one at a time, placing their remaining images
+        (tallest first) onto a fresh page of the same size, so pages without
+        any removed images are left untouched. Empty pages are freed. All
+        existing sprites remain valid after repacking.
+
+        """
+        for page in list(self._pages):
+            if page.wasted == 0:
+                continue
+            if len(page.regions) == 0:
+                self._pages.remove(page)
+                page.free()
+                continue
+            keys = sorted(
+                page.regions, key=lambda k: -self._regions[k].rect.h
+            )
+            new = _AtlasPage(self._renderer, page.size)
+            placed = []
+            for key in keys:
+                r = self._regions[key].rect
+                pos = new.packer.insert(r.w + self._padding, r.h + self._padding)
+                if pos is None:
+                    break
+                placed.append((key, pos))
+            if len(placed) < len(keys):
+                new.free()  # Page can't be packed any better, leave as-is
+                continue
+            for key, (x, y) in placed:
+                region = self._regions[key]
+                r = region.rect
+                _copy_pixels(page.surface, (r.x, r.y, r.w, r.h), new.surface, (x, y))
+                region.page = new
+                region.rect = SDL_Rect(x, y, r.w, r.h)
+                new.regions.add(key)
+            new.upload()
+            self._pages[self._pages.index(page)] = new
+            page.free()
+
+    def destroy(self):
+        """Frees all atlas textures and surfaces.
+
+        After being destroyed, the atlas and any sprites created from it can
+        no longer be used.
+
+        """
+        for page in getattr(self, "_pages", []):
+            page.free()
+        self._pages = []
+        self._regions = {}
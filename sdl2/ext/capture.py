@@ -0,0 +1,262 @@
+"""Capturing rendered frames for background processing."""
+import time
+import threading
+from collections import deque
+from ctypes import addressof, c_ubyte
+
+from .. import surface, pixels, timer
+
+from .err import raise_sdl_err
+from .renderer import (Renderer, _get_pixel_format, _pixel_view,
+    _sanitize_rects)
+
+__all__ = ["CaptureRing", "CapturedFrame"]
+
+
+class CapturedFrame(object):
+    """A frame captured from a renderer by a :obj:`CaptureRing`.
+
+    Captured frames refer to one of the ring's preallocated buffers, and
+    should be released with :meth:`release` once they are no longer needed
+    so that the buffer can be reused for new frames. Frames can also be used
+    as context managers, in which case they are released automatically at
+    the end of the ``with`` block.
+
+    Attributes:
+        pixels: A view of the frame's pixel data (a :obj:`numpy.ndarray` if
+            Numpy is available, otherwise a :obj:`memoryview`).
+        size (tuple): The width and height (in pixels) of the frame.
+        pitch (int): The number of bytes per row of pixels.
+        format (int): The SDL pixel format constant for the frame.
+        number (int): The number of the frame, counting up from 0 for the
+            first frame captured by the ring.
+        ticks (int): The value of :func:`~sdl2.SDL_GetTicks` at the time the
+            frame was captured.
+
+    """
+    def __init__(self, ring, buf, size, pitch, fmt):
+        self._ring = ring
+        self._buf = buf
+        self.pixels = _pixel_view(
+            addressof(buf), size, pitch, pixels.SDL_BYTESPERPIXEL(fmt), buf
+        )
+        self.size = size
+        self.pitch = pitch
+        self.format = fmt
+        self.number = -1
+        self.ticks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def __repr__(self):
+        return "CapturedFrame(number={0}, size={1})".format(
+            self.number, self.size
+        )
+
+    def to_surface(self):
+        """Creates an SDL surface that shares the frame's pixel data.
+
+        This is useful for encoding or saving the frame with SDL functions
+        (e.g. :func:`~sdl2.sdlimage.IMG_SavePNG_RW`). The returned surface
+        must be freed with :func:`~sdl2.SDL_FreeSurface` before the frame is
+        released, and must not be used afterwards.
+
+        Returns:
+            :obj:`~sdl2.SDL_Surface`: A pointer to a surface containing the
+            frame's pixel data.
+
+        """
+        w, h = self.size
+        bpp = pixels.SDL_BITSPERPIXEL(self.format)
+        sf = surface.SDL_CreateRGBSurfaceWithFormatFrom(
+            addressof(self._buf), w, h, bpp, self.pitch, self.format
+        )
+        if not sf:
+            raise_sdl_err("creating a surface for the captured frame")
+        return sf
+
+    def release(self):
+        """Returns the frame's buffer to its ring for reuse.
+
+        After being released, the frame's pixels may be overwritten at any
+        time and should no longer be used.
+
+        """
+        self._ring._release(self)
+
+
+class CaptureRing(object):
+    """A fixed set of reusable buffers for capturing frames from a renderer.
+
+    Encoding or saving rendered frames (e.g. for recording video or
+    generating thumbnails) is often too slow to do on the render thread
+    without dropping frames. A ``CaptureRing`` allows the render thread to
+    quickly copy each frame into one of a fixed number of preallocated
+    'slots' with :meth:`capture`, while one or more background threads
+    retrieve captured frames with :meth:`get` in the order they were
+    captured and process them at their own pace::
+
+       def encode_frames(ring):
+           while True:
+               frame = ring.get()
+               if frame is None:
+                   break  # the ring has been closed
+               with frame:
+                   sf = frame.to_surface()
+                   path = "frame_{0:05d}.png".format(frame.number)
+                   sdl2.sdlimage.IMG_SavePNG(sf, path.encode("utf-8"))
+                   sdl2.SDL_FreeSurface(sf)
+
+       ring = CaptureRing(renderer, slots=4)
+       encoder = threading.Thread(target=encode_frames, args=(ring,))
+       encoder.start()
+       while running:
+           draw_scene(renderer)
+           ring.capture()
+           renderer.present()
+       ring.close()
+       encoder.join()
+
+    No memory is allocated for new frames after the ring is created. If the
+    background threads fall behind and all slots are in use, new frames are
+    dropped (and counted in :attr:`dropped`) instead of blocking the render
+    thread.
+
+    Since SDL renderers are not thread-safe, :meth:`capture` must only be
+    called from the thread that renders the frames.
+
+    Args:
+        renderer (:obj:`~sdl2.ext.Renderer`): The renderer from which to
+            capture frames.
+        slots (int, optional): The number of frame buffers in the ring.
+            Defaults to 3.
+        rect (tuple, optional): The ``(x, y, w, h)`` area (in pixels) of the
+            rendering target to capture. Defaults to capturing the full size
+            of the target at the time the ring is created.
+        fmt (str or int, optional): The name (e.g. ``"ARGB8888"``) or SDL
+            constant of the pixel format in which to capture frames. Defaults
+            to ``"ARGB8888"``.
+
+    """
+    def __init__(self, renderer, slots=3, rect=None, fmt="ARGB8888"):
+        if not isinstance(renderer, Renderer):
+            raise TypeError("'renderer' must be a valid Renderer object.")
+        if int(slots) != slots or slots < 1:
+            raise ValueError("The number of slots must be a positive integer.")
+        self._renderer = renderer
+        self._format = _get_pixel_format(fmt)
+        if rect is None:
+            w, h = renderer._get_target_size()
+            rect = (0, 0, w, h)
+        self._rect = tuple(int(v) for v in _sanitize_rects([rect])[0])
+        w, h = self._rect[2:]
+        pitch = w * pixels.SDL_BYTESPERPIXEL(self._format)
+        self._frames = [
+            CapturedFrame(self, (c_ubyte * (pitch * h))(), (w, h), pitch,
+                          self._format)
+            for i in range(int(slots))
+        ]
+        self._free = deque(self._frames)
+        self._ready = deque()
+        self._cond = threading.Condition()
+        self._count = 0
+        self._closed = False
+        self.dropped = 0
+
+    def __len__(self):
+        """The number of captured frames waiting to be retrieved."""
+        with self._cond:
+            return len(self._ready)
+
+    @property
+    def size(self):
+        """tuple: The width and height (in pixels) of captured frames."""
+        return self._rect[2:]
+
+    @property
+    def closed(self):
+        """bool: Whether the ring has been closed."""
+        return self._closed
+
+    def capture(self):
+        """Captures the current contents of the renderer into a free slot.
+
+        This should be called after drawing a frame but before presenting it,
+        since the contents of the rendering target are undefined after
+        :meth:`~sdl2.ext.Renderer.present`.
+
+        Returns:
+            bool: True if the frame was captured, or False if it was dropped
+            because no free slots were available.
+
+        """
+        if self._closed:
+            raise RuntimeError("Cannot capture frames with a closed ring.")
+        with self._cond:
+            if not len(self._free):
+                self.dropped += 1
+                return False
+            frame = self._free.popleft()
+        try:
+            self._renderer.read_pixels(self._rect, self._format, frame.pixels)
+        except Exception:
+            with self._cond:
+                self._free.appendleft(frame)
+            raise
+        frame.number = self._count
+        frame.ticks = timer.SDL_GetTicks()
+        self._count += 1
+        with self._cond:
+            self._ready.append(frame)
+            self._cond.notify()
+        return True
+
+    def get(self, timeout=None):
+        """Retrieves the oldest captured frame that hasn't been retrieved yet.
+
+        If no captured frames are waiting, this will block until a new frame
+        is captured, the ring is closed, or the timeout expires. Retrieved
+        frames must be released with :meth:`CapturedFrame.release` once they
+        are no longer needed.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait
+                for a new frame. Defaults to waiting indefinitely.
+
+        Returns:
+            :obj:`CapturedFrame`: The oldest captured frame, or ``None`` if
+            the timeout expired or the ring was closed with no frames waiting.
+
+        """
+        if timeout is not None:
+            end = time.time() + timeout
+        with self._cond:
+            while not len(self._ready) and not self._closed:
+                remaining = None if timeout is None else end - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not len(self._ready):
+                return None
+            return self._ready.popleft()
+
+    def _release(self, frame):
+        with self._cond:
+            if frame not in self._free and frame not in self._ready:
+                self._free.append(frame)
+
+    def close(self):
+        """Closes the ring, waking up any threads waiting for new frames.
+
+        Frames that have already been captured can still be retrieved with
+        :meth:`get` after the ring has been closed, but no new frames can be
+        captured.
+
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -9,12 +9,44 @@ are separately stored. For each individual component type a processing
 system will take care of all necessary updates for the World
 environment.
 """
-import uuid
+import math
+import time
+import zlib
+import pickle
+import struct
 import inspect
+import warnings
+import threading
+from io import BytesIO
+from collections import deque, OrderedDict
 
 from .compat import *
+from ..timer import SDL_GetPerformanceCounter, SDL_GetPerformanceFrequency
 
-__all__ = ["Entity", "World", "System", "Applicator"]
+try:
+    import numpy
+    _HASNUMPY = True
+except ImportError:
+    _HASNUMPY = False
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+__all__ = ["Entity", "World", "System", "Applicator", "ArrayComponent",
+           "ArraySystem", "SystemScheduler", "CommandBuffer", "Query",
+           "TrackedComponent", "SystemProfiler"]
+
+_clock = getattr(time, "perf_counter", time.time)
+
+# The kinds of commands recorded by a CommandBuffer
+_CMD_ADD, _CMD_REMOVE, _CMD_DELETE = 1, 2, 3
+
+# Entity ids store the index of the entity's slot in the lower bits, and the
+# generation of the slot (i.e. how often it has been reused) in the upper ones
+_INDEX_BITS = 32
+_INDEX_MASK = (1 << _INDEX_BITS) - 1
 
 
 class Entity(object):
@@ -34,17 +66,15 @@ class Entity(object):
         if not isinstance(world, World):
             raise TypeError("world must be a World")
         entity = object.__new__(cls)
-        entity._id = uuid.uuid4()
-        entity._world = world
+        object.__setattr__(entity, "_id", world._create_id(entity))
+        object.__setattr__(entity, "_world", world)
         world.entities.add(entity)
+        world._entityclasses.add(cls)
         return entity
 
     def __repr__(self):
         return "Entity(id=%s)" % self._id
 
-    def __hash__(self):
-        return hash(self._id)
-
     def __getattr__(self, name):
         """Gets the component data related to the Entity."""
         if name in ("_id", "_world"):
@@ -61,20 +91,7 @@ class Entity(object):
         if name in ("_id", "_world"):
             object.__setattr__(self, name, value)
         else:
-            # If the value is a compound component (e.g. a Button
-            # inheriting from a Sprite), it needs to be added to all
-            # supported component type instances.
-            mro = inspect.getmro(value.__class__)
-            if type in mro:
-                stop = mro.index(type)
-            else:
-                stop = mro.index(object)
-            mro = mro[0:stop]
-            wctypes = self._world.componenttypes
-            for clstype in mro:
-                if clstype not in wctypes:
-                    self._world.add_componenttype(clstype)
-                self._world.components[clstype][self] = value
+            self._world._set_component(self, value)
 
     def __delattr__(self, name):
         """Deletes the component data related to the Entity."""
@@ -85,7 +102,7 @@ class Entity(object):
         except KeyError:
             raise AttributeError("object '%s' has no attribute '%s'" % \
                 (self.__class__.__name__, name))
-        del self._world.components[ctype][self]
+        self._world._remove_component(self, ctype)
 
     def delete(self):
         """Removes the Entity from the world it belongs to."""
@@ -93,7 +110,13 @@ class Entity(object):
 
     @property
     def id(self):
-        """The id of the Entity."""
+        """The id of the Entity.
+
+        Entity ids are compact integers that are unique within their World.
+        Once an entity has been deleted, its id may be reused for a new
+        entity, but with a different generation (stored in the upper bits of
+        the id), so that the new id never equals the id of a deleted entity.
+        """
         return self._id
 
     @property
@@ -102,6 +125,657 @@ class Entity(object):
         return self._world
 
 
+class _Field(object):
+    """Provides access to a field of an ArrayComponent.
+
+    While the component is bound to an entity, the field's value is read
+    from and written to the column of the component type's array store.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        store = obj._store
+        if store is None:
+            return obj._values[self.name]
+        return store.columns[self.name][store.rows[obj._entity]]
+
+    def __set__(self, obj, value):
+        store = obj._store
+        if store is None:
+            obj._values[self.name] = value
+        else:
+            store.columns[self.name][store.rows[obj._entity]] = value
+            if store.world is not None:
+                store.world._mark_changed(obj._entity, (store.ctype,))
+
+
+class ArrayComponent(object):
+    """A component type whose data is stored in Numpy arrays.
+
+    Array components are declared as typed records, with a ``_fields_``
+    list of field names and Numpy dtypes (optionally followed by a
+    shape for array fields), similar to a :class:`ctypes.Structure`::
+
+        class Position(ArrayComponent):
+            _fields_ = [("x", "f8"), ("y", "f8")]
+
+        class Velocity(ArrayComponent):
+            _fields_ = [("vx", "f8"), ("vy", "f8")]
+
+    Instances can be created with positional or keyword field values
+    (e.g. ``Position(10, y=20)``), with omitted fields defaulting to 0.
+    Once a component is assigned to an entity, its World stores its
+    values in growable, column-oriented Numpy arrays (one per field)
+    shared by all components of that type, and the component object
+    becomes a view of its entity's row in those arrays. Assigning a
+    component that is already bound to another entity copies its values.
+
+    The arrays of array components can be processed in bulk by an
+    :class:`ArraySystem`.
+    """
+    _fields_ = []
+
+    def __new__(cls, *args, **kwargs):
+        if "_fieldnames" not in cls.__dict__:
+            cls._fieldnames = tuple(f[0] for f in cls._fields_)
+            for name in cls._fieldnames:
+                setattr(cls, name, _Field(name))
+        component = object.__new__(cls)
+        component._store = None
+        component._entity = None
+        component._values = dict((name, 0) for name in cls._fieldnames)
+        return component
+
+    def __init__(self, *args, **kwargs):
+        names = self._fieldnames
+        if len(args) > len(names):
+            e = "{0} takes at most {1} field values ({2} given)"
+            raise TypeError(
+                e.format(self.__class__.__name__, len(names), len(args))
+            )
+        for name, value in zip(names, args):
+            setattr(self, name, value)
+        for name, value in kwargs.items():
+            if name not in names:
+                e = "{0} has no field '{1}'"
+                raise TypeError(e.format(self.__class__.__name__, name))
+            setattr(self, name, value)
+
+    def __repr__(self):
+        values = []
+        for name in self._fieldnames:
+            value = getattr(self, name)
+            if hasattr(value, "tolist"):
+                value = value.tolist()
+            values.append("{0}={1!r}".format(name, value))
+        return "{0}({1})".format(self.__class__.__name__, ", ".join(values))
+
+
+class TrackedComponent(object):
+    """A component base class that reports changes to its attributes.
+
+    Assigning a component to an entity marks it as changed for any World
+    tracking changes of its type (see :meth:`World.track_changes`).
+    Components inheriting from TrackedComponent are additionally marked as
+    changed whenever one of their attributes is set::
+
+        class Health(TrackedComponent):
+            def __init__(self, hp):
+                self.hp = hp
+
+        world.track_changes(Health)
+        entity.health = Health(100)
+        entity.health.hp -= 10  # marks the component as changed
+
+    Note that in-place modifications of mutable attribute values (e.g.
+    appending to a list) can't be detected and don't mark the component.
+    """
+    def __new__(cls, *args, **kwargs):
+        component = object.__new__(cls)
+        object.__setattr__(component, "_ebs_owners", set())
+        return component
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        for world, entity in self._ebs_owners:
+            if world._changes:
+                ctypes = world._resolve_componenttypes(self.__class__)
+                world._mark_changed(entity, ctypes)
+
+    def __getstate__(self):
+        # Copies and pickles of a component don't belong to any entities
+        state = self.__dict__.copy()
+        del state["_ebs_owners"]
+        return state
+
+    def __setstate__(self, state):
+        object.__setattr__(self, "_ebs_owners", set())
+        self.__dict__.update(state)
+
+
+class _ArrayStore(object):
+    """Column-oriented Numpy storage for all components of an array type.
+
+    Each field of the component type has its own array, in which the value
+    for the entity at the same row is stored. Rows are kept densely packed
+    by moving the last row into the place of a removed one, and the arrays
+    are reallocated with twice their capacity whenever they run full.
+    """
+    def __init__(self, ctype, capacity=64):
+        if not _HASNUMPY:
+            e = "Array components require Numpy, which could not be found."
+            raise UnsupportedError(e)
+        if not len(ctype._fields_):
+            e = "Array component type '{0}' has no fields."
+            raise ValueError(e.format(ctype.__name__))
+        self.ctype = ctype
+        self.fields = []
+        for field in ctype._fields_:
+            shape = tuple(field[2]) if len(field) > 2 else ()
+            self.fields.append((field[0], numpy.dtype(field[1]), shape))
+        self.columns = dict(
+            (name, numpy.zeros((capacity,) + shape, dtype))
+            for name, dtype, shape in self.fields
+        )
+        self.entities = []
+        self.rows = {}
+        self.version = 0
+        self.world = None  # Set if changes of the type are tracked
+
+    def __len__(self):
+        return len(self.entities)
+
+    def _grow(self):
+        """Doubles the capacity of the field arrays."""
+        for name, dtype, shape in self.fields:
+            old = self.columns[name]
+            new = numpy.zeros((len(old) * 2,) + shape, dtype)
+            new[:len(old)] = old
+            self.columns[name] = new
+
+    def get(self, entity):
+        """Gets the field values of an entity as a dict."""
+        row = self.rows[entity]
+        return dict(
+            (name, column[row].tolist())
+            for name, column in self.columns.items()
+        )
+
+    def set(self, entity, values):
+        """Sets the field values of an entity from a dict."""
+        row = self.rows[entity]
+        for name, column in self.columns.items():
+            column[row] = values[name]
+
+    def append(self, entity, values):
+        """Adds the field values for a new entity to the store."""
+        row = len(self.entities)
+        if row == len(self.columns[self.fields[0][0]]):
+            self._grow()
+        self.rows[entity] = row
+        self.entities.append(entity)
+        self.set(entity, values)
+        self.version += 1
+
+    def remove(self, entity):
+        """Removes an entity from the store, returning its field values."""
+        values = self.get(entity)
+        row = self.rows.pop(entity)
+        last = len(self.entities) - 1
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            moved = self.entities[last]
+            self.entities[row] = moved
+            self.rows[moved] = row
+        self.entities.pop()
+        self.version += 1
+        return values
+
+
+class _ArrayView(object):
+    """The field arrays of an array component type passed to an ArraySystem.
+
+    Each field of the component type is available as an attribute holding a
+    1-dimensional (or, for array fields, multi-dimensional) Numpy array with
+    one row per processed entity. Fields can be modified in place or
+    replaced with new arrays of the same length.
+    """
+    def __init__(self, store, rows=None):
+        self._store = store
+        self._rows = rows
+        size = len(store) if rows is None else len(rows)
+        self._size = size
+        self._arrays = {}
+        self._columns = dict(store.columns)
+        for name, column in store.columns.items():
+            if rows is None:
+                array = column[:size]
+            else:
+                array = column[rows]
+            self._arrays[name] = array
+            setattr(self, name, array)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def entities(self):
+        """list: The entities of the rows of the field arrays."""
+        entities = self._store.entities
+        if self._rows is None:
+            return list(entities)
+        return [entities[row] for row in self._rows]
+
+    def _commit(self):
+        """Writes modified or replaced field arrays back to the store."""
+        for name, column in self._store.columns.items():
+            array = getattr(self, name)
+            if self._rows is not None:
+                column[self._rows] = array
+            elif array is not self._arrays[name]:
+                column[:self._size] = array
+            elif column is not self._columns[name]:
+                # The store has grown while the arrays were being processed
+                column[:self._size] = array
+
+
+class _Archetype(object):
+    """A table of all entities that share the same set of component types.
+
+    Each component type of the archetype has its own column, in which the
+    component of the entity at the same row is stored. Rows are kept densely
+    packed by moving the last row into the place of a removed one.
+    """
+    def __init__(self, types):
+        self.types = types
+        self.entities = []
+        self.rows = {}
+        self.columns = dict((ctype, []) for ctype in types)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def append(self, entity, values):
+        """Adds an entity and its components (by type) to the table."""
+        self.rows[entity] = len(self.entities)
+        self.entities.append(entity)
+        for ctype, column in self.columns.items():
+            column.append(values[ctype])
+
+    def remove(self, entity):
+        """Removes an entity from the table, returning its components."""
+        row = self.rows.pop(entity)
+        values = {}
+        for ctype, column in self.columns.items():
+            values[ctype] = column[row]
+            column[row] = column[-1]
+            column.pop()
+        entities = self.entities
+        last = entities.pop()
+        if last is not entity:
+            entities[row] = last
+            self.rows[last] = row
+        return values
+
+
+class CommandBuffer(object):
+    """A queue of deferred changes to the entities of a World.
+
+    Creating or deleting entities and adding or removing components while
+    the components of a World are being processed can break the iteration
+    over them. Instead, systems can record these changes in a command
+    buffer, which applies them all at once (in the order they were
+    recorded) at a safe point::
+
+        class LifetimeSystem(ArraySystem):
+            ...
+            def process(self, world, arrays):
+                lifetime = arrays[0]
+                lifetime.frames -= 1
+                entities = lifetime.entities
+                for row in numpy.nonzero(lifetime.frames <= 0)[0]:
+                    world.commands.delete(entities[row])
+
+    Every World has its own command buffer (see :attr:`World.commands`),
+    which is applied at the end of :meth:`World.process` and after every
+    system that has an 'apply_commands' attribute that evaluates to True.
+
+    Args:
+        world (:obj:`World`): The world to which the commands apply.
+
+    """
+    def __init__(self, world):
+        if not isinstance(world, World):
+            raise TypeError("world must be a World")
+        self._world = world
+        self._commands = []
+
+    def __len__(self):
+        """The number of commands waiting to be applied."""
+        return len(self._commands)
+
+    def create(self, *components):
+        """Creates a new entity, deferring the addition of its components.
+
+        The new entity is part of the world right away, but won't have any
+        components (and thus won't be processed by any system) until the
+        buffer is applied.
+
+        Args:
+            *components: The components to add to the new entity.
+
+        Returns:
+            :obj:`Entity`: The new entity.
+
+        """
+        entity = Entity(self._world)
+        for component in components:
+            self._commands.append((_CMD_ADD, entity, component))
+        return entity
+
+    def add_component(self, entity, component):
+        """Queues adding a component to an entity.
+
+        This is the deferred equivalent of ``entity.componentname = component``.
+        If the entity has been deleted by the time the buffer is applied, the
+        command is ignored.
+
+        """
+        self._commands.append((_CMD_ADD, entity, component))
+
+    def remove_component(self, entity, componenttype):
+        """Queues removing the component of a given type from an entity.
+
+        This is the deferred equivalent of ``del entity.componentname``. If
+        the entity doesn't have a component of the given type by the time the
+        buffer is applied, the command is ignored.
+
+        """
+        self._commands.append((_CMD_REMOVE, entity, componenttype))
+
+    def delete(self, entity):
+        """Queues deleting an entity from the world."""
+        self._commands.append((_CMD_DELETE, entity, None))
+
+    def delete_entities(self, entities):
+        """Queues deleting multiple entities from the world."""
+        self._commands.extend((_CMD_DELETE, e, None) for e in entities)
+
+    def clear(self):
+        """Discards all commands waiting to be applied."""
+        self._commands = []
+
+    def apply(self):
+        """Applies all queued commands to the world, in the recorded order."""
+        world = self._world
+        alive = world.entities
+        while self._commands:
+            # Commands recorded while applying are applied in the next round
+            commands, self._commands = self._commands, []
+            for cmd, entity, arg in commands:
+                if entity not in alive:
+                    continue
+                if cmd == _CMD_ADD:
+                    world._set_component(entity, arg)
+                elif cmd == _CMD_REMOVE:
+                    if arg in world._entity_types.get(entity, ()):
+                        world._remove_component(entity, arg)
+                else:
+                    world.delete(entity)
+
+
+class Query(object):
+    """A persistent query for the entities with a given set of components.
+
+    Queries are created with :meth:`World.query` and are kept up to date by
+    the World whenever components are added or removed, so that iterating
+    over their entities or components doesn't require any scanning. In
+    addition, a query keeps track of the entities that started or stopped
+    matching it, which allows systems to react to spawned and despawned
+    entities without comparing the full set of entities every frame::
+
+        class SpriteLoader(System):
+            ...
+            def process(self, world, components):
+                query = world.query(Position, SpriteInfo)
+                for entity in query.added:
+                    self.load_sprite(entity)
+                for entity in query.removed:
+                    self.unload_sprite(entity)
+
+    The :attr:`added` and :attr:`removed` sets contain the changes made
+    during the previous frame, i.e. between the start of the previous and
+    the current call to :meth:`World.process`. The entities that matched
+    the query when it was created are reported as added right away.
+
+    Args:
+        world (:obj:`World`): The world whose entities should be queried.
+        componenttypes (tuple): The component types an entity must have to
+            match the query.
+
+    """
+    def __init__(self, world, componenttypes):
+        if not isinstance(world, World):
+            raise TypeError("world must be a World")
+        self._world = world
+        self._componenttypes = tuple(componenttypes)
+        self._types = frozenset(self._componenttypes)
+        self._entities = {}
+        self._pending_added = set()
+        self._pending_removed = set()
+        self.added = frozenset()
+        self.removed = frozenset()
+        types = self._componenttypes
+        comps = world.components
+        smallest = min(types, key=lambda ctype: len(comps[ctype]))
+        for entity in comps[smallest]:
+            if all(entity in comps[ctype] for ctype in types):
+                self._add(entity)
+        self._next_frame()
+
+    def __len__(self):
+        """The number of entities matching the query."""
+        return len(self._entities)
+
+    def __iter__(self):
+        """Iterates over the entities matching the query."""
+        return iter(list(self._entities))
+
+    def __contains__(self, entity):
+        return entity in self._entities
+
+    @property
+    def componenttypes(self):
+        """The component types an entity must have to match the query."""
+        return self._componenttypes
+
+    def components(self):
+        """Iterates over the components of the entities matching the query.
+
+        Like :meth:`World.combined_components`, this yields a tuple of
+        components per entity, in the order of the query's component types.
+        """
+        comps = self._world.components
+        valsets = [comps[ctype] for ctype in self._componenttypes]
+        for entity in list(self._entities):
+            yield tuple(component[entity] for component in valsets)
+
+    def _add(self, entity):
+        self._entities[entity] = None
+        if entity in self._pending_removed:
+            self._pending_removed.discard(entity)
+        else:
+            self._pending_added.add(entity)
+
+    def _remove(self, entity):
+        del self._entities[entity]
+        if entity in self._pending_added:
+            self._pending_added.discard(entity)
+        else:
+            self._pending_removed.add(entity)
+
+    def _next_frame(self):
+        self.added = frozenset(self._pending_added)
+        self.removed = frozenset(self._pending_removed)
+        self._pending_added = set()
+        self._pending_removed = set()
+
+
+# The layout of World snapshots: a header, followed by a sequence of blocks
+# that each hold a key, the kind of data it contains and the data itself
+_SNAPSHOT_MAGIC = b"EBSS"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sBBI")
+_SNAPSHOT_DELTA, _SNAPSHOT_ZLIB = 1, 2
+
+# Block kinds for columns of plain values, by their struct format codes
+_STRUCT_KINDS = {b"b": "?", b"q": "q", b"d": "d", b"Q": "Q"}
+_KIND_PICKLE, _KIND_NUMPY, _KIND_NAMES = b"p", b"n", b"s"
+_KIND_REMOVED = b"-"  # A block of the base that a delta snapshot drops
+_INT_TYPES = set([int, long])
+_INT64_RANGE = (-(1 << 63), (1 << 63) - 1)
+
+# The globals besides the World's own classes that pickled snapshot values
+# may refer to, by module and name
+_SNAPSHOT_GLOBALS = set([
+    ("builtins", "set"), ("builtins", "frozenset"), ("builtins", "complex"),
+    ("builtins", "bytearray"), ("__builtin__", "set"),
+    ("__builtin__", "frozenset"), ("__builtin__", "complex"),
+    ("__builtin__", "bytearray"), ("_codecs", "encode"),
+    ("collections", "OrderedDict"), ("collections", "deque"),
+    ("numpy", "ndarray"), ("numpy", "dtype"),
+    ("numpy.core.multiarray", "_reconstruct"),
+    ("numpy.core.multiarray", "scalar"),
+    ("numpy._core.multiarray", "_reconstruct"),
+    ("numpy._core.multiarray", "scalar"),
+])
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """An unpickler that only creates instances of known classes."""
+    def __init__(self, data, classes):
+        pickle.Unpickler.__init__(self, BytesIO(data))
+        self._classes = classes
+
+    def find_class(self, module, name):
+        cls = self._classes.get("{0}:{1}".format(module, name))
+        if cls is not None:
+            return cls
+        if (module, name) not in _SNAPSHOT_GLOBALS:
+            e = "The snapshot refers to the unknown class '{0}.{1}'"
+            raise ValueError(e.format(module, name))
+        return pickle.Unpickler.find_class(self, module, name)
+
+
+def _pack_values(kind, values):
+    """Packs a sequence of numbers into little-endian bytes."""
+    code = _STRUCT_KINDS[kind]
+    return struct.pack("<{0}{1}".format(len(values), code), *values)
+
+
+def _unpack_values(kind, data):
+    """Unpacks a sequence of numbers packed with _pack_values()."""
+    code = _STRUCT_KINDS[kind]
+    count = len(data) // struct.calcsize(code)
+    return struct.unpack("<{0}{1}".format(count, code), data)
+
+
+def _pack_names(names):
+    """Packs a sequence of class or attribute names into UTF-8 bytes."""
+    return "\n".join(names).encode("utf-8")
+
+
+def _unpack_names(kind, data):
+    """Unpacks a sequence of names packed with _pack_names()."""
+    if kind != _KIND_NAMES:
+        raise ValueError("malformed snapshot: expected a block of names")
+    if not len(data):
+        return []
+    return data.decode("utf-8").split("\n")
+
+
+def _encode_column(values):
+    """Encodes a column of attribute values as compactly as possible."""
+    types = set(type(v) for v in values)
+    if types == set([bool]):
+        kind = b"b"
+    elif types == set([float]):
+        kind = b"d"
+    elif types and types <= _INT_TYPES and \
+            _INT64_RANGE[0] <= min(values) and max(values) <= _INT64_RANGE[1]:
+        kind = b"q"
+    else:
+        return _KIND_PICKLE, pickle.dumps(list(values), 2)
+    return kind, _pack_values(kind, values)
+
+
+def _decode_column(block, classes):
+    """Decodes a column of attribute values encoded by _encode_column()."""
+    kind, data = block
+    if kind == _KIND_PICKLE:
+        return _SnapshotUnpickler(data, classes).load()
+    return _unpack_values(kind, data)
+
+
+def _classname(cls):
+    """Gets the qualified name of a class for storing it in a snapshot."""
+    name = getattr(cls, "__qualname__", cls.__name__)
+    return "{0}:{1}".format(cls.__module__, name)
+
+
+def _read_blocks(data):
+    """Parses a World snapshot into its flags and an ordered dict of blocks."""
+    magic, version, flags, count = _SNAPSHOT_HEADER.unpack_from(data)
+    if magic != _SNAPSHOT_MAGIC:
+        raise ValueError("data is not a World snapshot")
+    if version != _SNAPSHOT_VERSION:
+        e = "Unsupported snapshot version {0}"
+        raise ValueError(e.format(version))
+    body = data[_SNAPSHOT_HEADER.size:]
+    if flags & _SNAPSHOT_ZLIB:
+        body = zlib.decompress(body)
+    blocks = OrderedDict()
+    offset = 0
+    for i in range(count):
+        keysize, = struct.unpack_from("<H", body, offset)
+        offset += 2
+        key = body[offset:offset + keysize].decode("utf-8")
+        offset += keysize
+        kind, size = struct.unpack_from("<cI", body, offset)
+        offset += 5
+        blocks[key] = (kind, body[offset:offset + size])
+        offset += size
+    return flags, blocks
+
+
+def _read_base(base):
+    """Parses the complete snapshot a delta snapshot is based on."""
+    flags, blocks = _read_blocks(base)
+    if flags & _SNAPSHOT_DELTA:
+        raise ValueError("the base of a delta snapshot must be complete")
+    return blocks
+
+
+def _read_snapshot(data, base=None):
+    """Parses a World snapshot, applying it to its base if it's a delta."""
+    flags, blocks = _read_blocks(data)
+    if not flags & _SNAPSHOT_DELTA:
+        return blocks
+    if base is None:
+        raise ValueError("restoring a delta snapshot requires its base")
+    merged = _read_base(base)
+    for key, block in blocks.items():
+        if block[0] == _KIND_REMOVED:
+            merged.pop(key, None)
+        else:
+            merged[key] = block
+    return merged
+
+
 class World(object):
     """A simple application world.
 
@@ -117,13 +791,58 @@ class World(object):
 
     The order in which data is processed depends on the order of the
     added systems.
+
+    By default, the components of each type are only stored in a
+    dictionary mapping entities to components (see :attr:`components`).
+    These dictionaries should be treated as read-only: components must be
+    added and removed through their entities (or :meth:`add_components`),
+    since writing to the dictionaries directly bypasses the queries (see
+    :meth:`query`) that :class:`Applicator` systems get their components
+    from.
+    With ``storage="archetype"``, the world additionally groups all
+    entities with the same set of component types into a shared table
+    (an 'archetype'), so that the combined component sets for an
+    :class:`Applicator` can be retrieved by walking the matching tables
+    instead of intersecting the entities of every requested component
+    type on every call. This makes adding and removing components
+    slightly slower, but greatly speeds up worlds with many
+    applicators.
+
+    Args:
+        storage (str, optional): The component storage mode of the world,
+            either ``"dict"`` or ``"archetype"``. Defaults to ``"dict"``.
+
     """
-    def __init__(self):
+    def __init__(self, storage="dict"):
         """Creates a new World instance."""
+        if storage not in ("dict", "archetype"):
+            e = "Unsupported storage mode '{0}' (must be 'dict' or 'archetype')"
+            raise ValueError(e.format(storage))
         self.entities = set()
         self._systems = []
         self.components = {}
         self._componenttypes = {}
+        self._storage = storage
+        self._slots = []
+        self._generations = []
+        self._free_slots = deque()
+        self._archetypes = {}
+        self._entity_archetypes = {}
+        self._archetype_queries = {}
+        self._entity_types = {}
+        self._entityclasses = set([Entity])
+        self._typecache = {}
+        self._queries = {}
+        self._typequeries = {}
+        self._querylock = threading.Lock()
+        self._changes = {}
+        self._changetick = 0
+        self._lastrun = {}
+        self._arraystores = {}
+        self._arrayviews = {}
+        self._scheduler = None
+        self._profiler = None
+        self._commands = CommandBuffer(self)
 
     def _system_is_valid(self, system):
         """Checks, if the passed object fulfills the requirements for being
@@ -134,40 +853,340 @@ class World(object):
             hasattr(system, "process") and \
             callable(system.process)
 
+    def _check_system(self, system):
+        """Validates a processing system and registers its component types."""
+        if not self._system_is_valid(system):
+            raise ValueError("system must have componenttypes and a process method")
+        if getattr(system, "is_arraysystem", False):
+            for classtype in system.componenttypes:
+                if not issubclass(classtype, ArrayComponent):
+                    raise ValueError(
+                        "array systems can only process ArrayComponent types"
+                    )
+        for classtype in system.componenttypes:
+            if classtype not in self.components:
+                self.add_componenttype(classtype)
+
+    def _create_id(self, entity):
+        """Assigns a free entity slot to an entity and returns its id."""
+        if self._free_slots:
+            index = self._free_slots.popleft()
+            self._slots[index] = entity
+        else:
+            index = len(self._slots)
+            self._slots.append(entity)
+            self._generations.append(0)
+        return (self._generations[index] << _INDEX_BITS) | index
+
+    def _release_id(self, eid):
+        """Returns the slot of a deleted entity to the pool of free slots."""
+        index = eid & _INDEX_MASK
+        self._slots[index] = None
+        self._generations[index] += 1
+        self._free_slots.append(index)
+
+    def _get_archetype(self, types):
+        """Gets (or creates) the archetype table for a set of types."""
+        archetype = self._archetypes.get(types)
+        if archetype is None:
+            archetype = _Archetype(types)
+            self._archetypes[types] = archetype
+            for query, matches in self._archetype_queries.items():
+                if query <= types:
+                    matches.append(archetype)
+        return archetype
+
+    def _get_matching_archetypes(self, comptypes):
+        """Gets all archetype tables containing the given component types."""
+        query = frozenset(comptypes)
+        matches = self._archetype_queries.get(query)
+        if matches is None:
+            matches = [a for t, a in self._archetypes.items() if query <= t]
+            self._archetype_queries[query] = matches
+        return matches
+
+    def _resolve_componenttypes(self, classtype):
+        """Gets the component types for values of a given class.
+
+        Any component types not yet supported by the World are added. The
+        results are cached until the next call to add_componenttype().
+        """
+        ctypes = self._typecache.get(classtype)
+        if ctypes is not None:
+            return ctypes
+        # If the value is a compound component (e.g. a Button inheriting from
+        # a Sprite), it needs to be added to all supported component type
+        # instances. Array components are always stored as their own type only,
+        # and the TrackedComponent mixin is never a component type itself.
+        if issubclass(classtype, ArrayComponent):
+            mro = (classtype,)
+        else:
+            mro = inspect.getmro(classtype)
+            if type in mro:
+                stop = mro.index(type)
+            else:
+                stop = mro.index(object)
+            mro = tuple(c for c in mro[0:stop] if c is not TrackedComponent)
+        for clstype in mro:
+            if clstype not in self.components:
+                self.add_componenttype(clstype)
+        self._typecache[classtype] = mro
+        return mro
+
+    def _set_component(self, entity, value):
+        """Adds a component to an entity for all of its component types."""
+        ctypes = self._resolve_componenttypes(value.__class__)
+        self._add_component(entity, ctypes, value)
+
+    def _add_component(self, entity, ctypes, value):
+        """Sets the component of one or more types for an entity."""
+        components = self.components
+        if isinstance(value, ArrayComponent):
+            value = self._bind_array_component(entity, ctypes[0], value)
+        old = components[ctypes[0]].get(entity)
+        if old is not value:
+            if isinstance(old, TrackedComponent):
+                old._ebs_owners.discard((self, entity))
+            if isinstance(value, TrackedComponent):
+                value._ebs_owners.add((self, entity))
+        for ctype in ctypes:
+            components[ctype][entity] = value
+        if self._changes:
+            self._mark_changed(entity, ctypes)
+        types = self._entity_types.get(entity)
+        if types is None:
+            types = self._entity_types[entity] = set(ctypes)
+        else:
+            types.update(ctypes)
+        if self._typequeries:
+            for ctype in ctypes:
+                for query in self._typequeries.get(ctype, ()):
+                    if entity not in query._entities and query._types <= types:
+                        query._add(entity)
+        if self._storage != "archetype":
+            return
+        current = self._entity_archetypes.get(entity)
+        if current is not None and current.types.issuperset(ctypes):
+            row = current.rows[entity]
+            for ctype in ctypes:
+                current.columns[ctype][row] = value
+            return
+        if current is None:
+            values = {}
+            types = frozenset(ctypes)
+        else:
+            values = current.remove(entity)
+            types = current.types.union(ctypes)
+        for ctype in ctypes:
+            values[ctype] = value
+        archetype = self._get_archetype(types)
+        archetype.append(entity, values)
+        self._entity_archetypes[entity] = archetype
+
+    def _bind_array_component(self, entity, ctype, value):
+        """Stores the values of an array component in its type's arrays."""
+        store = self._arraystores[ctype]
+        if value._store is store and value._entity is entity:
+            return value
+        if value._store is not None:
+            # Already bound to another entity, so bind a copy instead
+            values = value._store.get(value._entity)
+            value = ctype.__new__(ctype)
+        else:
+            values = value._values
+        if entity in store.rows:
+            self._unbind_array_component(self.components[ctype][entity])
+            store.set(entity, values)
+        else:
+            store.append(entity, values)
+        value._store = store
+        value._entity = entity
+        value._values = None
+        return value
+
+    def _unbind_array_component(self, value, values=None):
+        """Detaches an array component from its arrays, keeping its values."""
+        if values is None:
+            values = value._store.get(value._entity)
+        value._values = values
+        value._store = None
+        value._entity = None
+
+    def _get_array_views(self, comptypes):
+        """Gets the field arrays of the entities with all given types."""
+        stores = [self._arraystores[ctype] for ctype in comptypes]
+        key = tuple(comptypes)
+        versions = tuple(store.version for store in stores)
+        cached = self._arrayviews.get(key)
+        if cached is None or cached[0] != versions:
+            # If all stores hold the same entities in the same order, their
+            # arrays can be used directly. Otherwise, the rows of the entities
+            # with all types are gathered into (and later scattered from)
+            # temporary arrays.
+            first = stores[0].entities
+            if all(store.entities == first for store in stores[1:]):
+                rows = None
+            else:
+                shared = [
+                    e for e in first if all(e in s.rows for s in stores[1:])
+                ]
+                rows = [
+                    numpy.array([s.rows[e] for e in shared], dtype=numpy.intp)
+                    for s in stores
+                ]
+            cached = (versions, rows)
+            self._arrayviews[key] = cached
+        rows = cached[1]
+        if rows is None:
+            return tuple(_ArrayView(store) for store in stores)
+        return tuple(_ArrayView(s, r) for s, r in zip(stores, rows))
+
+    def _remove_component(self, entity, ctype):
+        """Removes the component of a given type from an entity."""
+        if ctype in self._arraystores:
+            store = self._arraystores[ctype]
+            component = self.components[ctype][entity]
+            self._unbind_array_component(component, store.remove(entity))
+        component = self.components[ctype].pop(entity)
+        types = self._entity_types[entity]
+        types.discard(ctype)
+        if isinstance(component, TrackedComponent):
+            comps = self.components
+            if not any(comps[t].get(entity) is component for t in types):
+                component._ebs_owners.discard((self, entity))
+        if ctype in self._changes:
+            self._changes[ctype].pop(entity, None)
+        for query in self._typequeries.get(ctype, ()):
+            if entity in query._entities:
+                query._remove(entity)
+        if self._storage != "archetype":
+            return
+        values = self._entity_archetypes.pop(entity).remove(entity)
+        del values[ctype]
+        if values:
+            archetype = self._get_archetype(frozenset(values))
+            archetype.append(entity, values)
+            self._entity_archetypes[entity] = archetype
+
     def combined_components(self, comptypes):
         """A generator view on combined sets of component items."""
+        if self._storage == "archetype":
+            # Rows are moved between (and within) archetypes when components
+            # or entities are added or removed, so take a snapshot of all
+            # matching rows before handing any of them out
+            rows = []
+            for archetype in self._get_matching_archetypes(comptypes):
+                columns = [archetype.columns[ctype] for ctype in comptypes]
+                rows.extend(zip(*columns))
+            for row in rows:
+                yield row
+            return
         comps = self.components
-        keysets = [set(comps[ctype]) for ctype in comptypes]
         valsets = [comps[ctype] for ctype in comptypes]
-        entities = keysets[0].intersection(*keysets[1:])
-        for ekey in entities:
+        for ekey in list(self.query(*comptypes)._entities):
             yield tuple(component[ekey] for component in valsets)
 
+    def query(self, *componenttypes):
+        """Gets a persistent query for the entities with the given types.
+
+        Queries are kept up to date by the World as components are added
+        and removed, so they don't have to scan any component stores when
+        they are used. Repeated calls with the same component types return
+        the same Query object.
+        """
+        key = tuple(componenttypes)
+        query = self._queries.get(key)
+        if query is None:
+            # Systems run by a scheduler may ask for new queries concurrently
+            with self._querylock:
+                query = self._queries.get(key)
+                if query is None:
+                    query = self._create_query(key)
+        return query
+
+    def _create_query(self, key):
+        """Creates and registers a new query for the given types."""
+        for classtype in key:
+            if classtype not in self.components:
+                self.add_componenttype(classtype)
+        query = Query(self, key)
+        for ctype in query._types:
+            self._typequeries.setdefault(ctype, []).append(query)
+        self._queries[key] = query
+        return query
+
     def add_componenttype(self, classtype):
         """Adds a supported component type to the World."""
         if classtype in self._componenttypes.values():
             return
+        if issubclass(classtype, ArrayComponent):
+            self._arraystores[classtype] = _ArrayStore(classtype)
         self.components[classtype] = {}
         self._componenttypes[classtype.__name__.lower()] = classtype
+        self._typecache.clear()
+
+    def add_components(self, entities, components):
+        """Adds components to multiple entities at once.
+
+        Each entity receives the component at the same position in the
+        passed components, as if it was assigned as an attribute of the
+        entity. This is considerably faster than assigning each component
+        individually when creating many entities.
+
+        Args:
+            entities (iterable): The entities to add the components to.
+            components (iterable): The components to add, one per entity.
+
+        """
+        entities = list(entities)
+        components = list(components)
+        if len(entities) != len(components):
+            e = "Got {0} components for {1} entities"
+            raise ValueError(e.format(len(components), len(entities)))
+        resolve = self._resolve_componenttypes
+        add = self._add_component
+        for entity, component in zip(entities, components):
+            add(entity, resolve(component.__class__), component)
 
     def delete(self, entity):
         """Removes an Entity from the World, including all its data."""
-        for componentset in self.components.values():
-            componentset.pop(entity, None)
-        self.entities.discard(entity)
+        components = self.components
+        for ctype in self._entity_types.pop(entity, ()):
+            component = components[ctype].pop(entity)
+            if ctype in self._arraystores:
+                store = self._arraystores[ctype]
+                self._unbind_array_component(component, store.remove(entity))
+            elif isinstance(component, TrackedComponent):
+                component._ebs_owners.discard((self, entity))
+            if ctype in self._changes:
+                self._changes[ctype].pop(entity, None)
+            for query in self._typequeries.get(ctype, ()):
+                if entity in query._entities:
+                    query._remove(entity)
+        archetype = self._entity_archetypes.pop(entity, None)
+        if archetype is not None:
+            archetype.remove(entity)
+        if entity in self.entities:
+            self.entities.remove(entity)
+            self._release_id(entity._id)
 
     def delete_entities(self, entities):
         """Removes multiple entities from the World at once."""
-        eids = set(entities)
-        if ISPYTHON2:
-            for compkey, compset in self.components.viewitems():
-                keys = set(compset.viewkeys()) - eids
-                self.components[compkey] = dict((k, compset[k]) for k in keys)
-        else:
-            for compkey, compset in self.components.items():
-                keys = set(compset.keys()) - eids
-                self.components[compkey] = dict((k, compset[k]) for k in keys)
-        self.entities -= set(entities)
+        for entity in entities:
+            self.delete(entity)
+
+    def get_entity(self, eid):
+        """Gets the entity with the given id.
+
+        If no entity with the passed id exists in the World (e.g. because it
+        has been deleted), None is returned.
+        """
+        index = eid & _INDEX_MASK
+        if index >= len(self._slots):
+            return None
+        if self._generations[index] != eid >> _INDEX_BITS:
+            return None
+        return self._slots[index]
 
     def get_components(self, componenttype):
         """Gets all existing components for a sepcific component type.
@@ -190,6 +1209,355 @@ class World(object):
             return []
         return [e for e in compset if compset[e] == component]
 
+    def _snapshot_classes(self, classes=None):
+        """Gets the classes a snapshot may contain, by their qualified names."""
+        found = {}
+        for cls in list(self.components) + list(self._entityclasses):
+            found.setdefault(_classname(cls), cls)
+        for cls in classes or ():
+            found.setdefault(_classname(cls), cls)
+        return found
+
+    def _find_class(self, name, classes):
+        """Gets a component or entity class by its name in a snapshot."""
+        cls = classes.get(name)
+        if cls is None:
+            e = "The snapshot contains the unknown class '{0}'"
+            raise ValueError(e.format(name))
+        return cls
+
+    def snapshot(self, base=None, compress=False):
+        """Creates a compact binary snapshot of the World's entities.
+
+        The snapshot contains the ids and classes of all entities and the
+        state of all their components, which can be restored later on with
+        :meth:`restore` (e.g. for rolling back a networked game, or for
+        replaying a recorded session). Systems and queries are not part of
+        snapshots.
+
+        Components are stored column by column: array components as the raw
+        bytes of their field arrays, and attributes of other components
+        that hold only bools, ints or floats for all components of a class
+        as packed binary values. Any other attribute values are pickled,
+        so they must be picklable (and any classes they use must be passed
+        to :meth:`restore`). Components without a ``__dict__`` are pickled
+        as a whole.
+
+        If a previous snapshot is passed as base, the result is a delta
+        snapshot, which leaves out all columns that are identical in the
+        base. Delta snapshots can only be restored together with their base,
+        which must not be a delta snapshot itself.
+
+        Args:
+            base (bytes, optional): A complete snapshot to create a delta
+                snapshot against.
+            compress (bool, optional): Whether to compress the snapshot with
+                zlib. Defaults to False.
+
+        Returns:
+            bytes: The snapshot of the World.
+
+        """
+        baseblocks = {}
+        if base is not None:
+            baseblocks = _read_base(base)
+        blocks = []
+        entities = sorted(self.entities, key=lambda entity: entity._id)
+        classes = OrderedDict()
+        for entity in entities:
+            classes.setdefault(entity.__class__, len(classes))
+        classnames = [_classname(cls) for cls in classes]
+        blocks.append(("entities", b"Q", [e._id for e in entities]))
+        blocks.append(("entityclasses", _KIND_NAMES, classnames))
+        blocks.append(("entityclassindices", b"Q",
+                       [classes[e.__class__] for e in entities]))
+        blocks.append(("generations", b"Q", self._generations))
+        blocks.append(("freeslots", b"Q", list(self._free_slots)))
+        for ctype in sorted(self.components, key=_classname):
+            prefix = "c/{0}/".format(_classname(ctype))
+            if ctype in self._arraystores:
+                store = self._arraystores[ctype]
+                count = len(store.entities)
+                if not count:
+                    continue
+                ids = [e._id for e in store.entities]
+                blocks.append((prefix + "entities", b"Q", ids))
+                for name, dtype, shape in store.fields:
+                    column = store.columns[name][:count]
+                    column = column.astype(dtype.newbyteorder("<"), copy=False)
+                    key = prefix + "f/" + name
+                    blocks.append((key, _KIND_NUMPY, column.tobytes()))
+                continue
+            # Compound components are stored with their own class only
+            items = [(e, v) for e, v in self.components[ctype].items()
+                     if v.__class__ is ctype]
+            if not items:
+                continue
+            blocks.append((prefix + "entities", b"Q", [e._id for e, v in items]))
+            states = []
+            for entity, value in items:
+                state = getattr(value, "__dict__", None)
+                if state is None:
+                    break
+                states.append(state)
+            layout = None
+            if len(states) == len(items):
+                layout = sorted(k for k in states[0] if not k.startswith("_ebs_"))
+                for state in states:
+                    keys = [k for k in state if not k.startswith("_ebs_")]
+                    if len(keys) != len(layout) or sorted(keys) != layout:
+                        layout = None
+                        break
+            if layout is None:
+                # Differently shaped components can't be stored as columns
+                values = [v for e, v in items]
+                if len(states) == len(items):
+                    values = [dict((k, s[k]) for k in s
+                                   if not k.startswith("_ebs_"))
+                              for s in states]
+                    blocks.append((prefix + "states", _KIND_PICKLE, values))
+                else:
+                    blocks.append((prefix + "objects", _KIND_PICKLE, values))
+                continue
+            blocks.append((prefix + "layout", _KIND_NAMES, layout))
+            for name in layout:
+                kind, data = _encode_column([state[name] for state in states])
+                blocks.append((prefix + "a/" + name, kind, data))
+
+        flags = _SNAPSHOT_DELTA if base is not None else 0
+        written = []
+        for key, kind, data in blocks:
+            if kind == _KIND_PICKLE and not isinstance(data, bytes):
+                data = pickle.dumps(data, 2)
+            elif kind == _KIND_NAMES:
+                data = _pack_names(data)
+            elif kind in _STRUCT_KINDS and not isinstance(data, bytes):
+                data = _pack_values(kind, data)
+            # Blocks that are identical in the base are taken from it
+            if baseblocks.get(key) != (kind, data):
+                written.append((key, kind, data))
+        keys = set(block[0] for block in blocks)
+        for key in baseblocks:
+            if key not in keys:
+                written.append((key, _KIND_REMOVED, b""))
+        body = []
+        for key, kind, data in written:
+            key = key.encode("utf-8")
+            body.append(struct.pack("<H", len(key)))
+            body.append(key)
+            body.append(struct.pack("<cI", kind, len(data)))
+            body.append(data)
+        body = b"".join(body)
+        if compress:
+            flags |= _SNAPSHOT_ZLIB
+            body = zlib.compress(body, 1)
+        header = _SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, flags, len(written)
+        )
+        return header + body
+
+    def restore(self, data, base=None, classes=None):
+        """Restores the World's entities from a snapshot.
+
+        All entities and components of the World are replaced by the ones in
+        the snapshot. Entities that exist both in the World and the snapshot
+        (with the same id and class) and their components are updated in
+        place, so existing references to them remain valid; other entities
+        and components are created without calling their ``__init__()``
+        methods. Queries are updated to the restored entities, and all
+        restored components of tracked types are marked as changed.
+
+        Classes are only looked up among the World's component types, the
+        classes of the entities created in the World, and the given
+        ``classes``, and a :exc:`ValueError` is raised if the snapshot
+        contains any other class (including within pickled attribute
+        values). Attribute values are not validated otherwise.
+
+        .. warning::
+           Restoring a snapshot sets the attributes of components to
+           arbitrary values, and unpickles attribute values that aren't
+           plain numbers. Snapshots received from other sources (e.g. from
+           the peers of a networked game) should only be restored if those
+           sources are trusted.
+
+        Args:
+            data (bytes): A snapshot created with :meth:`snapshot`.
+            base (bytes, optional): The base snapshot, if the snapshot is a
+                delta snapshot.
+            classes (list, optional): Additional component, entity, and
+                attribute value classes that the snapshot may contain.
+
+        Raises:
+            ValueError: If the data is not a valid snapshot, or contains an
+                unknown class.
+
+        """
+        blocks = _read_snapshot(data, base)
+        known = self._snapshot_classes(classes)
+        ids = _unpack_values(*blocks.pop("entities"))
+        classnames = _unpack_names(*blocks.pop("entityclasses"))
+        classes = [self._find_class(name, known) for name in classnames]
+        for cls in classes:
+            if not (isinstance(cls, type) and issubclass(cls, Entity)):
+                e = "The snapshot class '{0}' is not an Entity class"
+                raise ValueError(e.format(_classname(cls)))
+        indices = _unpack_values(*blocks.pop("entityclassindices"))
+        generations = list(_unpack_values(*blocks.pop("generations")))
+        freeslots = _unpack_values(*blocks.pop("freeslots"))
+
+        # Reuse the existing entity objects, where possible
+        entities = {}
+        for eid, index in zip(ids, indices):
+            cls = classes[index]
+            entity = self.get_entity(eid)
+            if entity is None or entity.__class__ is not cls:
+                entity = object.__new__(cls)
+                object.__setattr__(entity, "_id", eid)
+                object.__setattr__(entity, "_world", self)
+            entities[eid] = entity
+
+        # Group the component blocks by class
+        groups = OrderedDict()
+        for key, block in blocks.items():
+            if not key.startswith("c/"):
+                continue
+            name, sub = key[2:].split("/", 1)
+            groups.setdefault(name, {})[sub] = block
+        groupclasses = [
+            (self._find_class(name, known), group)
+            for name, group in groups.items()
+        ]
+        for cls, group in groupclasses:
+            if issubclass(cls, Entity):
+                e = "The snapshot class '{0}' is not a component class"
+                raise ValueError(e.format(_classname(cls)))
+            self._resolve_componenttypes(cls)
+
+        oldcomps = self.components
+        newcomps = dict((ctype, {}) for ctype in oldcomps)
+        entity_types = {}
+        for ctype, comps in oldcomps.items():
+            if issubclass(ctype, TrackedComponent):
+                for entity, component in comps.items():
+                    component._ebs_owners.discard((self, entity))
+
+        def _install(entity, ctypes, component):
+            for ctype in ctypes:
+                newcomps[ctype][entity] = component
+            types = entity_types.get(entity)
+            if types is None:
+                entity_types[entity] = set(ctypes)
+            else:
+                types.update(ctypes)
+
+        restored = set()
+        for cls, group in groupclasses:
+            ctypes = self._resolve_componenttypes(cls)
+            ents = [entities[eid] for eid in _unpack_values(*group["entities"])]
+            old = oldcomps[cls]
+            if cls in self._arraystores:
+                restored.add(cls)
+                self._restore_array_store(cls, ents, group)
+                store = self._arraystores[cls]
+                for entity in ents:
+                    component = old.get(entity)
+                    if component is None or component._store is not store:
+                        component = cls.__new__(cls)
+                        component._store = store
+                        component._entity = entity
+                        component._values = None
+                    _install(entity, ctypes, component)
+                continue
+            if "objects" in group:
+                objects = _SnapshotUnpickler(group["objects"][1], known).load()
+                for entity, component in zip(ents, objects):
+                    _install(entity, ctypes, component)
+                continue
+            if "states" in group:
+                states = _SnapshotUnpickler(group["states"][1], known).load()
+            else:
+                layout = _unpack_names(*group["layout"])
+                columns = [
+                    _decode_column(group["a/" + k], known) for k in layout
+                ]
+                states = [dict(zip(layout, row)) for row in zip(*columns)]
+            tracked = issubclass(cls, TrackedComponent)
+            for entity, state in zip(ents, states):
+                component = old.get(entity)
+                if component is not None and component.__class__ is cls:
+                    cstate = component.__dict__
+                    for k in list(cstate):
+                        if k not in state and not k.startswith("_ebs_"):
+                            del cstate[k]
+                    cstate.update(state)
+                else:
+                    component = cls.__new__(cls)
+                    component.__dict__.update(state)
+                if tracked:
+                    component._ebs_owners.add((self, entity))
+                _install(entity, ctypes, component)
+        for ctype in self._arraystores:
+            if ctype not in restored:
+                self._restore_array_store(ctype, [], {})
+
+        # Replace the World's state with the restored one
+        for ctype, comps in oldcomps.items():
+            comps.clear()
+            comps.update(newcomps[ctype])
+        self.entities.clear()
+        self.entities.update(entities.values())
+        self._entityclasses.update(classes)
+        self._entity_types = entity_types
+        self._generations = generations
+        self._slots = [None] * len(generations)
+        for eid, entity in entities.items():
+            self._slots[eid & _INDEX_MASK] = entity
+        self._free_slots = deque(freeslots)
+        if self._storage == "archetype":
+            self._archetypes = {}
+            self._entity_archetypes = {}
+            self._archetype_queries = {}
+            for entity, types in entity_types.items():
+                archetype = self._get_archetype(frozenset(types))
+                archetype.append(
+                    entity, dict((t, oldcomps[t][entity]) for t in types)
+                )
+                self._entity_archetypes[entity] = archetype
+        for query in self._queries.values():
+            matches = set(
+                e for e, types in entity_types.items() if query._types <= types
+            )
+            for entity in list(query._entities):
+                if entity not in matches:
+                    query._remove(entity)
+            for entity in matches:
+                if entity not in query._entities:
+                    query._add(entity)
+        for ctype, changes in self._changes.items():
+            changes.clear()
+            for entity in oldcomps[ctype]:
+                changes[entity] = self._changetick
+
+    def _restore_array_store(self, ctype, entities, group):
+        """Replaces the contents of an array store with snapshot data."""
+        store = self._arraystores[ctype]
+        current = set(entities)
+        for entity, component in self.components[ctype].items():
+            if entity not in current:
+                self._unbind_array_component(component)
+        count = len(entities)
+        while count > len(store.columns[store.fields[0][0]]):
+            store._grow()
+        for name, dtype, shape in store.fields:
+            if count:
+                values = numpy.frombuffer(
+                    group["f/" + name][1], dtype.newbyteorder("<")
+                )
+                store.columns[name][:count] = values.reshape((count,) + shape)
+        store.entities = list(entities)
+        store.rows = dict(zip(entities, range(count)))
+        store.version += 1
+
     def add_system(self, system):
         """Adds a processing system to the world.
 
@@ -202,13 +1570,11 @@ class World(object):
              components
 
         If the object contains a 'is_applicator' attribute that evaluates to
-        True, the system will operate on combined sets of components.
+        True, the system will operate on combined sets of components. If it
+        contains a 'is_arraysystem' attribute that evaluates to True, the
+        system will operate on the field arrays of its ArrayComponent types.
         """
-        if not self._system_is_valid(system):
-            raise ValueError("system must have componenttypes and a process method")
-        for classtype in system.componenttypes:
-            if classtype not in self.components:
-                self.add_componenttype(classtype)
+        self._check_system(system)
         self._systems.append(system)
 
     def insert_system(self, index, system):
@@ -217,32 +1583,264 @@ class World(object):
         The system will be added at the specific position of the
         processing order.
         """
-        if not self._system_is_valid(system):
-            raise ValueError("system must have componenttypes and a process method")
-        for classtype in system.componenttypes:
-            if classtype not in self.components:
-                self.add_componenttype(classtype)
+        self._check_system(system)
         self._systems.insert(index, system)
 
     def remove_system(self, system):
         """Removes a processing system from the world."""
         self._systems.remove(system)
+        self._lastrun.pop(system, None)
 
-    def process(self):
-        """Processes all components within their corresponding systems."""
+    def track_changes(self, *componenttypes):
+        """Enables change tracking for the given component types.
+
+        For tracked types, the World records when the component of each
+        entity was last assigned (or, for TrackedComponent and
+        ArrayComponent types, when one of its attributes was last set) as a
+        change tick (see :attr:`changetick`). Systems with a 'changed_only'
+        attribute that evaluates to True then only receive the components
+        of tracked types that changed since their last run, and other code
+        can retrieve the changed entities with :meth:`get_changed`.
+
+        All existing components of the given types are marked as changed.
+        """
+        for ctype in componenttypes:
+            if ctype not in self.components:
+                self.add_componenttype(ctype)
+            if ctype in self._changes:
+                continue
+            changes = OrderedDict()
+            for entity in self.components[ctype]:
+                changes[entity] = self._changetick
+            self._changes[ctype] = changes
+            if ctype in self._arraystores:
+                self._arraystores[ctype].world = self
+
+    def get_changed(self, componenttype, since=0):
+        """Gets the entities whose component of a type changed since a tick.
+
+        The component type must be tracked (see :meth:`track_changes`).
+        Entities are returned in the order of their last change. To get the
+        changes made after some point in time, pass the value of
+        :attr:`changetick` at that point. To get the changes made since the
+        last run of a system, pass the return value of :meth:`get_lastrun`.
+        """
+        changes = self._changes.get(componenttype)
+        if changes is None:
+            e = "Changes of '{0}' components are not tracked"
+            raise ValueError(e.format(componenttype.__name__))
+        entities = []
+        for entity in reversed(changes):
+            if changes[entity] < since:
+                break
+            entities.append(entity)
+        entities.reverse()
+        return entities
+
+    def get_lastrun(self, system):
+        """Gets the change tick at which the last run of a system ended.
+
+        Components changed by the system itself during that run are marked
+        with an earlier tick. If the system hasn't been processed yet, 0 is
+        returned.
+        """
+        return self._lastrun.get(system, 0)
+
+    @property
+    def changetick(self):
+        """The current change tick of the World.
+
+        The change tick increases before and after each processed system and
+        at the end of :meth:`process`, so that the changes made by each
+        system can be told apart from the ones made by other systems and
+        outside of :meth:`process`.
+        """
+        return self._changetick
+
+    def _mark_changed(self, entity, ctypes):
+        """Marks the components of the given types of an entity as changed."""
+        tick = self._changetick
+        for ctype in ctypes:
+            changes = self._changes.get(ctype)
+            if changes is not None:
+                # Keep the changes ordered by their tick
+                changes.pop(entity, None)
+                changes[entity] = tick
+
+    def _get_changed_components(self, system, since):
+        """Gets the components for a system that changed after a tick."""
         components = self.components
-        for system in self._systems:
-            s_process = system.process
+        ctypes = system.componenttypes
+        if getattr(system, "is_applicator", False):
+            tracked = [ctype for ctype in ctypes if ctype in self._changes]
+            if not tracked:
+                return self.combined_components(ctypes)
+            entities = OrderedDict()
+            for ctype in tracked:
+                for entity in self.get_changed(ctype, since):
+                    entities[entity] = None
+            valsets = [components[ctype] for ctype in ctypes]
+            return [
+                tuple(component[entity] for component in valsets)
+                for entity in entities
+                if all(entity in component for component in valsets)
+            ]
+        changed = []
+        for ctype in ctypes:
+            if ctype in self._changes:
+                compset = components[ctype]
+                entities = self.get_changed(ctype, since)
+                changed.append([compset[entity] for entity in entities])
+            else:
+                changed.append(list(components[ctype].values()))
+        return changed
+
+    def _process_system(self, system):
+        """Processes the components of a single system."""
+        # Changes made by the system are marked with a tick of their own,
+        # so that it doesn't get them reported on its next run
+        self._changetick += 1
+        try:
+            self._execute_system(system)
+        finally:
+            self._changetick += 1
+            self._lastrun[system] = self._changetick
+
+    def _begin_stage(self, systems):
+        """Prepares the world for processing systems at the same time.
+
+        All systems of the stage share a single change tick, and any queries
+        they need are created up front, so that the systems can be run on
+        other threads with _execute_system() without modifying the shared
+        state of the world.
+        """
+        self._changetick += 1
+        for system in systems:
+            ctypes = system.componenttypes
+            if getattr(system, "is_applicator", False):
+                self.query(*ctypes)
+                if self._storage == "archetype":
+                    self._get_matching_archetypes(ctypes)
+            elif getattr(system, "is_arraysystem", False):
+                self.query(*ctypes)
+
+    def _end_stage(self, systems):
+        """Finishes processing a stage started with _begin_stage()."""
+        self._changetick += 1
+        for system in systems:
+            self._lastrun[system] = self._changetick
+
+    def _execute_system(self, system):
+        """Runs a single system, recording its time if profiling."""
+        profiler = self._profiler
+        if profiler is None:
+            self._run_system(system)
+        else:
+            count = self._count_components(system)
+            start = SDL_GetPerformanceCounter()
+            self._run_system(system)
+            end = SDL_GetPerformanceCounter()
+            profiler._record(system, end - start, count)
+
+    def _count_components(self, system):
+        """Gets the number of components (or sets) a system will process."""
+        ctypes = system.componenttypes
+        if getattr(system, "is_applicator", False) or \
+                getattr(system, "is_arraysystem", False):
+            return len(self.query(*ctypes))
+        components = self.components
+        return sum(len(components.get(ctype, ())) for ctype in ctypes)
+
+    def _run_system(self, system):
+        s_process = system.process
+        if getattr(system, "is_arraysystem", False):
+            arrays = self._get_array_views(system.componenttypes)
+            s_process(self, arrays)
+            for view in arrays:
+                view._commit()
+        elif getattr(system, "changed_only", False) and self._changes:
+            since = self._lastrun.get(system, 0)
+            changed = self._get_changed_components(system, since)
             if getattr(system, "is_applicator", False):
-                comps = self.combined_components(system.componenttypes)
-                s_process(self, comps)
+                s_process(self, changed)
             else:
-                if ISPYTHON2:
-                    for ctype in system.componenttypes:
-                        s_process(self, components[ctype].viewvalues())
-                else:
-                    for ctype in system.componenttypes:
-                        s_process(self, components[ctype].values())
+                for comps in changed:
+                    s_process(self, comps)
+        elif getattr(system, "is_applicator", False):
+            comps = self.combined_components(system.componenttypes)
+            s_process(self, comps)
+        else:
+            components = self.components
+            if ISPYTHON2:
+                for ctype in system.componenttypes:
+                    s_process(self, components[ctype].viewvalues())
+            else:
+                for ctype in system.componenttypes:
+                    s_process(self, components[ctype].values())
+
+    def process(self):
+        """Processes all components within their corresponding systems.
+
+        If a scheduler has been set for the world, the systems will be run
+        by the scheduler instead of one after another in processing order.
+        """
+        profiler = self._profiler
+        if profiler is not None:
+            start = SDL_GetPerformanceCounter()
+        for query in self._queries.values():
+            query._next_frame()
+        if self._scheduler is not None:
+            self._scheduler.run(self)
+        else:
+            commands = self._commands
+            for system in self._systems:
+                self._process_system(system)
+                if getattr(system, "apply_commands", False):
+                    commands.apply()
+        self._commands.apply()
+        self._changetick += 1
+        if profiler is not None:
+            end = SDL_GetPerformanceCounter()
+            profiler._record_frame(end - start, len(self._systems))
+
+    @property
+    def commands(self):
+        """The CommandBuffer for deferring changes to the world's entities.
+
+        Commands in this buffer are applied at the end of :meth:`process`
+        and after every system with an 'apply_commands' attribute that
+        evaluates to True.
+        """
+        return self._commands
+
+    @property
+    def scheduler(self):
+        """The SystemScheduler used for processing the world's systems.
+
+        If None (the default), systems are processed one after another in
+        their processing order.
+        """
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, value):
+        if value is not None and not isinstance(value, SystemScheduler):
+            raise TypeError("scheduler must be a SystemScheduler or None")
+        self._scheduler = value
+
+    @property
+    def profiler(self):
+        """The SystemProfiler recording the processing times of the world.
+
+        If None (the default), no processing times are recorded.
+        """
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, value):
+        if value is not None and not isinstance(value, SystemProfiler):
+            raise TypeError("profiler must be a SystemProfiler or None")
+        self._profiler = value
 
     @property
     def systems(self):
@@ -254,6 +1852,11 @@ class World(object):
         """Gets the supported component types of the world."""
         return self._componenttypes.values()
 
+    @property
+    def storage(self):
+        """The component storage mode of the world."""
+        return self._storage
+
 
 class System(object):
     """A processing system for component data.
@@ -265,9 +1868,16 @@ class System(object):
 
     Also, the processing system does not know about any specific entity,
     but only is aware of the data carried by all entities.
+
+    To allow a SystemScheduler to run the system in parallel with other
+    systems, the component types it reads and modifies can be declared
+    with its 'reads' and 'writes' attributes. Systems that don't declare
+    either are never run in parallel with any other system.
     """
     def __init__(self):
         self.componenttypes = None
+        self.reads = None
+        self.writes = None
 
     def process(self, world, components):
         """Processes component items.
@@ -282,3 +1892,400 @@ class Applicator(System):
     def __init__(self):
         super(Applicator, self).__init__()
         self.is_applicator = True
+
+
+class ArraySystem(System):
+    """A processing system for the field arrays of array components.
+
+    Instead of individual components, an ArraySystem receives one object
+    per type in its componenttypes (which must all be ArrayComponent
+    types), with the Numpy arrays of the component type's fields as
+    attributes. The rows of all arrays refer to the same entities, namely
+    those that have components of all of the system's types, so updates
+    can be done with vectorized Numpy operations::
+
+        class MovementSystem(ArraySystem):
+            def __init__(self):
+                super(MovementSystem, self).__init__()
+                self.componenttypes = (Position, Velocity)
+                self.dt = 1 / 60.0
+
+            def process(self, world, arrays):
+                pos, vel = arrays
+                pos.x += vel.vx * self.dt
+                pos.y += vel.vy * self.dt
+
+    Field arrays can be modified in place or replaced with new arrays of
+    the same length, and the entities of their rows are available from
+    each object's ``entities`` attribute. Entities should not gain or lose
+    components of the processed types during processing.
+    """
+    def __init__(self):
+        super(ArraySystem, self).__init__()
+        self.is_arraysystem = True
+
+    def process(self, world, arrays):
+        """Processes the field arrays of the array component types.
+
+        This must be implemented by inheriting classes.
+        """
+        raise NotImplementedError()
+
+
+class _ProfileStats(object):
+    """The recorded processing times of a single system (or frame)."""
+    def __init__(self, window):
+        self.times = deque(maxlen=window)
+        self.calls = 0
+        self.components = 0
+        self.overruns = 0
+        self.total = 0.0
+
+    def add(self, elapsed, count):
+        self.times.append(elapsed)
+        self.calls += 1
+        self.components = count
+        self.total += elapsed
+
+    def as_dict(self):
+        times = sorted(self.times)
+        # The 99th percentile by the nearest-rank method
+        p99 = times[int(math.ceil(0.99 * len(times))) - 1]
+        return {
+            "calls": self.calls,
+            "components": self.components,
+            "last": self.times[-1],
+            "min": times[0],
+            "avg": sum(times) / len(times),
+            "p99": p99,
+            "max": times[-1],
+            "total": self.total,
+            "overruns": self.overruns,
+        }
+
+
+class SystemProfiler(object):
+    """Records how long the processing systems of a World take to run.
+
+    Once set as the profiler of a World, the time taken by each system in
+    :meth:`World.process` (as measured with
+    :func:`~sdl2.SDL_GetPerformanceCounter`) is recorded along with the
+    number of components or component sets it was given to process, and the
+    time taken by each call of :meth:`World.process` as a whole::
+
+        world.profiler = SystemProfiler(budget=0.002, frame_budget=1 / 60.0)
+        world.process()
+        print(world.profiler.report())
+
+    Rolling statistics over the most recent runs of each system can be
+    retrieved with :meth:`get_stats`. If a system (or frame) takes longer
+    than its budget, the overrun is counted and a :obj:`RuntimeWarning` is
+    issued. A callback can also be set to receive each individual
+    measurement, e.g. to forward them to an external profiler.
+
+    If a World doesn't have a profiler (the default), no measurements are
+    taken at all.
+
+    Args:
+        window (int, optional): The number of most recent runs to use for
+            the rolling statistics of each system. Defaults to 120.
+        budget (float, optional): The default time budget (in seconds) for a
+            single run of any system. Defaults to no budget.
+        frame_budget (float, optional): The time budget (in seconds) for a
+            single call of :meth:`World.process`. Defaults to no budget.
+        callback (callable, optional): A function to call as
+            ``callback(system, elapsed, count)`` after each system run, with
+            the time taken in seconds and the number of components
+            processed. For frames, *system* is None and *count* is the
+            number of systems of the world.
+
+    """
+    def __init__(self, window=120, budget=None, frame_budget=None,
+                 callback=None):
+        if int(window) != window or window < 1:
+            raise ValueError("window must be a positive integer")
+        self._window = int(window)
+        self._frequency = float(SDL_GetPerformanceFrequency())
+        self._stats = {}
+        self._frame = _ProfileStats(self._window)
+        self.budget = budget
+        self.budgets = {}
+        self.frame_budget = frame_budget
+        self.callback = callback
+
+    @property
+    def window(self):
+        """The number of recent runs used for the rolling statistics."""
+        return self._window
+
+    @property
+    def systems(self):
+        """The systems that have been recorded by the profiler."""
+        return tuple(self._stats.keys())
+
+    def set_budget(self, system, budget):
+        """Sets the time budget (in seconds) for a single system.
+
+        Passing None as the budget makes the system use the profiler's
+        default :attr:`budget` again.
+        """
+        if budget is None:
+            self.budgets.pop(system, None)
+        else:
+            self.budgets[system] = budget
+
+    def _warn_overrun(self, name, elapsed, budget):
+        msg = "{0} took {1:.3f} ms, exceeding its budget of {2:.3f} ms"
+        msg = msg.format(name, elapsed * 1000, budget * 1000)
+        warnings.warn(msg, RuntimeWarning)
+
+    def _record(self, system, ticks, count):
+        elapsed = ticks / self._frequency
+        stats = self._stats.get(system)
+        if stats is None:
+            stats = self._stats.setdefault(system, _ProfileStats(self._window))
+        stats.add(elapsed, count)
+        budget = self.budgets.get(system, self.budget)
+        if budget is not None and elapsed > budget:
+            stats.overruns += 1
+            name = "System '{0}'".format(type(system).__name__)
+            self._warn_overrun(name, elapsed, budget)
+        if self.callback is not None:
+            self.callback(system, elapsed, count)
+
+    def _record_frame(self, ticks, count):
+        elapsed = ticks / self._frequency
+        self._frame.add(elapsed, count)
+        budget = self.frame_budget
+        if budget is not None and elapsed > budget:
+            self._frame.overruns += 1
+            self._warn_overrun("The frame", elapsed, budget)
+        if self.callback is not None:
+            self.callback(None, elapsed, count)
+
+    def get_stats(self, system):
+        """Gets the recorded statistics for a system.
+
+        All times are in seconds. The 'min', 'avg', 'p99' (99th percentile)
+        and 'max' times only cover the most recent runs within the
+        profiler's :attr:`window`.
+
+        Args:
+            system: The system to get the statistics for, or None to get
+                the statistics for whole frames.
+
+        Returns:
+            dict: A dict with the keys 'calls', 'components' (the number of
+            components processed in the last run), 'last', 'min', 'avg',
+            'p99', 'max', 'total' and 'overruns', or None if the system
+            hasn't been recorded yet.
+
+        """
+        stats = self._frame if system is None else self._stats.get(system)
+        if stats is None or not stats.calls:
+            return None
+        return stats.as_dict()
+
+    def reset(self):
+        """Discards all recorded measurements."""
+        self._stats = {}
+        self._frame = _ProfileStats(self._window)
+
+    def report(self):
+        """Creates a plain-text table of the recorded statistics.
+
+        Systems are listed from slowest to fastest by their average time.
+
+        Returns:
+            str: The formatted statistics.
+
+        """
+        line = "{0:<28} {1:>8} {2:>9} {3:>9} {4:>9} {5:>9} {6:>8}"
+        lines = [line.format("system", "calls", "count", "avg ms",
+                             "p99 ms", "max ms", "overruns")]
+        rows = []
+        for system in self.systems:
+            rows.append((type(system).__name__, self.get_stats(system)))
+        rows.sort(key=lambda row: row[1]["avg"], reverse=True)
+        frame = self.get_stats(None)
+        if frame is not None:
+            rows.append(("(frame)", frame))
+        for name, stats in rows:
+            lines.append(line.format(
+                name[:28], stats["calls"], stats["components"],
+                "{0:.3f}".format(stats["avg"] * 1000),
+                "{0:.3f}".format(stats["p99"] * 1000),
+                "{0:.3f}".format(stats["max"] * 1000), stats["overruns"]
+            ))
+        return "\n".join(lines)
+
+
+def _get_access(system):
+    """Gets the component types read and written by a system."""
+    reads = getattr(system, "reads", None)
+    writes = getattr(system, "writes", None)
+    if reads is None and writes is None:
+        return None
+    return frozenset(reads or ()), frozenset(writes or ())
+
+
+def _conflicts(a, b):
+    """Checks whether two systems with the given accesses may not overlap."""
+    if a is None or b is None:
+        return True
+    reads_a, writes_a = a
+    reads_b, writes_b = b
+    return bool(
+        writes_a & writes_b or writes_a & reads_b or reads_a & writes_b
+    )
+
+
+class SystemScheduler(object):
+    """Runs the processing systems of a World on a pool of threads.
+
+    The scheduler builds a dependency graph from the component types each
+    system reads and writes (as declared by the system's 'reads' and
+    'writes' attributes), and groups the systems into stages: each system
+    is placed in the stage after the last earlier system it conflicts
+    with (i.e. one that writes a type the system accesses, or reads a type
+    the system writes), so conflicting systems always run in their
+    processing order. Stages are run one after another, while all systems
+    within a stage run at the same time on a thread pool (sharing a single
+    change tick, see :attr:`World.changetick`). Systems without any
+    declarations conflict with all other systems.
+
+    Since Python threads can only run in parallel while the GIL is released,
+    this mostly benefits systems that spend their time in ctypes calls
+    (e.g. to SDL), Numpy operations, or I/O such as image decoding::
+
+        world.scheduler = SystemScheduler(workers=4)
+        world.process()  # Runs the systems of the world in parallel
+
+    If the scheduler has only one worker or Python's concurrent.futures
+    module isn't available, it runs all systems one after another in their
+    processing order, exactly like a World without a scheduler.
+
+    Regardless of how the systems are run, the time taken by each system
+    during the last run is available from :attr:`timings`.
+
+    Args:
+        workers (int, optional): The maximum number of systems to run at
+            the same time. Defaults to the number of CPU cores (at least 2).
+
+    """
+    def __init__(self, workers=None):
+        if workers is None:
+            try:
+                import multiprocessing
+                workers = max(2, multiprocessing.cpu_count())
+            except NotImplementedError:
+                workers = 2
+        if int(workers) != workers or workers < 1:
+            raise ValueError("workers must be a positive integer")
+        self._workers = int(workers)
+        self._executor = None
+        self._stages = None
+        self._stagekey = None
+        self.timings = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def workers(self):
+        """The maximum number of systems that are run at the same time."""
+        return self._workers
+
+    @property
+    def serial(self):
+        """Whether the scheduler runs all systems one after another."""
+        return self._workers == 1 or ThreadPoolExecutor is None
+
+    def get_stages(self, systems):
+        """Groups a sequence of systems into stages of non-conflicting ones.
+
+        Args:
+            systems (list): The systems to group, in processing order.
+
+        Returns:
+            list: A list of stages, each of which is a list of the systems
+            that can run at the same time (in processing order).
+
+        """
+        accesses = [_get_access(system) for system in systems]
+        levels = []
+        for i, access in enumerate(accesses):
+            level = 0
+            for j in range(i):
+                if levels[j] >= level and _conflicts(accesses[j], access):
+                    level = levels[j] + 1
+            levels.append(level)
+        stages = [[] for i in range(max(levels) + 1)] if levels else []
+        for system, level in zip(systems, levels):
+            stages[level].append(system)
+        return stages
+
+    def _run_timed(self, world, system, concurrent=False):
+        start = _clock()
+        try:
+            if concurrent:
+                world._execute_system(system)
+            else:
+                world._process_system(system)
+        finally:
+            self.timings[system] = _clock() - start
+
+    def run(self, world):
+        """Processes all systems of a World.
+
+        Args:
+            world (:obj:`World`): The world to process.
+
+        """
+        systems = world.systems
+        commands = world.commands
+        self.timings = {}
+        if self.serial:
+            for system in systems:
+                self._run_timed(world, system)
+                if getattr(system, "apply_commands", False):
+                    commands.apply()
+            return
+        key = tuple((system, _get_access(system)) for system in systems)
+        if key != self._stagekey:
+            self._stages = self.get_stages(systems)
+            self._stagekey = key
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        for stage in self._stages:
+            if len(stage) == 1:
+                self._run_timed(world, stage[0])
+            else:
+                # Change ticks and queries are only updated from this thread
+                world._begin_stage(stage)
+                futures = [
+                    self._executor.submit(self._run_timed, world, system, True)
+                    for system in stage
+                ]
+                # Wait for all systems of the stage before raising any errors
+                errors = [f.exception() for f in futures]
+                world._end_stage(stage)
+                for error in errors:
+                    if error is not None:
+                        raise error
+            # Commands can only be applied safely once the stage is done
+            if any(getattr(s, "apply_commands", False) for s in stage):
+                commands.apply()
+
+    def close(self):
+        """Shuts down the scheduler's thread pool.
+
+        The scheduler can still be used after being closed, in which case a
+        new thread pool will be created.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
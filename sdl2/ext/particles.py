@@ -4,7 +4,14 @@ A simple particle engine implementation.
 from .compat import *
 from .ebs import System
 
-__all__ = ["Particle", "ParticleEngine"]
+try:
+    import numpy
+    _HASNUMPY = True
+except ImportError:
+    _HASNUMPY = False
+
+__all__ = ["Particle", "ParticleEngine", "ParticleBuffer",
+           "ArrayParticleEngine"]
 
 
 class Particle(object):
@@ -124,3 +131,276 @@ class ParticleEngine(System):
         if not callable(value):
             raise TypeError("updatefunc must be callable")
         self._updatefunc = value
+
+
+class ParticleBuffer(object):
+    """A fixed-size set of particles stored in Numpy arrays.
+
+    Instead of one :class:`Particle` object per particle, a ParticleBuffer
+    keeps all of its particles in preallocated, column-oriented Numpy arrays
+    (one per field), so that they can be created, updated and removed in
+    bulk by Numpy operations. Each particle has a position (``x``, ``y``), a
+    velocity (``vx``, ``vy``), a remaining ``life`` time and a ``type``,
+    plus any additional fields passed on creation::
+
+        buf = ParticleBuffer(100000, fields=[("size", "f4")])
+        buf.emit(500, x=400, y=300, vx=numpy.random.uniform(-1, 1, 500),
+                 life=60, size=4)
+        buf.y += 0.5  # Move all living particles down
+
+    Field attributes (e.g. ``buf.x``) are views of the arrays that only
+    cover the living particles, and are invalidated as soon as particles
+    are emitted or removed. Particles are not kept in any particular order.
+
+    ParticleBuffers are meant to be used as components of entities (e.g.
+    particle emitters) that are processed by an :class:`ArrayParticleEngine`.
+
+    Args:
+        capacity (int): The maximum number of particles in the buffer.
+        fields (list, optional): Additional ``(name, dtype)`` fields for
+            each particle, with the dtype given as a Numpy type or type
+            string (e.g. ``"f4"``).
+
+    """
+    _basefields = [("x", "f4"), ("y", "f4"), ("vx", "f4"), ("vy", "f4"),
+                   ("life", "f4"), ("type", "u2")]
+
+    def __init__(self, capacity, fields=None):
+        if not _HASNUMPY:
+            raise UnsupportedError("ParticleBuffer requires Numpy")
+        if int(capacity) != capacity or capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        fields = self._basefields + list(fields or [])
+        names = [f[0] for f in fields]
+        if len(set(names)) != len(names):
+            raise ValueError("field names must be unique")
+        self._capacity = int(capacity)
+        self._count = 0
+        self._fields = tuple(names)
+        self._columns = dict(
+            (name, numpy.zeros(self._capacity, dtype))
+            for name, dtype in fields
+        )
+        self.dropped = 0
+
+    def __len__(self):
+        """The number of living particles in the buffer."""
+        return self._count
+
+    def __getattr__(self, name):
+        """Gets the values of a field for all living particles."""
+        try:
+            columns = self.__dict__["_columns"]
+        except KeyError:
+            raise AttributeError(name)
+        if name not in columns:
+            raise AttributeError("'ParticleBuffer' has no field '%s'" % name)
+        return columns[name][:self._count]
+
+    def __setattr__(self, name, value):
+        """Sets the values of a field for all living particles."""
+        columns = self.__dict__.get("_columns")
+        if columns is not None and name in columns:
+            columns[name][:self._count] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    @property
+    def capacity(self):
+        """The maximum number of particles in the buffer."""
+        return self._capacity
+
+    @property
+    def fields(self):
+        """The names of the fields of the particles."""
+        return self._fields
+
+    def get_array(self, name):
+        """Gets the full preallocated array of a field.
+
+        The first ``len(buffer)`` values of the array belong to the living
+        particles, the remaining ones are unused.
+        """
+        return self._columns[name]
+
+    def emit(self, count, **values):
+        """Adds new particles to the buffer.
+
+        The field values for the new particles can be passed as keyword
+        arguments, each either as a single value for all particles or as a
+        sequence or array with one value per particle. Fields without a
+        value are set to 0.
+
+        If the buffer doesn't have enough room for all new particles, only
+        as many as fit are added and the rest are counted in
+        :attr:`dropped`.
+
+        Args:
+            count (int): The number of particles to add.
+
+        Returns:
+            int: The number of particles added.
+
+        """
+        for name in values:
+            if name not in self._columns:
+                e = "'ParticleBuffer' has no field '{0}'"
+                raise ValueError(e.format(name))
+        start = self._count
+        added = max(0, min(int(count), self._capacity - start))
+        self.dropped += int(count) - added
+        end = start + added
+        for name, column in self._columns.items():
+            value = values.get(name, 0)
+            if numpy.ndim(value) > 0:
+                value = numpy.asarray(value)[:added]
+            column[start:end] = value
+        self._count = end
+        return added
+
+    def kill(self, dead):
+        """Removes particles from the buffer.
+
+        Removed particles are replaced by particles from the end of the
+        buffer, so only the rows of removed particles are moved.
+
+        Args:
+            dead: A boolean mask for all living particles (True for
+                particles to remove), or an array of particle indices.
+
+        Returns:
+            int: The number of particles removed.
+
+        """
+        dead = numpy.asarray(dead)
+        count = self._count
+        if dead.dtype == numpy.bool_:
+            if dead.shape != (count,):
+                raise ValueError("the mask must have one value per particle")
+        else:
+            mask = numpy.zeros(count, numpy.bool_)
+            mask[dead] = True
+            dead = mask
+        remaining = count - int(numpy.count_nonzero(dead))
+        if remaining == count:
+            return 0
+        # Fill the holes before the new end with the survivors behind it
+        holes = numpy.flatnonzero(dead[:remaining])
+        movers = numpy.flatnonzero(~dead[remaining:]) + remaining
+        if len(holes):
+            for column in self._columns.values():
+                column[holes] = column[movers]
+        self._count = remaining
+        return count - remaining
+
+    def clear(self):
+        """Removes all particles from the buffer."""
+        self._count = 0
+
+
+class ArrayParticleEngine(System):
+    """A particle processing system for :class:`ParticleBuffer` components.
+
+    The ArrayParticleEngine is the vectorized counterpart of the
+    :class:`ParticleEngine`: on each call of :meth:`process`, it processes
+    every ParticleBuffer component in the world in bulk by
+
+    1. decreasing the life of all particles by :attr:`decay` and moving
+       them by their velocity times :attr:`step`,
+    2. calling the deletion callback with a boolean mask of the particles
+       whose life reached 0 or below, and removing those particles,
+    3. calling the update callback for the remaining particles, and
+    4. calling the creation callback with the number of removed particles.
+
+    All callbacks are optional and receive the world and the buffer being
+    processed, so that they can work on the buffer's arrays directly::
+
+        def create(world, buf, ndead):
+            n = ndead + 10
+            buf.emit(n, x=world.mousex, y=world.mousey,
+                     vx=numpy.random.uniform(-1, 2, n),
+                     vy=numpy.random.uniform(-1, 2, n),
+                     life=numpy.random.randint(20, 100, n),
+                     type=numpy.random.randint(0, 3, n))
+
+        def update(world, buf):
+            buf.vy += 0.05  # Apply gravity
+
+        engine = ArrayParticleEngine()
+        engine.createfunc = create
+        engine.updatefunc = update
+        world.add_system(engine)
+
+        emitter = sdl2.ext.Entity(world)
+        emitter.particlebuffer = ParticleBuffer(100000)
+
+    """
+    def __init__(self):
+        """Creates a new ArrayParticleEngine."""
+        super(ArrayParticleEngine, self).__init__()
+        self.componenttypes = (ParticleBuffer,)
+        self.decay = 1
+        self.step = 1
+        self._createfunc = None
+        self._deletefunc = None
+        self._updatefunc = None
+
+    def process(self, world, components):
+        """Processes all ParticleBuffer components."""
+        for buf in components:
+            count = len(buf)
+            if count:
+                life = buf.life
+                life -= self.decay
+                if self.step:
+                    x, y = buf.x, buf.y
+                    if self.step == 1:
+                        x += buf.vx
+                        y += buf.vy
+                    else:
+                        x += buf.vx * self.step
+                        y += buf.vy * self.step
+                dead = life <= 0
+                if self._deletefunc is not None:
+                    self._deletefunc(world, buf, dead)
+                ndead = buf.kill(dead)
+            else:
+                ndead = 0
+            if self._updatefunc is not None:
+                self._updatefunc(world, buf)
+            if self._createfunc is not None:
+                self._createfunc(world, buf, ndead)
+
+    @property
+    def createfunc(self):
+        """The function to be used for emitting new particles."""
+        return self._createfunc
+
+    @createfunc.setter
+    def createfunc(self, value):
+        if value is not None and not callable(value):
+            raise TypeError("createfunc must be callable")
+        self._createfunc = value
+
+    @property
+    def deletefunc(self):
+        """The function to be called for the dead particles."""
+        return self._deletefunc
+
+    @deletefunc.setter
+    def deletefunc(self, value):
+        if value is not None and not callable(value):
+            raise TypeError("deletefunc must be callable")
+        self._deletefunc = value
+
+    @property
+    def updatefunc(self):
+        """The function to be used for updating the living particles."""
+        return self._updatefunc
+
+    @updatefunc.setter
+    def updatefunc(self, value):
+        if value is not None and not callable(value):
+            raise TypeError("updatefunc must be callable")
+        self._updatefunc = value
+
@@ -1,9 +1,14 @@
+import sys
 import ctypes
+from numbers import Integral
 from .compat import UnsupportedError, experimental
 from .array import MemoryView
+from .. import pixels
 from ..surface import SDL_MUSTLOCK, SDL_LockSurface, SDL_UnlockSurface, \
-    SDL_Surface
-from ..stdinc import Uint8
+    SDL_Surface, SDL_CreateRGBSurfaceWithFormat, \
+    SDL_CreateRGBSurfaceWithFormatFrom
+from .err import raise_sdl_err
+from .color import Color
 from .draw import prepare_color
 from .sprite import SoftwareSprite
 from .surface import _get_target_surface
@@ -16,16 +21,34 @@ except ImportError:
 
 
 __all__ = [
-    "PixelView", "SurfaceArray", "pixels2d", "pixels3d", "surface_to_ndarray"
+    "PixelView", "SurfaceArray", "pixels2d", "pixels3d", "surface_to_ndarray",
+    "surface_from_buffer", "ndarray_to_surface", "PixelChannels",
+    "pixelchannels"
 ]
 
+# The ctypes types for pixels of a given size (in bytes)
+_PIXEL_TYPES = {1: ctypes.c_ubyte, 2: ctypes.c_ushort, 4: ctypes.c_uint}
+
+# The default surface formats for 2D arrays (by item size) and 3D arrays (by
+# number of channels) in ndarray_to_surface
+_DEFAULT_FORMATS_2D = {1: "INDEX8", 2: "RGB565", 4: "ARGB8888"}
+_DEFAULT_FORMATS_3D = {3: "RGB24", 4: "RGBA32"}
+
 class PixelView(MemoryView):
     """A 2D memory view for reading and writing SDL surface pixels.
 
     This class uses a ``view[y][x]`` layout, with the y-axis as the first
-    dimension and the x-axis as the second. ``PixelView`` objects currently do
-    not support array slicing, but support negative indexing as of
-    PySDL2 0.9.10.
+    dimension and the x-axis as the second. As of PySDL2 0.9.18, pixels can
+    also be accessed with ``view[y, x]``, and ``PixelView`` objects support
+    slicing (e.g. ``view[10:20, 5:15]`` for a rectangular area of the surface)
+    as well as assigning colors to multiple pixels at once::
+
+        view[0:10, 0:10] = Color(255, 0, 0)  # Fill an area with red
+        view[5] = [Color(0, 0, 0)] * width   # Set a row to black
+
+    Colors assigned to a view are converted to the pixel format of the
+    surface, except for raw data from bytes-like objects, which is copied
+    to the surface as-is.
 
     If the source surface is RLE-accelerated, it will be locked automatically
     when the view is created and you will need to re-lock the surface using
@@ -37,10 +60,11 @@ class PixelView(MemoryView):
        Python to hard-crash.
 
     .. note:: 
-       This class is implemented on top of the :class:`~sdl2.ext.MemoryView`
-       class. As such, it makes heavy use of recursion to access rows and
-       will generally be much slower than the :mod:`numpy`-based
-       :func:`~sdl2.ext.pixels2d` and :func:`~sdl2.ext.pixels3d` functions.
+       Although accessing individual pixels with a ``PixelView`` takes
+       constant time, it will generally be much slower than the
+       :mod:`numpy`-based :func:`~sdl2.ext.pixels2d` and
+       :func:`~sdl2.ext.pixels3d` functions for processing large numbers of
+       pixels.
 
     Args:
         source (:obj:`~sdl2.SDL_Surface`, :obj:`~sdl2.ext.SoftwareSprite`): The
@@ -67,37 +91,33 @@ class PixelView(MemoryView):
         if SDL_MUSTLOCK(self._surface):
             SDL_LockSurface(self._surface)
 
-        pxbuf = ctypes.cast(self._surface.pixels, ctypes.POINTER(Uint8))
+        pitch = self._surface.pitch
+        srcsize = self._surface.h * pitch
+        pxtype = _PIXEL_TYPES[itemsize] * (srcsize // itemsize)
+        pxbuf = pxtype.from_address(self._surface.pixels)
         strides = (self._surface.h, self._surface.w)
-        srcsize = self._surface.h * self._surface.pitch
         super(PixelView, self).__init__(pxbuf, itemsize, strides,
-                                        getfunc=self._getitem,
-                                        setfunc=self._setitem,
                                         srcsize=srcsize)
+        # Rows may be padded, so use the pitch to find the start of each row
+        self._steps = (pitch // itemsize, 1)
 
-    def _getitem(self, start, end):
-        if self.itemsize == 1:
-            # byte-wise access
-            return self.source[start:end]
-        # move the pointer to the correct location
-        src = ctypes.byref(self.source.contents, start)
-        casttype = ctypes.c_ubyte
-        if self.itemsize == 2:
-            casttype = ctypes.c_ushort
-        elif self.itemsize == 4:
-            casttype = ctypes.c_uint
-        return ctypes.cast(src, ctypes.POINTER(casttype)).contents.value
-
-    def _setitem(self, start, end, value):
-        target = None
-        if self.itemsize == 1:
-            target = ctypes.cast(self.source, ctypes.POINTER(ctypes.c_ubyte))
-        elif self.itemsize == 2:
-            target = ctypes.cast(self.source, ctypes.POINTER(ctypes.c_ushort))
-        elif self.itemsize == 4:
-            target = ctypes.cast(self.source, ctypes.POINTER(ctypes.c_uint))
+    def _getvalue(self, pos):
+        if self._mem is not None:
+            return self._mem[pos]
+        return self.source[pos]
+
+    def _setvalue(self, pos, value):
         value = prepare_color(value, self._surface)
-        target[start // self.itemsize] = value
+        if self._mem is not None:
+            self._mem[pos] = value
+        else:
+            self.source[pos] = value
+
+    def _assign(self, value):
+        if isinstance(value, (Color, Integral)):
+            self._fill(prepare_color(value, self._surface))
+        else:
+            super(PixelView, self)._assign(value)
 
 
 def _ndarray_prep(source, funcname, ndim):
@@ -196,11 +216,12 @@ def pixels3d(source, transpose=True):
     as the first dimension, contrary to PIL and PyOpenGL convention. To obtain 
     an ``arr[y][x]`` array, set the ``transpose`` argument to ``False``.
 
-    When creating a 3D array view, the order of the RGBA values for each pixel
-    may be reversed for some common surface pixel formats (e.g. 'BGRA' for a
-    ``SDL_PIXELFORMAT_ARGB8888`` surface). To correct this, you can call
-    ``numpy.flip(arr, axis=2)`` to return a view of the array with the expected
-    channel order.
+    The values for each pixel are returned in the order they are stored in
+    memory, which depends on both the pixel format of the surface and the byte
+    order of the system (e.g. 'BGRA' for a ``SDL_PIXELFORMAT_ARGB8888``
+    surface on little-endian systems). To access the color channels of a
+    surface by name regardless of its format, use
+    :func:`~sdl2.ext.pixelchannels` instead.
 
     .. warning::
        The source surface should not be freed or deleted until the array is no
@@ -237,6 +258,171 @@ def pixels3d(source, transpose=True):
     return arr.transpose(1, 0, 2) if transpose else arr
 
 
+def _channel_index(mask, bpp):
+    # Gets the byte offset of an 8-bit color channel within a pixel
+    if mask == 0:
+        return None
+    shift = 0
+    while not (mask >> shift) & 1:
+        shift += 1
+    if mask != 0xFF << shift or shift % 8:
+        return -1
+    index = shift // 8
+    return index if sys.byteorder == "little" else bpp - 1 - index
+
+
+def _channel_slice(arr, indices):
+    # Gets a view of the given channels of a 3D pixel array, or None if the
+    # channels aren't evenly spaced in memory
+    step = indices[1] - indices[0]
+    if step == 0:
+        return None
+    for i in range(1, len(indices)):
+        if indices[i] - indices[i - 1] != step:
+            return None
+    stop = indices[-1] + step
+    return arr[..., indices[0]:(stop if stop >= 0 else None):step]
+
+
+class PixelChannels(object):
+    """Named Numpy array views of the color channels of an SDL surface.
+
+    This class is returned by :func:`~sdl2.ext.pixelchannels` and should not
+    be created directly. Each channel view has the same layout as the arrays
+    returned by :func:`~sdl2.ext.pixels2d`, and provides read and write access
+    to the underlying surface.
+
+    Since the order of the channels in memory depends on both the pixel
+    format of the surface and the byte order of the system, the :attr:`rgb`
+    and :attr:`rgba` views are only available if the channels are evenly
+    spaced within each pixel (e.g. for ``ABGR8888`` or ``ARGB8888`` surfaces
+    on little-endian systems, which are stored as RGBA and BGRA in memory,
+    respectively). To access the channels of any surface in RGBA order
+    regardless, the :attr:`indices` can be used to index a
+    :func:`~sdl2.ext.pixels3d` array (which creates a copy)::
+
+        arr = sdl2.ext.pixels3d(surface)
+        rgba = arr[:, :, channels.indices]  # copy of the data in RGBA order
+        arr[:, :, channels.indices] = rgba  # write the data back
+
+    Attributes:
+        r (:obj:`numpy.ndarray`): A view of the red channel of each pixel.
+        g (:obj:`numpy.ndarray`): A view of the green channel of each pixel.
+        b (:obj:`numpy.ndarray`): A view of the blue channel of each pixel.
+        a (:obj:`numpy.ndarray`): A view of the alpha channel of each pixel,
+            or ``None`` if the surface has no alpha channel.
+        indices (tuple): The byte offsets of the red, green, blue, and (if
+            present) alpha channels within each pixel.
+        order (str): The order of the channels in memory (e.g. ``"BGRA"``),
+            using ``"X"`` for unused bytes.
+
+    """
+    def __init__(self, arr, indices):
+        self._arr = arr
+        self.indices = indices
+        self.r, self.g, self.b = [arr[..., i] for i in indices[:3]]
+        self.a = arr[..., indices[3]] if len(indices) == 4 else None
+        order = ["X"] * arr.shape[-1]
+        for name, i in zip("RGBA", indices):
+            order[i] = name
+        self.order = "".join(order)
+
+    def __repr__(self):
+        return "PixelChannels(order='{0}')".format(self.order)
+
+    @property
+    def rgb(self):
+        """:obj:`numpy.ndarray`: A 3D view of the pixels in RGB order.
+
+        Raises:
+            ValueError: If the channels of the surface cannot be viewed in
+                RGB order without copying.
+
+        """
+        view = _channel_slice(self._arr, self.indices[:3])
+        if view is None:
+            e = "The channels of '{0}' pixels cannot be viewed in RGB order."
+            raise ValueError(e.format(self.order))
+        return view
+
+    @property
+    def rgba(self):
+        """:obj:`numpy.ndarray`: A 3D view of the pixels in RGBA order.
+
+        Raises:
+            ValueError: If the surface has no alpha channel, or its channels
+                cannot be viewed in RGBA order without copying.
+
+        """
+        view = None
+        if self.a is not None:
+            view = _channel_slice(self._arr, self.indices)
+        if view is None:
+            e = "The channels of '{0}' pixels cannot be viewed in RGBA order."
+            raise ValueError(e.format(self.order))
+        return view
+
+
+def pixelchannels(source, transpose=True):
+    """Creates named Numpy array views of the color channels of an SDL surface.
+
+    Unlike the raw bytes returned by :func:`~sdl2.ext.pixels3d`, the views
+    returned by this function are based on the color masks of the surface's
+    pixel format and the byte order of the system, so that code working with
+    them behaves the same for any surface format with 8-bit color channels
+    (e.g. ``ARGB8888``, ``ABGR8888``, or ``RGB24``). No pixel data is copied,
+    so per-channel operations can be done directly on the surface::
+
+        ch = sdl2.ext.pixelchannels(surface)
+        ch.r[:] = ch.r // 2  # halve the red of every pixel
+        for c in (ch.r, ch.g, ch.b):
+            c[:] = c.astype(numpy.uint16) * ch.a // 255  # premultiply alpha
+
+    If the source surface is RLE-accelerated, it will be locked automatically
+    when the views are created and you will need to re-lock the surface using
+    :func:`SDL_UnlockSurface` once you are done with them.
+
+    .. warning::
+       The source surface should not be freed or deleted until the views are
+       no longer needed. Accessing the views for a freed surface will likely
+       cause Python to hard-crash.
+
+    .. note::
+       This function requires Numpy to be installed in the current Python
+       environment.
+
+    Args:
+        source (:obj:`~sdl2.SDL_Surface`, :obj:`~sdl2.ext.SoftwareSprite`): The
+            SDL surface for which to create channel views.
+        transpose (bool, optional): Whether the views should be transposed to
+            have ``arr[x][y]`` axes instead of ``arr[y][x]`` axes. Defaults to
+            ``True``.
+
+    Returns:
+        :obj:`~sdl2.ext.PixelChannels`: The named channel views for the surface.
+
+    Raises:
+        ValueError: If the surface's pixel format does not have 8-bit red,
+            green, and blue channels.
+
+    """
+    if not _HASNUMPY:
+        err = "'pixelchannels' requires Numpy, which could not be found."
+        raise UnsupportedError(err)
+    sf = _get_target_surface(source, argname="source")
+    fmt = sf.format.contents
+    bpp = fmt.BytesPerPixel
+    masks = (fmt.Rmask, fmt.Gmask, fmt.Bmask, fmt.Amask)
+    indices = [_channel_index(mask, bpp) for mask in masks]
+    if indices[3] is None:
+        indices.pop()
+    if None in indices or -1 in indices:
+        fmtname = pixels.SDL_GetPixelFormatName(fmt.format).decode("utf-8")
+        e = "Pixel format '{0}' does not have 8-bit color channels."
+        raise ValueError(e.format(fmtname))
+    return PixelChannels(pixels3d(source, transpose), tuple(indices))
+
+
 def surface_to_ndarray(source, ndim=3):
     """Returns a copy of an SDL surface as a Numpy array.
     
@@ -246,11 +432,12 @@ def surface_to_ndarray(source, ndim=3):
     original surface (or vice-versa). This function is also slightly safer,
     as it does not assume that the source surface has been kept in memory.
 
-    When creating a 3D array copy, the order of the RGBA values for each pixel
-    may be reversed for some common surface pixel formats (e.g. 'BGRA' for a
-    ``SDL_PIXELFORMAT_ARGB8888`` surface). To correct this, you can call
-    ``numpy.flip(arr, axis=2)`` to return a view of the array with the expected
-    channel order.
+    When creating a 3D array copy, the values for each pixel are returned in
+    the order they are stored in memory (e.g. 'BGRA' for a
+    ``SDL_PIXELFORMAT_ARGB8888`` surface on little-endian systems). The
+    :attr:`~sdl2.ext.PixelChannels.indices` of the surface's
+    :func:`~sdl2.ext.pixelchannels` can be used to reorder them (e.g.
+    ``arr[:, :, channels.indices]`` for RGBA order).
 
     .. note::
        Unlike :func:`~sdl2.ext.pixels2d` or :func:`~sdl2.ext.pixels3d`, this
@@ -293,6 +480,195 @@ def surface_to_ndarray(source, ndim=3):
     return numpy.copy(tmp)
 
 
+def _get_format(fmt):
+    # Validates a pixel format name or constant, returning the constant
+    if fmt not in pixels.NAME_MAP.keys() and fmt not in pixels.ALL_PIXELFORMATS:
+        e = "'{0}' is not a supported SDL pixel format."
+        raise ValueError(e.format(fmt))
+    fmt = fmt if type(fmt) == int else pixels.NAME_MAP[fmt]
+    if pixels.SDL_ISPIXELFORMAT_FOURCC(fmt) or pixels.SDL_BYTESPERPIXEL(fmt) < 1:
+        e = "Pixel formats must use between 1 and 4 bytes per pixel."
+        raise ValueError(e)
+    return fmt
+
+
+def surface_from_buffer(buf, size, fmt="ARGB8888", pitch=None, copy=False):
+    """Creates an SDL surface from the pixel data in a buffer.
+
+    The buffer can be any C-contiguous object supporting Python's buffer
+    protocol (e.g. a :obj:`bytearray`, a ``ctypes`` array, or a Numpy
+    array), and must contain the rows of pixels in the given pixel format
+    from top to bottom, each starting ``pitch`` bytes after the previous one.
+
+    By default, the returned surface shares its pixel data with the buffer
+    instead of copying it, meaning that changes to the buffer will be visible
+    in the surface (and vice versa) without any conversion. The surface keeps
+    a reference to the buffer so that the buffer isn't freed while the
+    surface is in use. If ``copy`` is ``True``, the pixel data is copied to a
+    new surface instead, which is required for read-only buffers (e.g.
+    :obj:`bytes`).
+
+    .. warning::
+       When sharing pixel data with the buffer, the reference to the buffer is
+       only kept by the returned Python object. The buffer may be freed if the
+       surface is used after the returned object has been deleted (e.g. when
+       only a pointer to the surface is kept).
+
+    Args:
+        buf: A C-contiguous object supporting the buffer protocol that
+            contains the pixel data for the surface.
+        size (tuple): The width and height (in pixels) of the surface.
+        fmt (str or int, optional): The name (e.g. ``"ARGB8888"``) or SDL
+            constant of the pixel format of the buffer. Defaults to
+            ``"ARGB8888"``.
+        pitch (int, optional): The number of bytes between the start of each
+            row in the buffer. Defaults to the width of the surface multiplied
+            by the bytes per pixel of the format (i.e. unpadded rows).
+        copy (bool, optional): Whether the returned surface should contain a
+            copy of the buffer's pixel data instead of sharing it. Defaults to
+            ``False``.
+
+    Returns:
+        :obj:`~sdl2.SDL_Surface`: A surface containing the buffer's pixels.
+
+    """
+    try:
+        w, h = [int(i) for i in size]
+    except (TypeError, ValueError):
+        raise TypeError("Surface size must be a tuple of two positive integers.")
+    if w < 1 or h < 1:
+        e = "Surface height and width must both be positive integers (got {0})."
+        raise ValueError(e.format(str(size)))
+    fmt = _get_format(fmt)
+    bpp = pixels.SDL_BYTESPERPIXEL(fmt)
+    rowsize = w * bpp
+    if pitch is None:
+        pitch = rowsize
+    elif pitch < rowsize:
+        e = "The pitch must be at least {0} bytes for the given size and format."
+        raise ValueError(e.format(rowsize))
+
+    try:
+        mem = memoryview(buf)
+    except TypeError:
+        raise TypeError("'buf' must be an object supporting the buffer protocol.")
+    if not mem.c_contiguous:
+        raise ValueError("The pixel data in the buffer must be C-contiguous.")
+    mem = mem.cast("B")
+    needed = pitch * (h - 1) + rowsize
+    if len(mem) < needed:
+        e = "The buffer is too small for the given surface size (need {0} bytes)."
+        raise ValueError(e.format(needed))
+
+    if copy:
+        sf = SDL_CreateRGBSurfaceWithFormat(0, w, h, bpp * 8, fmt)
+        if not sf:
+            raise_sdl_err("creating a surface for the buffer")
+        sf = sf.contents
+        dst = (ctypes.c_ubyte * (sf.pitch * h)).from_address(sf.pixels)
+        dst = memoryview(dst).cast("B")
+        if pitch == sf.pitch:
+            dst[:needed] = mem[:needed]
+        else:
+            for y in range(h):
+                start, dstart = (y * pitch, y * sf.pitch)
+                dst[dstart:dstart + rowsize] = mem[start:start + rowsize]
+        return sf
+
+    if mem.readonly:
+        e = "Surfaces can only share data with writable buffers (use copy=True)."
+        raise ValueError(e)
+    pxbuf = (ctypes.c_ubyte * needed).from_buffer(mem)
+    sf = SDL_CreateRGBSurfaceWithFormatFrom(pxbuf, w, h, bpp * 8, pitch, fmt)
+    if not sf:
+        raise_sdl_err("creating a surface from the buffer")
+    sf = sf.contents
+    # Keep a reference to the buffer, so it isn't GC'd with the surface in use
+    sf._pxbuf = pxbuf
+    return sf
+
+
+def ndarray_to_surface(arr, fmt=None, copy=False):
+    """Creates an SDL surface from the pixel data in a Numpy array.
+
+    This is the counterpart of :func:`~sdl2.ext.pixels2d` and
+    :func:`~sdl2.ext.pixels3d`: 2D arrays must contain unsigned integer color
+    values for each pixel in the surface, and 3D arrays must contain the
+    ``uint8`` values of each byte of each pixel. In both cases, arrays must
+    have the y-axis as the first dimension (e.g. ``arr[y][x]``). If not
+    specified, the pixel format of the surface is inferred from the shape and
+    type of the array:
+
+    ============================ ===================
+    Array                        Surface format
+    ============================ ===================
+    ``(h, w)``, ``uint8``        ``INDEX8``
+    ``(h, w)``, ``uint16``       ``RGB565``
+    ``(h, w)``, ``uint32``       ``ARGB8888``
+    ``(h, w, 3)``, ``uint8``     ``RGB24``
+    ``(h, w, 4)``, ``uint8``     ``RGBA32``
+    ============================ ===================
+
+    By default, the returned surface shares its pixel data with the array
+    instead of copying it (see :func:`~sdl2.ext.surface_from_buffer` for more
+    details), which requires the array to be C-contiguous and writable. If
+    ``copy`` is ``True``, the surface will contain a copy of the array's pixel
+    data instead.
+
+    .. note::
+       This function requires Numpy to be installed in the current Python
+       environment.
+
+    Args:
+        arr (:obj:`numpy.ndarray`): The array to convert to an SDL surface.
+        fmt (str or int, optional): The name (e.g. ``"ARGB8888"``) or SDL
+            constant of the pixel format of the array data. Defaults to
+            inferring the format from the array.
+        copy (bool, optional): Whether the returned surface should contain a
+            copy of the array's pixel data instead of sharing it. Defaults to
+            ``False``.
+
+    Returns:
+        :obj:`~sdl2.SDL_Surface`: A surface containing the array's pixels.
+
+    """
+    if not _HASNUMPY:
+        err = "'ndarray_to_surface' requires Numpy, which could not be found."
+        raise UnsupportedError(err)
+    if not isinstance(arr, numpy.ndarray):
+        raise TypeError("'arr' must be a Numpy array.")
+    if arr.dtype.kind != "u":
+        e = "Arrays must contain unsigned integer pixel data (got '{0}')."
+        raise TypeError(e.format(arr.dtype))
+    if arr.ndim == 2:
+        bpp = arr.dtype.itemsize
+        default = _DEFAULT_FORMATS_2D.get(bpp)
+    elif arr.ndim == 3 and arr.dtype.itemsize == 1:
+        bpp = arr.shape[2]
+        default = _DEFAULT_FORMATS_3D.get(bpp)
+    else:
+        e = "Arrays must be either 2D or 3D with 'uint8' values (got {0}D {1})."
+        raise ValueError(e.format(arr.ndim, arr.dtype))
+    if fmt is None:
+        if default is None:
+            e = "No default pixel format for arrays of shape {0} and type {1}."
+            raise ValueError(e.format(arr.shape, arr.dtype))
+        fmt = default
+    fmt = _get_format(fmt)
+    if pixels.SDL_BYTESPERPIXEL(fmt) != bpp:
+        e = "The array does not match the pixel format ({0} bytes per pixel)."
+        raise ValueError(e.format(pixels.SDL_BYTESPERPIXEL(fmt)))
+
+    if not (arr.flags.c_contiguous and arr.dtype.isnative):
+        if not copy:
+            e = "Surfaces can only share data with C-contiguous arrays in "
+            e += "native byte order (use copy=True)."
+            raise ValueError(e)
+        arr = numpy.ascontiguousarray(arr, arr.dtype.newbyteorder("="))
+    h, w = arr.shape[:2]
+    return surface_from_buffer(arr, (w, h), fmt, copy=copy)
+
+
 class SurfaceArray(numpy.ndarray if _HASNUMPY else object):
     """A Numpy array that keeps a reference to its parent SDL surface.
 
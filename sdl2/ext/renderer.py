@@ -1,16 +1,34 @@
-from ctypes import byref, c_int, c_float
-
-from .. import blendmode, surface, rect, video, render, error, dll, hints
+import sys
+import math
+import weakref
+from array import array
+from contextlib import contextmanager
+from ctypes import (byref, c_int, c_float, c_ubyte, c_char_p, c_void_p,
+    addressof, memmove, sizeof, cast, POINTER, Array)
+
+from .. import (blendmode, surface, rect, video, render, error, dll, hints,
+    pixels)
+from ..pixels import SDL_Color
 from ..stdinc import Uint8, Uint32
 
-from .color import convert_to_color
+from .color import Color, convert_to_color
 from .err import raise_sdl_err
-from .compat import deprecated, stringify, byteify, isiterable
+from .compat import (deprecated, stringify, byteify, isiterable,
+    UnsupportedError)
 from .sprite import SoftwareSprite, TextureSprite
 from .surface import _get_target_surface
 from .window import Window
 
-__all__ = ["set_texture_scale_quality", "Renderer", "Texture"]
+try:
+    import numpy
+    _HASNUMPY = True
+except ImportError:
+    _HASNUMPY = False
+
+__all__ = [
+    "set_texture_scale_quality", "Renderer", "Texture", "StreamingTexture",
+    "SpriteBatch", "QuadRenderer",
+]
 
 
 # NOTE: The following 3 utility functions probably belong in a separate module
@@ -35,6 +53,13 @@ def _is_rect(x):
         return True
     return False
 
+def _is_color(x):
+    if type(x).__name__ in ("Color", "SDL_Color") or is_numeric(x):
+        return True
+    if isinstance(x, (tuple, list)) and len(x) in (3, 4):
+        return all([is_numeric(v) for v in x])
+    return False
+
 def _sanitize_points(points):
     # If first item is numeric, assume flat list of points
     if isinstance(points, rect.SDL_Point) or isinstance(points, rect.SDL_FPoint):
@@ -87,6 +112,191 @@ def _sanitize_rects(rects):
     return out
 
 
+if dll.version < 2010:
+    _Point, _Rect = rect.SDL_Point, rect.SDL_Rect
+else:
+    _Point, _Rect = rect.SDL_FPoint, rect.SDL_FRect
+
+# Marker for cached renderer state that needs to be re-read from SDL
+_STALE = object()
+
+# Identifiers for the types of draw commands supported by Renderer.flush
+_CLEAR, _COPY, _FILL, _RECT, _POINT, _LINE = range(6)
+
+
+_NATIVE_ORDER = "<" if sys.byteorder == "little" else ">"
+
+
+def _packed_array(data, itemtype, ncomp):
+    # Casts packed (N, ncomp) buffer data to a ctypes array without copying.
+    # Returns None if the data is not in a supported buffer format.
+    if isinstance(data, Array) and data._type_ == itemtype:
+        return data
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return None
+    if "T{" in view.format:
+        return None  # ctypes structures also implement the buffer protocol
+    if view.ndim > 2 or (view.ndim == 2 and view.shape[1] != ncomp):
+        e = "Coordinate arrays must have a shape of (N, {0}) (got {1})"
+        raise ValueError(e.format(ncomp, view.shape))
+    fmt = "i" if itemtype in (rect.SDL_Point, rect.SDL_Rect) else "f"
+    if view.format.lstrip("@=" + _NATIVE_ORDER) != fmt or not view.c_contiguous:
+        if _HASNUMPY and isinstance(data, numpy.ndarray):
+            # Convert unsupported dtypes/layouts using a single vectorized copy
+            dtype = numpy.int32 if fmt == "i" else numpy.float32
+            data = numpy.ascontiguousarray(data, dtype=dtype)
+            view = memoryview(data)
+        else:
+            return None
+    if view.nbytes % sizeof(itemtype) != 0:
+        e = "Coordinate arrays must contain a multiple of {0} values."
+        raise ValueError(e.format(ncomp))
+    count = view.nbytes // sizeof(itemtype)
+    if view.readonly:
+        return (itemtype * count).from_buffer_copy(view)
+    return (itemtype * count).from_buffer(view)
+
+
+def _get_primitive_funcs():
+    # Maps each primitive draw command to its SDL function & item type
+    if dll.version < 2010:
+        return {
+            _FILL: (render.SDL_RenderFillRects, _Rect),
+            _RECT: (render.SDL_RenderDrawRects, _Rect),
+            _POINT: (render.SDL_RenderDrawPoints, _Point),
+            _LINE: (render.SDL_RenderDrawLines, _Point),
+        }
+    return {
+        _FILL: (render.SDL_RenderFillRectsF, _Rect),
+        _RECT: (render.SDL_RenderDrawRectsF, _Rect),
+        _POINT: (render.SDL_RenderDrawPointsF, _Point),
+        _LINE: (render.SDL_RenderDrawLinesF, _Point),
+    }
+
+
+def _snapshot_color(color):
+    # Copies a color so later changes to it don't affect recorded commands
+    return Color(color.r, color.g, color.b, color.a)
+
+
+class _DrawBuffer(object):
+    """Packed storage for the deferred draw commands of a :obj:`Renderer`.
+
+    The coordinates of all recorded primitives are copied into a single
+    preallocated byte buffer, which is grown as needed but never shrunk so
+    that it can be reused between frames. Consecutive primitives of the same
+    type and color are merged into a single command so that they can be
+    replayed with a single SDL call.
+
+    """
+    def __init__(self, color, capacity=16384):
+        self.color = color
+        self.commands = []
+        self._data = (c_ubyte * capacity)()
+        self._used = 0
+
+    def _reserve(self, nbytes):
+        offset = self._used
+        needed = offset + nbytes
+        capacity = len(self._data)
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            data = (c_ubyte * capacity)()
+            memmove(data, self._data, offset)
+            self._data = data
+        self._used = needed
+        return offset
+
+    def add_primitives(self, op, color, items, count):
+        """Records a packed ``ctypes`` array of points or rectangles."""
+        itemsize = sizeof(items) // len(items)
+        last = self.commands[-1] if len(self.commands) else None
+        mergeable = (
+            last is not None and last[0] == op and last[1] == color and
+            last[2] + last[3] * itemsize == self._used
+        )
+        if mergeable and op == _LINE:
+            # Lines can only be merged if they continue the previous path
+            prev = _Point.from_address(addressof(self._data) + self._used - itemsize)
+            first = items[0]
+            if prev.x == first.x and prev.y == first.y:
+                offset = self._reserve((count - 1) * itemsize)
+                src = addressof(items) + itemsize
+                memmove(addressof(self._data) + offset, src, (count - 1) * itemsize)
+                last[3] += count - 1
+                return
+        elif mergeable:
+            offset = self._reserve(count * itemsize)
+            memmove(addressof(self._data) + offset, items, count * itemsize)
+            last[3] += count
+            return
+        offset = self._reserve(count * itemsize)
+        memmove(addressof(self._data) + offset, items, count * itemsize)
+        self.commands.append([op, _snapshot_color(color), offset, count])
+
+    def add_copy(self, src, args):
+        """Records a texture copy, keeping a reference to the source."""
+        self.commands.append([_COPY, None, src, args])
+
+    def add_clear(self, color):
+        """Records a clear of the entire rendering context."""
+        self.commands.append([_CLEAR, _snapshot_color(color), 0, 0])
+
+    def reset(self):
+        """Discards all recorded commands while keeping the buffer memory."""
+        self.commands = []
+        self._used = 0
+
+    def replay(self, sdlrenderer, current=None):
+        """Submits all recorded commands to a given SDL renderer.
+
+        Returns the draw color of the renderer after replaying, given its
+        ``current`` color beforehand (or None if unknown).
+
+        """
+        funcs = _get_primitive_funcs()
+        copy_func = render.SDL_RenderCopyEx
+        if dll.version >= 2010:
+            copy_func = render.SDL_RenderCopyExF
+        set_color = render.SDL_SetRenderDrawColor
+        base = addressof(self._data)
+        try:
+            for op, color, a, b in self.commands:
+                if op == _COPY:
+                    ret = copy_func(sdlrenderer, *b)
+                    if ret < 0:
+                        raise_sdl_err("copying the texture to the rendering context")
+                    continue
+                if current is None or color != current:
+                    ret = set_color(sdlrenderer, color.r, color.g, color.b, color.a)
+                    if ret < 0:
+                        raise_sdl_err("setting the drawing color of the renderer")
+                    current = color
+                if op == _CLEAR:
+                    ret = render.SDL_RenderClear(sdlrenderer)
+                else:
+                    draw, itemtype = funcs[op]
+                    items = (itemtype * b).from_address(base + a)
+                    ret = draw(sdlrenderer, items, b)
+                if ret < 0:
+                    raise_sdl_err("replaying the deferred draw commands")
+        finally:
+            self.reset()
+        return current
+
+
+def _offset_srcrect(region, srcrect=None):
+    # Maps a source rect relative to a texture region to the full texture
+    rx, ry, rw, rh = region.x, region.y, region.w, region.h
+    if not srcrect:
+        return (rx, ry, rw, rh)
+    x, y, w, h = _sanitize_rects([srcrect])[0]
+    return (rx + x, ry + y, w, h)
+
+
 def _get_texture_size(texture):
     flags = Uint32()
     access, w, h = (c_int(), c_int(), c_int())
@@ -98,6 +308,202 @@ def _get_texture_size(texture):
     return (w.value, h.value)
 
 
+def _get_texture(src):
+    # Gets the SDL texture and its size for a given texture-like object
+    if isinstance(src, TextureSprite):
+        # Sprites using a region of a larger texture report the full size
+        return src.texture, getattr(src, "texture_size", src.size)
+    elif isinstance(src, Texture):
+        return src.tx, src.size
+    elif isinstance(src, render.SDL_Texture):
+        return src, _get_texture_size(src)
+    elif "SDL_Texture" in str(type(src)):
+        return src, _get_texture_size(src)
+    raise TypeError("src must be a Texture object or an SDL_Texture")
+
+
+def _texture_key(texture):
+    # Gets a hashable key identifying an SDL_Texture or SDL_Texture pointer
+    if isinstance(texture, render.SDL_Texture):
+        return addressof(texture)
+    return addressof(texture.contents)
+
+
+def _vertex_attrib(data, ncomp, fmt, argname):
+    # Gets the address, byte stride, and vertex count of a per-vertex attribute
+    # array, along with the object that needs to be kept alive during use
+    if _HASNUMPY and isinstance(data, numpy.ndarray):
+        dtype = numpy.uint8 if fmt == "B" else numpy.float32
+        if data.ndim == 1:
+            data = data.reshape(-1, ncomp)
+        if data.ndim != 2 or data.shape[1] != ncomp:
+            e = "'{0}' must have a shape of (N, {1}) (got {2})"
+            raise ValueError(e.format(argname, ncomp, data.shape))
+        if data.dtype != dtype or data.strides[1] != data.itemsize or \
+                data.strides[0] < 0:
+            data = numpy.ascontiguousarray(data, dtype=dtype)
+        return (data.ctypes.data, data.strides[0], data.shape[0], data)
+    if isinstance(data, array):
+        return _array_attrib(data, ncomp, fmt, argname)
+    try:
+        view = memoryview(data)
+    except TypeError:
+        # Fall back to packing Python sequences (slow, but convenient)
+        flat = []
+        for item in data:
+            if len(item) != ncomp:
+                e = "Each item in '{0}' must have {1} values (got {2})"
+                raise ValueError(e.format(argname, ncomp, str(item)))
+            flat.extend(item)
+        return _array_attrib(array(fmt, flat), ncomp, fmt, argname)
+    if view.format.lstrip("@=" + _NATIVE_ORDER) != fmt or not view.c_contiguous:
+        e = "'{0}' must be a contiguous buffer of type '{1}' (got '{2}')"
+        raise ValueError(e.format(argname, fmt, view.format))
+    stride = ncomp * view.itemsize
+    if view.nbytes % stride != 0:
+        e = "'{0}' must contain a multiple of {1} values."
+        raise ValueError(e.format(argname, ncomp))
+    if view.readonly:
+        buf = (c_ubyte * view.nbytes).from_buffer_copy(view)
+    else:
+        buf = (c_ubyte * view.nbytes).from_buffer(view)
+    return (addressof(buf), stride, view.nbytes // stride, buf)
+
+
+def _array_attrib(data, ncomp, fmt, argname):
+    # Gets the vertex attribute info for an array.array, using its address
+    # directly since memoryviews of arrays aren't supported on Python 2
+    if data.typecode != fmt:
+        e = "'{0}' must be a contiguous buffer of type '{1}' (got '{2}')"
+        raise ValueError(e.format(argname, fmt, data.typecode))
+    if len(data) % ncomp != 0:
+        e = "'{0}' must contain a multiple of {1} values."
+        raise ValueError(e.format(argname, ncomp))
+    addr = data.buffer_info()[0]
+    return (addr, ncomp * data.itemsize, len(data) // ncomp, data)
+
+
+def _array_indices(indices):
+    # Gets the vertex index info for an array.array (see _array_attrib)
+    if indices.typecode not in "bBhHiIlL" or indices.itemsize not in (1, 2, 4):
+        e = "'indices' must contain 8, 16, or 32-bit integers (got '{0}')"
+        raise ValueError(e.format(indices.typecode))
+    addr = indices.buffer_info()[0]
+    return (addr, len(indices), indices.itemsize, indices)
+
+
+def _index_array(indices):
+    # Gets the address, count, and item size of a vertex index array, along
+    # with the object that needs to be kept alive during use
+    if _HASNUMPY and isinstance(indices, numpy.ndarray):
+        if indices.dtype.itemsize not in (1, 2, 4) or \
+                indices.dtype.kind not in "iu" or not indices.flags.c_contiguous:
+            indices = numpy.ascontiguousarray(indices, dtype=numpy.uint32)
+        return (indices.ctypes.data, indices.size, indices.itemsize, indices)
+    if isinstance(indices, array):
+        return _array_indices(indices)
+    try:
+        view = memoryview(indices)
+    except TypeError:
+        return _array_indices(array("I", indices))
+    fmt = view.format.lstrip("@=" + _NATIVE_ORDER)
+    if fmt not in "bBhHiIlL" or view.itemsize not in (1, 2, 4):
+        e = "'indices' must contain 8, 16, or 32-bit integers (got '{0}')"
+        raise ValueError(e.format(view.format))
+    if not view.c_contiguous:
+        raise ValueError("'indices' must be a contiguous buffer")
+    count = view.nbytes // view.itemsize
+    if view.readonly:
+        buf = (c_ubyte * view.nbytes).from_buffer_copy(view)
+    else:
+        buf = (c_ubyte * view.nbytes).from_buffer(view)
+    return (addressof(buf), count, view.itemsize, buf)
+
+
+def _get_renderer_ref(renderer):
+    # Gets the shared (nullable) reference to the SDL renderer of a Renderer
+    if isinstance(renderer, Renderer):
+        return renderer._renderer_ref
+    elif hasattr(renderer, "contents"):
+        if isinstance(renderer.contents, render.SDL_Renderer):
+            return [renderer]
+    raise TypeError(
+        "'renderer' must be a valid Renderer object or a pointer to "
+        "an SDL_Renderer."
+    )
+
+
+def _get_pixel_format(fmt):
+    # Validates a pixel format name or constant, returning the constant
+    if fmt not in pixels.NAME_MAP.keys() and fmt not in pixels.ALL_PIXELFORMATS:
+        e = "'{0}' is not a supported SDL pixel format."
+        raise ValueError(e.format(fmt))
+    fmt = fmt if type(fmt) == int else pixels.NAME_MAP[fmt]
+    if pixels.SDL_ISPIXELFORMAT_FOURCC(fmt) or \
+            pixels.SDL_ISPIXELFORMAT_INDEXED(fmt):
+        raise ValueError("Indexed and YUV pixel formats are not supported.")
+    return fmt
+
+
+def _pixel_view(addr, size, pitch, bpp, keepalive=None):
+    # Creates a writable view of a block of pixel memory: a (h, w) Numpy array
+    # (or (h, w, 3) for 24-bit formats) if available, otherwise a flat
+    # memoryview of the raw bytes
+    w, h = size
+    if _HASNUMPY:
+        nbytes = pitch * (h - 1) + w * bpp
+        buf = (c_ubyte * nbytes).from_address(addr)
+        buf._keepalive = keepalive
+        if bpp == 3:
+            shape, strides = (h, w, 3), (pitch, 3, 1)
+            dtype = numpy.uint8
+        else:
+            shape, strides = (h, w), (pitch, bpp)
+            dtype = {1: numpy.uint8, 2: numpy.uint16, 4: numpy.uint32}[bpp]
+        return numpy.ndarray(shape, dtype, buf, 0, strides)
+    buf = (c_ubyte * (pitch * h)).from_address(addr)
+    buf._keepalive = keepalive
+    view = memoryview(buf)
+    if hasattr(view, "cast"):
+        view = view.cast("B")  # ctypes arrays are '<B' by default
+    return view
+
+
+def _pixel_data(data, bpp, pitch=None):
+    # Gets the address, row pitch, (w, h) size (None if unknown), and total
+    # bytes of a block of pixel data, along with the object that needs to be
+    # kept alive during use. Numpy arrays must have a shape of (h, w) or
+    # (h, w, channels).
+    if _HASNUMPY and isinstance(data, numpy.ndarray):
+        if data.ndim not in (2, 3) or data.itemsize * (
+                data.shape[2] if data.ndim == 3 else 1) != bpp:
+            e = "Pixel arrays must have a shape of (h, w) or (h, w, {0}) and "
+            e += "{1} bytes per pixel (got shape {2} with dtype '{3}')"
+            raise ValueError(e.format(bpp, bpp, data.shape, data.dtype))
+        inner = data.strides[1:] == ((bpp, data.itemsize) if data.ndim == 3
+                                     else (bpp, ))
+        if not inner or data.strides[0] < data.shape[1] * bpp:
+            data = numpy.ascontiguousarray(data)
+        size = (data.shape[1], data.shape[0])
+        return (data.ctypes.data, data.strides[0], size, data.nbytes, data)
+    try:
+        view = memoryview(data)
+    except TypeError:
+        raise TypeError("Pixel data must be an SDL surface or a buffer.")
+    if not view.c_contiguous:
+        raise ValueError("Pixel buffers must be contiguous.")
+    if isinstance(data, bytes):
+        # Pass immutable bytes objects to SDL directly instead of copying
+        buf = c_char_p(data)
+        addr = cast(buf, c_void_p).value
+    elif view.readonly:
+        buf = (c_ubyte * view.nbytes).from_buffer_copy(view)
+        addr = addressof(buf)
+    else:
+        buf = (c_ubyte * view.nbytes).from_buffer(view)
+        addr = addressof(buf)
+    return (addr, pitch, None, view.nbytes, buf)
+
 
 def set_texture_scale_quality(method):
     """Sets the default scaling quailty for :obj:`~sdl2.ext.Texture` objects.
@@ -151,17 +557,10 @@ class Texture(object):
     """
     def __init__(self, renderer, surface):
         # Validate and get reference to the parent renderer
-        self._renderer_ref = None
+        self._renderer_ref = _get_renderer_ref(renderer)
+        self._parent = None
         if isinstance(renderer, Renderer):
-            self._renderer_ref = renderer._renderer_ref
-        elif hasattr(renderer, "contents"):
-            if isinstance(renderer.contents, render.SDL_Renderer):
-                self._renderer_ref = [renderer]
-        if self._renderer_ref is None:
-            raise TypeError(
-                "'renderer' must be a valid Renderer object or a pointer to "
-                "an SDL_Renderer."
-            )
+            self._parent = weakref.ref(renderer)
         # Convert the passed surface into a texture
         surface = _get_target_surface(surface, "surface")
         self._tx = render.SDL_CreateTextureFromSurface(self._renderer, surface)
@@ -184,6 +583,12 @@ class Texture(object):
         # child textures to avoid any memory-unsafe behaviour.
         return self._renderer_ref[0]
 
+    def _flush_parent(self):
+        # Submits any deferred draw calls of the parent renderer
+        parent = self._parent() if self._parent else None
+        if parent is not None:
+            parent._flush_pending()
+
     @property
     def tx(self):
         """:obj:`~sdl2.SDL_Texture`: The underlying base SDL texture object.
@@ -217,6 +622,8 @@ class Texture(object):
 
         """
         if self._tx and self._renderer_ref[0]:
+            # Deferred copies of the texture need to be drawn before it's freed
+            self._flush_parent()
             render.SDL_DestroyTexture(self._tx)
             self._tx = None
 
@@ -280,6 +687,246 @@ class Texture(object):
 
 
 
+class StreamingTexture(Texture):
+    """A 2D texture with pixels that can be updated quickly and repeatedly.
+
+    Unlike regular :obj:`~sdl2.ext.Texture` objects, which are created once
+    from a surface and cannot be modified afterwards, streaming textures are
+    designed to have their contents updated every frame (e.g. for video
+    frames, emulators, or procedurally-generated images). Pixel data can be
+    uploaded to a streaming texture in two ways: by passing a Numpy array,
+    a bytes-like object, or an SDL surface to :meth:`update`, or by writing
+    to the texture memory directly within a :meth:`lock` block::
+
+       tx = StreamingTexture(renderer, (320, 240))
+       tx.update(frame)  # e.g. a (240, 320) uint32 Numpy array
+       with tx.lock((0, 0, 32, 32)) as px:
+           px[:, :] = 0xFFFF0000  # make the top-left corner red
+
+    Neither method allocates any new pixel memory, provided that the
+    source data is already in the same pixel format and memory layout as the
+    texture.
+
+    Args:
+        renderer (:obj:`~sdl2.ext.Renderer`): The renderer associated with the
+            texture.
+        size (tuple): The width and height (in pixels) of the texture.
+        fmt (str or int, optional): The name (e.g. ``"ARGB8888"``) or SDL
+            constant (e.g. ``SDL_PIXELFORMAT_ARGB8888``) of the pixel format
+            to use for the texture. Defaults to ``"ARGB8888"``. Indexed and
+            YUV pixel formats are not supported.
+
+    """
+    def __init__(self, renderer, size, fmt="ARGB8888"):
+        self._renderer_ref = _get_renderer_ref(renderer)
+        self._parent = None
+        if isinstance(renderer, Renderer):
+            self._parent = weakref.ref(renderer)
+        if not isiterable(size) or len(size) != 2:
+            raise TypeError("Texture size must be a tuple of two integers.")
+        if not all([i > 0 and int(i) == i for i in size]):
+            e = "Texture width and height must be positive integers (got {0})."
+            raise ValueError(e.format(str(size)))
+        fmt = _get_pixel_format(fmt)
+        w, h = int(size[0]), int(size[1])
+        self._tx = render.SDL_CreateTexture(
+            self._renderer, fmt, render.SDL_TEXTUREACCESS_STREAMING, w, h
+        )
+        if not self._tx:
+            raise_sdl_err("creating the streaming texture")
+        if pixels.SDL_ISPIXELFORMAT_ALPHA(fmt):
+            # Match the default blending of textures created from surfaces
+            render.SDL_SetTextureBlendMode(self._tx, blendmode.SDL_BLENDMODE_BLEND)
+        self._size = (w, h)
+        self._format = fmt
+        self._bpp = pixels.SDL_BYTESPERPIXEL(fmt)
+        self._locked = False
+
+    def destroy(self):
+        """Deletes the texture and frees its associated memory.
+
+        After being destroyed, a texture can no longer be used.
+
+        """
+        if self._tx and self._renderer_ref[0] and self._locked:
+            render.SDL_UnlockTexture(self._tx)
+            self._locked = False
+        super(StreamingTexture, self).destroy()
+
+    @property
+    def format(self):
+        """int: The SDL pixel format constant for the texture."""
+        return self._format
+
+    def _get_rect(self, area):
+        # Validates a texture region, returning the full texture if None
+        w, h = self.size
+        if area is None:
+            return rect.SDL_Rect(0, 0, w, h)
+        if not _is_rect(area):
+            raise TypeError("Texture regions must be (x, y, w, h) rects.")
+        x, y, rw, rh = [int(v) for v in _sanitize_rects([area])[0]]
+        if x < 0 or y < 0 or rw < 1 or rh < 1 or x + rw > w or y + rh > h:
+            e = "Region {0} is not within the bounds of the texture ({1}x{2})."
+            raise ValueError(e.format(str(area), w, h))
+        return rect.SDL_Rect(x, y, rw, rh)
+
+    def _pre_update(self):
+        # Makes sure any deferred draw calls using the texture are submitted
+        # before its pixels change
+        if self._locked:
+            raise RuntimeError("Cannot update a texture while it is locked.")
+        self._flush_parent()
+
+    def _lock(self, r):
+        self._pre_update()
+        px = c_void_p()
+        pitch = c_int()
+        ret = render.SDL_LockTexture(self.tx, r, byref(px), byref(pitch))
+        if ret < 0:
+            raise_sdl_err("locking the texture")
+        self._locked = True
+        return (px.value, pitch.value)
+
+    def _unlock(self):
+        if self._locked:
+            render.SDL_UnlockTexture(self.tx)
+            self._locked = False
+
+    def update(self, data, area=None, pitch=None):
+        """Uploads new pixel data to the texture.
+
+        The pixel data can be a Numpy array with a shape of ``(h, w)`` or
+        ``(h, w, channels)`` (i.e. indexed with ``arr[y][x]``), a bytes-like
+        object, or an SDL surface. For best performance, the data should be
+        in the same pixel format as the texture: surfaces in other formats
+        will be converted automatically, but Numpy arrays and bytes will be
+        copied as-is.
+
+        To update only part of the texture (e.g. a 'dirty' rectangle that
+        has changed since the last frame), an area can be specified. In this
+        case, the pixel data may either be the same size as the full texture
+        (in which case only the pixels within the given area will be copied)
+        or the same size as the area itself.
+
+        Args:
+            data: A Numpy array, bytes-like object, or
+                :obj:`~sdl2.SDL_Surface` containing the new pixel data.
+            area (tuple, optional): The ``(x, y, w, h)`` region of the texture
+                to update. Defaults to updating the whole texture.
+            pitch (int, optional): The number of bytes per row of pixels for
+                bytes-like data. Defaults to the width of the full texture (or
+                of the given area) times the bytes per pixel of the format.
+                Ignored for Numpy arrays and surfaces.
+
+        """
+        r = self._get_rect(area)
+        bpp = self._bpp
+        if isinstance(data, (surface.SDL_Surface, SoftwareSprite)) or (
+                hasattr(data, "contents") and
+                isinstance(data.contents, surface.SDL_Surface)):
+            self._update_from_surface(data, r)
+            return
+        addr, row_pitch, size, nbytes, buf = _pixel_data(data, bpp, pitch)
+        if size is None:
+            # For raw buffers, infer whether the data is for the texture or area
+            for w, h in ((r.w, r.h), self.size):
+                row_pitch = w * bpp if pitch is None else pitch
+                if nbytes >= row_pitch * (h - 1) + w * bpp:
+                    if pitch is not None or nbytes == row_pitch * h:
+                        size = (w, h)
+                        break
+        if size == (r.w, r.h):
+            offset = 0
+        elif size is not None and size[0] >= r.x + r.w and size[1] >= r.y + r.h:
+            offset = r.y * row_pitch + r.x * bpp
+        else:
+            e = "Pixel data does not match the size of the texture or region"
+            raise ValueError(e + " being updated.")
+        self._pre_update()
+        ret = render.SDL_UpdateTexture(self.tx, r, addr + offset, row_pitch)
+        if ret < 0:
+            raise_sdl_err("updating the texture")
+
+    def _update_from_surface(self, source, r):
+        sf = _get_target_surface(source, "data")
+        if (sf.w, sf.h) == (r.w, r.h):
+            x, y = (0, 0)
+        elif sf.w >= r.x + r.w and sf.h >= r.y + r.h:
+            x, y = (r.x, r.y)
+        else:
+            e = "Surface size does not match the size of the texture or region"
+            raise ValueError(e + " being updated.")
+        if surface.SDL_MUSTLOCK(sf):
+            surface.SDL_LockSurface(sf)
+        try:
+            fmt = sf.format.contents
+            src = sf.pixels + y * sf.pitch + x * fmt.BytesPerPixel
+            if fmt.format == self._format:
+                self._pre_update()
+                ret = render.SDL_UpdateTexture(self.tx, r, src, sf.pitch)
+            else:
+                # Convert directly into the texture memory to avoid copying
+                dst, pitch = self._lock(r)
+                try:
+                    ret = surface.SDL_ConvertPixels(
+                        r.w, r.h, fmt.format, src, sf.pitch,
+                        self._format, dst, pitch
+                    )
+                finally:
+                    self._unlock()
+        finally:
+            if surface.SDL_MUSTLOCK(sf):
+                surface.SDL_UnlockSurface(sf)
+        if ret < 0:
+            raise_sdl_err("updating the texture from the surface")
+
+    @contextmanager
+    def lock(self, area=None):
+        """Locks the texture (or part of it) for direct pixel access.
+
+        This method is meant to be used as a context manager, providing a
+        writable view of the texture's pixel memory that is uploaded when the
+        ``with`` block exits::
+
+           with tx.lock() as px:
+               px[10:20, 10:20] = 0xFF00FF00
+
+        If Numpy is available, the view is a Numpy array indexed with
+        ``arr[y][x]``, with a shape of ``(h, w)`` and one integer per pixel
+        (or ``(h, w, 3)`` bytes for 24-bit formats). Otherwise, the view is a
+        flat :obj:`memoryview` of the raw pixel bytes with a length of
+        ``pitch * h``, where ``pitch`` is the number of bytes per row of the
+        locked area (i.e. ``len(view) // h``).
+
+        Note that the locked pixels are write-only: their initial contents
+        are undefined, so every pixel in the locked area should be written.
+        The view must not be used after the ``with`` block exits.
+
+        Args:
+            area (tuple, optional): The ``(x, y, w, h)`` region of the texture
+                to lock. Defaults to locking the whole texture.
+
+        Yields:
+            :obj:`numpy.ndarray` or :obj:`memoryview`: A writable view of the
+            locked pixels.
+
+        """
+        r = self._get_rect(area)
+        addr, pitch = self._lock(r)
+        view = None
+        try:
+            view = _pixel_view(addr, (r.w, r.h), pitch, self._bpp)
+            yield view
+        finally:
+            self._unlock()
+            if isinstance(view, memoryview) and hasattr(view, "release"):
+                try:
+                    view.release()
+                except BufferError:
+                    pass  # view has been exported elsewhere, can't release
+
+
 class Renderer(object):
     """A rendering context for SDL2 windows and sprites.
 
@@ -344,6 +991,9 @@ class Renderer(object):
     def __init__(self, target, backend=-1, logical_size=None,
                  flags=render.SDL_RENDERER_ACCELERATED):
         self._renderer_ref = None
+        self._cmdbuffer = None
+        self._readbuf = None
+        self._target = None
         self.rendertarget = None
 
         available = self._get_render_drivers()
@@ -383,6 +1033,7 @@ class Renderer(object):
         self._renderer_ref = [_renderer]
 
         self.rendertarget = target
+        self.resync()
         self.color = (0, 0, 0, 0)  # Set black as the default draw color
         self.logical_size = _size
         self._original_logical_size = self.logical_size
@@ -393,6 +1044,83 @@ class Renderer(object):
         if self._renderer_ref is not None:
             self.destroy()
 
+    def _flush_pending(self):
+        # Submits any deferred draw calls before changing the renderer state
+        if self._cmdbuffer is not None and len(self._cmdbuffer.commands):
+            self.flush()
+
+    def _draw_primitives(self, op, items, count, color, action):
+        # Draws (or records) a ctypes array of points or rectangles
+        if self._cmdbuffer is not None:
+            if color is None:
+                color = self._cmdbuffer.color
+            else:
+                color = convert_to_color(color)
+            self._cmdbuffer.add_primitives(op, color, items, count)
+            return
+        draw = _get_primitive_funcs()[op][0]
+        self._apply_color(self._color if color is None else color)
+        ret = draw(self._sdl, items, count)
+        if ret < 0:
+            raise_sdl_err(action)
+
+    def _apply_color(self, color):
+        # Sets the SDL draw color, but only if it's actually different. To
+        # avoid needless SDL calls when drawing with custom colors, the SDL
+        # color isn't restored to the renderer's color until needed.
+        if not isinstance(color, Color):
+            color = convert_to_color(color)
+        c = self._sdl_color
+        if c is None or (color is not c and color != c):
+            ret = render.SDL_SetRenderDrawColor(
+                self._sdl, color.r, color.g, color.b, color.a
+            )
+            if ret < 0:
+                self._sdl_color = None
+                raise_sdl_err("setting the drawing color of the renderer")
+            # Keep a copy, since the caller may modify the color afterwards
+            self._sdl_color = Color(color.r, color.g, color.b, color.a)
+
+    def resync(self):
+        """Re-reads the drawing state of the renderer from SDL.
+
+        To avoid redundant calls to SDL, the renderer keeps a copy of its
+        drawing state (i.e. its :attr:`color`, :attr:`blendmode`,
+        :attr:`scale`, :attr:`viewport`, :attr:`clip_rect`, and
+        :attr:`target`) and only calls SDL when that state actually changes.
+        If the state of the renderer is modified directly through the base
+        SDL2 bindings (e.g. by calling :func:`~sdl2.SDL_RenderSetScale` on
+        :attr:`sdlrenderer`), this method needs to be called afterwards to
+        keep the renderer's copy of its state up to date.
+
+        """
+        r, g, b, a = Uint8(0), Uint8(0), Uint8(0), Uint8(0)
+        ret = render.SDL_GetRenderDrawColor(
+            self._sdl, byref(r), byref(g), byref(b), byref(a)
+        )
+        if ret < 0:
+            raise_sdl_err("retrieving the drawing color of the renderer")
+        self._color = convert_to_color((r.value, g.value, b.value, a.value))
+        self._sdl_color = self._color
+        if self._cmdbuffer is not None:
+            self._cmdbuffer.color = self._color
+        self._blendmode = _STALE
+        self._invalidate_geometry()
+        target = render.SDL_GetRenderTarget(self._sdl)
+        if not target:
+            self._target = None
+        elif not (isinstance(self._target, Texture) and
+                  _texture_key(self._target.tx) == _texture_key(target)):
+            self._target = target
+
+    def _invalidate_geometry(self):
+        # Marks any state that SDL may change on its own (e.g. when the window
+        # is resized or the logical size or target changes) as needing to be
+        # re-read from SDL.
+        self._scale = _STALE
+        self._viewport = _STALE
+        self._cliprect = _STALE
+
     def _get_render_drivers(self):
         renderers = []
         drivers = render.SDL_GetNumRenderDrivers()
@@ -404,23 +1132,33 @@ class Renderer(object):
             error.SDL_ClearError()
         return renderers
 
+    @property
+    def _sdl(self):
+        if self._renderer_ref[0] is None:
+            raise RuntimeError(
+                "Cannot use a renderer after it has been destroyed."
+            )
+        return self._renderer_ref[0]
+
     @property
     def sdlrenderer(self):
         """:obj:`~sdl2.SDL_Renderer`: The underlying base SDL renderer object.
         Can be used to perform operations with the renderer using the base
         PySDL2 bindings.
 
+        If the drawing state of the renderer is modified using the base
+        bindings, :meth:`resync` should be called afterwards.
+
         """
-        if self._renderer_ref[0] is None:
-            raise RuntimeError(
-                "Cannot use a renderer after it has been destroyed."
-            )
-        return self._renderer_ref[0]
+        sdlrenderer = self._sdl
+        # Make sure the SDL draw color matches the renderer's color
+        self._apply_color(self._color)
+        return sdlrenderer
 
     @property
     @deprecated
     def renderer(self):
-        return self.sdlrenderer
+        return self._sdl
 
     @property
     def logical_size(self):
@@ -429,32 +1167,33 @@ class Renderer(object):
 
         """
         w, h = c_int(0), c_int(0)
-        render.SDL_RenderGetLogicalSize(self.sdlrenderer, byref(w), byref(h))
+        render.SDL_RenderGetLogicalSize(self._sdl, byref(w), byref(h))
         return w.value, h.value
 
     @logical_size.setter
     def logical_size(self, size):
         width, height = size
-        ret = render.SDL_RenderSetLogicalSize(self.sdlrenderer, width, height)
+        self._flush_pending()
+        ret = render.SDL_RenderSetLogicalSize(self._sdl, width, height)
+        self._invalidate_geometry()
         if ret != 0:
             raise_sdl_err("setting the logical size of the renderer")
 
     @property
     def color(self):
         """:obj:`~sdl2.ext.Color`: The current drawing color of the renderer."""
-        r, g, b, a = Uint8(0), Uint8(0), Uint8(0), Uint8(0)
-        ret = render.SDL_GetRenderDrawColor(self.sdlrenderer, byref(r), byref(g),
-                                            byref(b), byref(a))
-        if ret < 0:
-            raise_sdl_err("retrieving the drawing color of the renderer")
-        return convert_to_color((r.value, g.value, b.value, a.value))
+        c = self._color
+        return Color(c.r, c.g, c.b, c.a)
 
     @color.setter
     def color(self, value):
         c = convert_to_color(value)
-        ret = render.SDL_SetRenderDrawColor(self.sdlrenderer, c.r, c.g, c.b, c.a)
-        if ret < 0:
-            raise_sdl_err("setting the drawing color of the renderer")
+        c = Color(c.r, c.g, c.b, c.a)  # in case the caller modifies value
+        self._sdl  # Make sure the renderer hasn't been destroyed
+        self._color = c
+        if self._cmdbuffer is not None:
+            # Deferred commands carry their own colors, so no need to flush
+            self._cmdbuffer.color = c
 
     @property
     def blendmode(self):
@@ -472,17 +1211,24 @@ class Renderer(object):
         ========================= ====================================
 
         """
-        mode = blendmode.SDL_BlendMode()
-        ret = render.SDL_GetRenderDrawBlendMode(self.sdlrenderer, byref(mode))
-        if ret < 0:
-            raise_sdl_err("retrieving the blend mode for the renderer")
-        return mode
+        if self._blendmode is _STALE:
+            mode = blendmode.SDL_BlendMode()
+            ret = render.SDL_GetRenderDrawBlendMode(self._sdl, byref(mode))
+            if ret < 0:
+                raise_sdl_err("retrieving the blend mode for the renderer")
+            self._blendmode = mode.value
+        return self._blendmode
 
     @blendmode.setter
     def blendmode(self, value):
-        ret = render.SDL_SetRenderDrawBlendMode(self.sdlrenderer, value)
+        if value == self._blendmode:
+            return
+        self._flush_pending()
+        self._blendmode = _STALE
+        ret = render.SDL_SetRenderDrawBlendMode(self._sdl, value)
         if ret < 0:
             raise_sdl_err("setting the blend mode for the renderer")
+        self._blendmode = value
 
     @property
     def scale(self):
@@ -491,19 +1237,165 @@ class Renderer(object):
         used to facilitate resolution-independent drawing.
         
         """
-        sx = c_float(0.0)
-        sy = c_float(0.0)
-        render.SDL_RenderGetScale(self.sdlrenderer, byref(sx), byref(sy))
-        return sx.value, sy.value
+        if self._scale is _STALE:
+            sx = c_float(0.0)
+            sy = c_float(0.0)
+            render.SDL_RenderGetScale(self._sdl, byref(sx), byref(sy))
+            self._scale = (sx.value, sy.value)
+        return self._scale
 
     @scale.setter
     def scale(self, value):
         if any([s <= 0 for s in value]):
             raise ValueError("Scaling factors must be greater than zero.")
         sx, sy = value
-        ret = render.SDL_RenderSetScale(self.sdlrenderer, sx, sy)
+        if self._scale is not _STALE and self._scale == (sx, sy):
+            return
+        self._flush_pending()
+        ret = render.SDL_RenderSetScale(self._sdl, sx, sy)
+        self._invalidate_geometry()  # Changing the scale changes the viewport
         if ret != 0:
             raise_sdl_err("setting the scaling factors for the renderer")
+        self._scale = (sx, sy)
+
+    @property
+    def viewport(self):
+        """tuple: The area of the rendering target to which drawing is
+        currently restricted, in the format ``(x, y, w, h)``. Drawing
+        coordinates are relative to the top-left corner of the viewport.
+
+        Can be set to ``None`` to reset the viewport to the full size of the
+        rendering target.
+
+        """
+        if self._viewport is _STALE:
+            r = rect.SDL_Rect()
+            render.SDL_RenderGetViewport(self._sdl, byref(r))
+            self._viewport = (r.x, r.y, r.w, r.h)
+        return self._viewport
+
+    @viewport.setter
+    def viewport(self, value):
+        if value is not None:
+            value = tuple(_sanitize_rects([value])[0])
+            if self._viewport is not _STALE and self._viewport == value:
+                return
+        self._flush_pending()
+        r = None if value is None else rect.SDL_Rect(*value)
+        ret = render.SDL_RenderSetViewport(self._sdl, r)
+        self._viewport = _STALE
+        if ret != 0:
+            raise_sdl_err("setting the viewport for the renderer")
+
+    @property
+    def clip_rect(self):
+        """tuple: The clipping rectangle of the renderer in the format
+        ``(x, y, w, h)``, or ``None`` if clipping is disabled. Drawing is
+        limited to the area within the clipping rectangle.
+
+        """
+        if self._cliprect is _STALE:
+            if not render.SDL_RenderIsClipEnabled(self._sdl):
+                self._cliprect = None
+            else:
+                r = rect.SDL_Rect()
+                render.SDL_RenderGetClipRect(self._sdl, byref(r))
+                self._cliprect = (r.x, r.y, r.w, r.h)
+        return self._cliprect
+
+    @clip_rect.setter
+    def clip_rect(self, value):
+        if value is not None:
+            value = tuple(_sanitize_rects([value])[0])
+        if self._cliprect is not _STALE and self._cliprect == value:
+            return
+        self._flush_pending()
+        r = None if value is None else rect.SDL_Rect(*value)
+        ret = render.SDL_RenderSetClipRect(self._sdl, r)
+        self._cliprect = _STALE
+        if ret != 0:
+            raise_sdl_err("setting the clipping rectangle for the renderer")
+        self._cliprect = value
+
+    @property
+    def target(self):
+        """:obj:`~sdl2.ext.Texture`: The texture currently being rendered to,
+        or ``None`` if rendering to the renderer's window or surface.
+
+        The texture must have been created with the
+        ``SDL_TEXTUREACCESS_TARGET`` access flag, and the renderer must
+        support rendering to textures. Changing the target resets the
+        :attr:`viewport`, :attr:`clip_rect`, and :attr:`scale` to those of
+        the new target.
+
+        """
+        return self._target
+
+    @target.setter
+    def target(self, value):
+        if value is self._target:
+            return
+        tx = None
+        if isinstance(value, Texture):
+            tx = value.tx
+        elif value is not None:
+            tx = value
+        self._flush_pending()
+        ret = render.SDL_SetRenderTarget(self._sdl, tx)
+        self._invalidate_geometry()
+        if ret != 0:
+            raise_sdl_err("setting the rendering target")
+        self._target = value
+
+    @property
+    def deferred(self):
+        """bool: Whether draw calls are recorded and submitted later in bulk.
+
+        By default, every call to :meth:`clear`, :meth:`copy`, :meth:`fill`,
+        :meth:`draw_line`, :meth:`draw_point`, and :meth:`draw_rect` is passed
+        to SDL immediately. When deferred mode is enabled, these calls are
+        instead recorded into a packed, reusable command buffer that is
+        submitted to SDL when :meth:`flush` or :meth:`present` is called (or
+        when deferred mode is disabled).
+
+        During submission, consecutive fills, rectangles, and points that
+        share the same color are merged into single SDL calls, as are lines
+        that continue the path of the previous line. For scenes with many
+        small primitives, this can greatly reduce the per-frame overhead of
+        drawing from Python.
+
+        Changing the :attr:`blendmode`, :attr:`scale`, :attr:`logical_size`,
+        :attr:`viewport`, :attr:`clip_rect`, or :attr:`target` of the renderer
+        automatically flushes any pending draw calls first.
+
+        .. note::
+           While deferred mode is enabled, any drawing performed directly on
+           :attr:`sdlrenderer` using the base SDL2 bindings will not be
+           ordered correctly with respect to the recorded draw calls unless
+           :meth:`flush` is called first.
+
+        """
+        return self._cmdbuffer is not None
+
+    @deferred.setter
+    def deferred(self, value):
+        if value and self._cmdbuffer is None:
+            self._cmdbuffer = _DrawBuffer(self._color)
+        elif not value and self._cmdbuffer is not None:
+            self.flush()
+            self._cmdbuffer = None
+
+    def flush(self):
+        """Submits all deferred draw calls to the rendering context.
+
+        If the renderer is not in :attr:`deferred` mode or no draw calls have
+        been recorded since the last flush, this method does nothing.
+
+        """
+        if self._cmdbuffer is not None and len(self._cmdbuffer.commands):
+            current = self._sdl_color
+            self._sdl_color = None  # In case of errors during replay
+            self._sdl_color = self._cmdbuffer.replay(self._sdl, current)
 
     def destroy(self):
         """Destroys the renderer and any associated textures.
@@ -513,6 +1405,8 @@ class Renderer(object):
         renderer can no longer be used.
         
         """
+        if self._cmdbuffer is not None:
+            self._cmdbuffer.reset()
         if self._renderer_ref[0]:
             render.SDL_DestroyRenderer(self._renderer_ref[0])
             self._renderer_ref[0] = None
@@ -531,13 +1425,13 @@ class Renderer(object):
                 renderer's current :attr:`color` will be used.
 
         """
-        if color is None:
-            ret = render.SDL_RenderClear(self.sdlrenderer)
-        else:
-            tmp = self.color
-            self.color = color
-            ret = render.SDL_RenderClear(self.sdlrenderer)
-            self.color = tmp
+        if self._cmdbuffer is not None:
+            if color is None:
+                color = self._cmdbuffer.color
+            self._cmdbuffer.add_clear(convert_to_color(color))
+            return
+        self._apply_color(self._color if color is None else color)
+        ret = render.SDL_RenderClear(self._sdl)
         if ret < 0:
            raise_sdl_err("clearing the rendering context")
 
@@ -603,6 +1497,9 @@ class Renderer(object):
             center = center if center else src.center
             flip = flip if flip != 0 else src.flip
             w, h = src.size
+            if src.srcrect is not None:
+                # Sprite is a region of a larger texture (e.g. an atlas)
+                srcrect = _offset_srcrect(src.srcrect, srcrect)
         elif isinstance(src, Texture):
             texture = src.tx
             w, h = src.size
@@ -633,9 +1530,11 @@ class Renderer(object):
             x, y = _sanitize_points(center)[0]
             center = Point(x, y)
 
-        ret = render_copy(
-            self.sdlrenderer, texture, srcrect, dstrect, angle, center, flip
-        )
+        args = (texture, srcrect, dstrect, angle, center, flip)
+        if self._cmdbuffer is not None:
+            self._cmdbuffer.add_copy(src, args)
+            return
+        ret = render_copy(self._sdl, *args)
         if ret < 0:
             raise_sdl_err("copying the texture to the rendering context")
 
@@ -721,13 +1620,125 @@ class Renderer(object):
         performed with the renderer will not take effect until this method
         is called.
 
+        If the renderer is in :attr:`deferred` mode, any recorded draw calls
+        are submitted with :meth:`flush` before presenting.
+
         It is recommended that you clear and redraw the contents of the
         rendering context every time before this method is called, as the
         contents of the buffers are not guaranteed to remain the same between
         repeat presentations.
         
         """
-        render.SDL_RenderPresent(self.sdlrenderer)
+        self.flush()
+        render.SDL_RenderPresent(self._sdl)
+        if isinstance(self.rendertarget, (Window, video.SDL_Window)):
+            # The window may be resized before the next frame, which can
+            # change the scale and viewport
+            self._scale = _STALE
+            self._viewport = _STALE
+
+    def read_pixels(self, rect=None, fmt="ARGB8888", out=None):
+        """Copies pixels from the current rendering target into a buffer.
+
+        This method is useful for taking screenshots, creating thumbnails, or
+        checking rendered output in tests. To avoid allocating a new buffer
+        for every call, the pixels can be read into an existing writable
+        buffer (a Numpy array or a bytes-like object) via the ``out``
+        argument. If no output buffer is given, the pixels are read into an
+        internal buffer owned by the renderer that is reused between calls,
+        meaning that its contents will be overwritten by the next call to
+        this method.
+
+        Numpy output arrays must have a shape of ``(h, w)`` or
+        ``(h, w, channels)`` (i.e. indexed with ``arr[y][x]``) and the same
+        number of bytes per pixel as the requested pixel format. Rows may be
+        padded (e.g. a view of a larger array), but pixels within a row must
+        be contiguous. Bytes-like output buffers must be at least
+        ``w * h * bytes_per_pixel`` bytes long, with tightly-packed rows.
+
+        Since reading pixels from a hardware renderer requires waiting for
+        the GPU to finish drawing, this method can be quite slow. Any
+        :attr:`deferred` draw calls are submitted before reading. Note that
+        this should be called before :meth:`present`, since the contents of
+        the rendering target are undefined after presenting.
+
+        Args:
+            rect (tuple, optional): The ``(x, y, w, h)`` area (in pixels) of
+                the rendering target to read. Defaults to reading the entire
+                target.
+            fmt (str or int, optional): The name (e.g. ``"ARGB8888"``) or SDL
+                constant of the pixel format in which to read the pixels.
+                Defaults to ``"ARGB8888"``.
+            out (optional): A writable Numpy array or bytes-like object into
+                which the pixels should be read.
+
+        Returns:
+            The output buffer, or a view of the renderer's internal buffer (a
+            :obj:`numpy.ndarray` if Numpy is available, otherwise a
+            :obj:`memoryview`) if ``out`` was not provided.
+
+        """
+        fmt = _get_pixel_format(fmt)
+        bpp = pixels.SDL_BYTESPERPIXEL(fmt)
+        if rect is None:
+            w, h = self._get_target_size()
+            area = (0, 0, w, h)
+        else:
+            area = [int(v) for v in _sanitize_rects([rect])[0]]
+            w, h = area[2], area[3]
+        if w < 1 or h < 1:
+            raise ValueError("The area to read must be at least 1x1 pixels.")
+        if out is None:
+            pitch = w * bpp
+            if self._readbuf is None or len(self._readbuf) < pitch * h:
+                self._readbuf = (c_ubyte * (pitch * h))()
+            addr = addressof(self._readbuf)
+            out = _pixel_view(addr, (w, h), pitch, bpp, self._readbuf)
+        elif _HASNUMPY and isinstance(out, numpy.ndarray):
+            channels = out.shape[2] if out.ndim == 3 else 1
+            if out.ndim not in (2, 3) or out.shape[:2] != (h, w) or \
+                    out.itemsize * channels != bpp:
+                e = "Output arrays must have a shape of ({0}, {1}) or "
+                e += "({0}, {1}, channels) with {2} bytes per pixel (got "
+                e += "shape {3} with dtype '{4}')."
+                raise ValueError(e.format(h, w, bpp, out.shape, out.dtype))
+            inner = (bpp, out.itemsize) if out.ndim == 3 else (bpp, )
+            if out.strides[1:] != inner or out.strides[0] < w * bpp:
+                raise ValueError("Output array rows must be contiguous.")
+            if not out.flags.writeable:
+                raise ValueError("Output arrays must be writable.")
+            pitch = out.strides[0]
+            addr = out.ctypes.data
+        else:
+            view = memoryview(out)
+            if view.readonly or not view.c_contiguous:
+                raise ValueError("Output buffers must be writable and contiguous.")
+            pitch = w * bpp
+            if view.nbytes < pitch * h:
+                e = "Output buffer is too small ({0} bytes, needs {1})."
+                raise ValueError(e.format(view.nbytes, pitch * h))
+            addr = addressof((c_ubyte * view.nbytes).from_buffer(view))
+        self.flush()
+        # NOTE: 'rect' is shadowed by the argument here, so use render's import
+        ret = render.SDL_RenderReadPixels(
+            self._sdl, render.SDL_Rect(*area), fmt, addr, pitch
+        )
+        if ret < 0:
+            raise_sdl_err("reading pixels from the renderer")
+        return out
+
+    def _get_target_size(self):
+        # Gets the size (in pixels) of the current rendering target
+        target = render.SDL_GetRenderTarget(self._sdl)
+        if target:
+            return _get_texture_size(target)
+        w, h = c_int(0), c_int(0)
+        ret = render.SDL_GetRendererOutputSize(
+            self._sdl, byref(w), byref(h)
+        )
+        if ret < 0:
+            raise_sdl_err("retrieving the renderer output size")
+        return (w.value, h.value)
 
     def draw_line(self, points, color=None):
         """Draws one or more connected lines on the rendering context.
@@ -736,6 +1747,10 @@ class Renderer(object):
            Subpixel rendering (i.e. using floats as pixel coordinates) requires
            SDL 2.0.10 or newer.
 
+        Points can also be passed as a packed array of coordinates (see
+        :meth:`draw_point`), in which case they will be passed directly to
+        SDL without any per-point overhead.
+
         Args:
             points (list): A list of 2 or more ``(x, y)`` coordinates or
                 :obj:`~sdl2.SDL_Point` objects defining the set of connected
@@ -745,32 +1760,19 @@ class Renderer(object):
                 :attr:`color` will be used.
 
         """
-        if dll.version < 2010:
-            draw_lines = render.SDL_RenderDrawLines
-            Point = rect.SDL_Point
-        else:
-            draw_lines = render.SDL_RenderDrawLinesF
-            Point = rect.SDL_FPoint
-
-        points = _sanitize_points(points)
-        if len(points) < 2:
+        points_ptr = _packed_array(points, _Point, 2)
+        if points_ptr is None:
+            points = _sanitize_points(points)
+            sdlpts = []
+            for p in points:
+                x, y = p
+                sdlpts.append(_Point(x, y))
+            points_ptr = (_Point * len(points))(*sdlpts)
+        if len(points_ptr) < 2:
             raise ValueError("At least two (x, y) points are required.")
-        sdlpts = []
-        for p in points:
-            x, y = p
-            sdlpts.append(Point(x, y))
-        points_ptr = (Point * len(points))(*sdlpts)
-
-        if color is None:
-            ret = draw_lines(self.sdlrenderer, points_ptr, len(points))
-        else:
-            tmp = self.color
-            self.color = color
-            ret = draw_lines(self.sdlrenderer, points_ptr, len(points))
-            self.color = tmp
-
-        if ret < 0:
-            raise_sdl_err("drawing lines to the renderer")
+        self._draw_primitives(
+            _LINE, points_ptr, len(points_ptr), color, "drawing lines to the renderer"
+        )
 
     def draw_point(self, points, color=None):
         """Draws one or more points on the rendering context.
@@ -779,6 +1781,18 @@ class Renderer(object):
            Subpixel rendering (i.e. using floats as pixel coordinates) requires
            SDL 2.0.10 or newer.
 
+        For drawing large numbers of points, coordinates can also be passed as
+        a packed array in any format that supports the buffer protocol (e.g. a
+        ``float32`` Numpy array with a shape of ``(N, 2)`` or an
+        :obj:`array.array` of type ``'f'`` with flattened ``x, y`` values).
+        Contiguous arrays of this type are passed directly to SDL without being
+        copied, and Numpy arrays of any other numeric type are converted with a
+        single vectorized copy.
+
+        .. note::
+           For SDL versions older than 2.0.10, packed arrays must contain
+           ``int32`` values instead of ``float32``.
+
         Args:
             points (list): A list of ``(x, y)`` coordinates or
                 :obj:`~sdl2.SDL_Point` objects defining the set of points to
@@ -788,30 +1802,19 @@ class Renderer(object):
                 :attr:`color` will be used.
 
         """
-        if dll.version < 2010:
-            draw_points = render.SDL_RenderDrawPoints
-            Point = rect.SDL_Point
-        else:
-            draw_points = render.SDL_RenderDrawPointsF
-            Point = rect.SDL_FPoint
-
-        points = _sanitize_points(points)
-        sdlpts = []
-        for p in points:
-            x, y = p
-            sdlpts.append(Point(x, y))
-        points_ptr = (Point * len(points))(*sdlpts)
-
-        if color is None:
-            ret = draw_points(self.sdlrenderer, points_ptr, len(points))
-        else:
-            tmp = self.color
-            self.color = color
-            ret = draw_points(self.sdlrenderer, points_ptr, len(points))
-            self.color = tmp
-
-        if ret < 0:
-            raise_sdl_err("drawing points to the renderer")
+        points_ptr = _packed_array(points, _Point, 2)
+        if points_ptr is None:
+            points = _sanitize_points(points)
+            sdlpts = []
+            for p in points:
+                x, y = p
+                sdlpts.append(_Point(x, y))
+            points_ptr = (_Point * len(points))(*sdlpts)
+        elif len(points_ptr) == 0:
+            return
+        self._draw_primitives(
+            _POINT, points_ptr, len(points_ptr), color, "drawing points to the renderer"
+        )
 
     def draw_rect(self, rects, color=None):
         """Draws one or more rectangles on the rendering context.
@@ -820,6 +1823,10 @@ class Renderer(object):
         :obj:`~sdl2.rect.SDL_Rect` objects, or a list containing multiple
         rectangles in either format.
 
+        Multiple rectangles can also be passed as a packed ``(N, 4)`` array of
+        coordinates (see :meth:`draw_point` for details), which will be passed
+        to SDL directly without copying.
+
         .. note::
            Subpixel rendering (i.e. using floats as pixel coordinates) requires
            SDL 2.0.10 or newer.
@@ -832,30 +1839,19 @@ class Renderer(object):
                 :attr:`color` will be used.
 
         """
-        if dll.version < 2010:
-            draw_rects = render.SDL_RenderDrawRects
-            Rect = rect.SDL_Rect
-        else:
-            draw_rects = render.SDL_RenderDrawRectsF
-            Rect = rect.SDL_FRect
-
-        rects = _sanitize_rects(rects)
-        sdlrects = []
-        for r in rects:
-            x, y, w, h = r
-            sdlrects.append(Rect(x, y, w, h))
-        rects_ptr = (Rect * len(rects))(*sdlrects)
-
-        if color is None:
-            ret = draw_rects(self.sdlrenderer, rects_ptr, len(rects))
-        else:
-            tmp = self.color
-            self.color = color
-            ret = draw_rects(self.sdlrenderer, rects_ptr, len(rects))
-            self.color = tmp
-    
-        if ret < 0:
-            raise_sdl_err("drawing rectangles to the renderer")
+        rects_ptr = _packed_array(rects, _Rect, 4)
+        if rects_ptr is None:
+            rects = _sanitize_rects(rects)
+            sdlrects = []
+            for r in rects:
+                x, y, w, h = r
+                sdlrects.append(_Rect(x, y, w, h))
+            rects_ptr = (_Rect * len(rects))(*sdlrects)
+        elif len(rects_ptr) == 0:
+            return
+        self._draw_primitives(
+            _RECT, rects_ptr, len(rects_ptr), color, "drawing rectangles to the renderer"
+        )
 
     def fill(self, rects, color=None):
         """Fills one or more rectangular regions the rendering context.
@@ -864,6 +1860,10 @@ class Renderer(object):
         :obj:`~sdl2.rect.SDL_Rect` objects, or a list containing multiple
         rectangles in either format.
 
+        Multiple rectangles can also be passed as a packed ``(N, 4)`` array of
+        coordinates (see :meth:`draw_point` for details), which will be passed
+        to SDL directly without copying.
+
         .. note::
            Subpixel rendering (i.e. using floats as pixel coordinates) requires
            SDL 2.0.10 or newer.
@@ -876,27 +1876,459 @@ class Renderer(object):
                 :attr:`color` will be used.
 
         """
-        if dll.version < 2010:
-            fill_rects = render.SDL_RenderFillRects
-            Rect = rect.SDL_Rect
-        else:
-            fill_rects = render.SDL_RenderFillRectsF
-            Rect = rect.SDL_FRect
+        rects_ptr = _packed_array(rects, _Rect, 4)
+        if rects_ptr is None:
+            rects = _sanitize_rects(rects)
+            sdlrects = []
+            for r in rects:
+                x, y, w, h = r
+                sdlrects.append(_Rect(x, y, w, h))
+            rects_ptr = (_Rect * len(rects))(*sdlrects)
+        elif len(rects_ptr) == 0:
+            return
+        self._draw_primitives(
+            _FILL, rects_ptr, len(rects_ptr), color, "filling rectangles in the renderer"
+        )
+
+    def draw_geometry(self, texture, xy, colors=None, uv=None, indices=None):
+        """Renders a list of triangles with an optional texture.
+
+        This method wraps :func:`~sdl2.SDL_RenderGeometryRaw`, allowing for
+        textured quads, triangle fans, colored meshes, and other arbitrary 2D
+        geometry to be drawn with a single call. Vertex data can be passed as
+        any object that supports the buffer protocol (e.g. Numpy arrays or
+        :obj:`array.array` objects), and is passed to SDL directly without
+        copying whenever possible:
+
+        ============ ========= ======= ===================================
+        Argument     Type      Values  Description
+        ============ ========= ======= ===================================
+        ``xy``       float32   2       ``(x, y)`` vertex positions
+        ``colors``   uint8     4       ``(r, g, b, a)`` vertex colors
+        ``uv``       float32   2       ``(u, v)`` texture coordinates
+        ``indices``  integer   1       Vertex indices (8, 16, or 32-bit)
+        ============ ========= ======= ===================================
+
+        Each vertex array can either be a flat buffer or an ``(N, k)`` Numpy
+        array. Numpy arrays can also be strided views into a larger array,
+        making it possible to pass vertex attributes stored in separate arrays
+        or interleaved within a single array (e.g. ``verts[:, 0:2]`` and
+        ``verts[:, 2:4]`` for an ``(N, 4)`` array of ``x, y, u, v`` values).
+        Alternatively, a ``ctypes`` array of :obj:`~sdl2.SDL_Vertex` structures
+        can be passed as ``xy``, in which case its interleaved colors and
+        texture coordinates will be used.
+
+        If no indices are provided, every 3 vertices will be drawn as a
+        separate triangle. Otherwise, every 3 indices will be drawn as a
+        triangle.
+
+        .. note::
+           This method requires SDL 2.0.18 or newer.
 
-        rects = _sanitize_rects(rects)
-        sdlrects = []
-        for r in rects:
-            x, y, w, h = r
-            sdlrects.append(Rect(x, y, w, h))
-        rects_ptr = (Rect * len(rects))(*sdlrects)
+        Args:
+            texture (:obj:`~sdl2.ext.Texture`, :obj:`~sdl2.SDL_Texture`): The
+                texture to use for the geometry, or ``None`` to draw untextured
+                triangles.
+            xy: The ``(x, y)`` coordinates of each vertex.
+            colors (optional): The ``(r, g, b, a)`` color of each vertex, or a
+                single color to use for all vertices. Defaults to opaque white
+                (i.e. no color modulation).
+            uv (optional): The normalized ``(u, v)`` texture coordinates for
+                each vertex. Required if a texture is provided.
+            indices (optional): The indices of the vertices to use for each
+                triangle. Defaults to drawing the vertices in order.
 
-        if color is None:
-            ret = fill_rects(self.sdlrenderer, rects_ptr, len(rects))
+        """
+        if dll.version < 2018:
+            e = "Rendering geometry requires SDL 2.0.18 or newer"
+            raise RuntimeError(e)
+        if texture is not None:
+            texture = _get_texture(texture)[0]
+            if uv is None and not (isinstance(xy, Array) and \
+                    xy._type_ == render.SDL_Vertex):
+                raise ValueError("Texture coordinates are required for textures.")
+
+        if isinstance(xy, Array) and xy._type_ == render.SDL_Vertex:
+            # Interleaved SDL_Vertex arrays already contain colors & tex coords
+            base = addressof(xy)
+            xy_addr, xy_stride, count = (base, sizeof(render.SDL_Vertex), len(xy))
+            col_addr = base + render.SDL_Vertex.color.offset
+            uv_addr = base + render.SDL_Vertex.tex_coord.offset
+            col_stride = uv_stride = xy_stride
+            keep = (xy, )
         else:
-            tmp = self.color
-            self.color = color
-            ret = fill_rects(self.sdlrenderer, rects_ptr, len(rects))
-            self.color = tmp
-    
+            xy_addr, xy_stride, count, xy_keep = _vertex_attrib(xy, 2, "f", "xy")
+            uv_addr, uv_stride, uv_keep = (None, 0, None)
+            if uv is not None:
+                uv_addr, uv_stride, n, uv_keep = _vertex_attrib(uv, 2, "f", "uv")
+                if n < count:
+                    e = "'uv' must have at least as many items as 'xy' ({0})"
+                    raise ValueError(e.format(count))
+            if colors is None or _is_color(colors):
+                # If a single color is given, use it for all vertices
+                c = convert_to_color(colors if colors is not None else 0xFFFFFFFF)
+                col_keep = SDL_Color(c.r, c.g, c.b, c.a)
+                col_addr, col_stride = (addressof(col_keep), 0)
+            else:
+                col_addr, col_stride, n, col_keep = _vertex_attrib(
+                    colors, 4, "B", "colors"
+                )
+                if n < count:
+                    e = "'colors' must have at least as many items as 'xy' ({0})"
+                    raise ValueError(e.format(count))
+            keep = (xy_keep, uv_keep, col_keep)
+
+        idx_addr, idx_count, idx_size = (None, 0, 0)
+        if indices is not None:
+            idx_addr, idx_count, idx_size, idx_keep = _index_array(indices)
+
+        self._flush_pending()
+        ret = render.SDL_RenderGeometryRaw(
+            self._sdl, texture,
+            cast(xy_addr, POINTER(c_float)), xy_stride,
+            cast(col_addr, POINTER(SDL_Color)), col_stride,
+            cast(uv_addr, POINTER(c_float)) if uv_addr else None, uv_stride,
+            count, idx_addr, idx_count, idx_size
+        )
         if ret < 0:
-            raise_sdl_err("filling rectangles in the renderer")
+            raise_sdl_err("rendering geometry")
+
+
+class SpriteBatch(object):
+    """A batch of textured quads to be drawn with as few calls as possible.
+
+    Drawing large numbers of sprites with :meth:`Renderer.copy` requires one
+    SDL call per sprite. A ``SpriteBatch`` instead collects sprite quads into
+    per-texture vertex arrays, which are then drawn with a single call to
+    :meth:`Renderer.draw_geometry` for each texture when :meth:`draw` is
+    called::
+
+       batch = SpriteBatch(renderer)
+       for s in sprites:
+           batch.add(s.texture, (s.x, s.y))
+       batch.draw()
+
+    Within a given texture, quads are drawn in the order they were added.
+    However, quads for different textures are drawn grouped by texture (in the
+    order each texture was first added), so sprites that need to overlap
+    sprites with different textures in a specific order should be drawn using
+    separate batches.
+
+    .. note::
+       This class requires SDL 2.0.18 or newer.
+
+    Args:
+        renderer (:obj:`~sdl2.ext.Renderer`): The renderer with which the
+            batch will be drawn.
+
+    """
+    def __init__(self, renderer):
+        if not isinstance(renderer, Renderer):
+            raise TypeError("'renderer' must be a valid Renderer object.")
+        self._renderer = renderer
+        self._batches = {}
+        self._order = []
+        self._indices = array("I")
+
+    def __len__(self):
+        """The total number of quads currently in the batch."""
+        return sum(len(b[1]) // 8 for b in self._batches.values())
+
+    def _get_batch(self, texture):
+        key = _texture_key(texture)
+        if key not in self._batches:
+            self._batches[key] = (texture, array("f"), bytearray(), array("f"))
+            self._order.append(key)
+        return self._batches[key]
+
+    def add(self, src, dstrect=None, srcrect=None, angle=0, color=None,
+            flip=render.SDL_FLIP_NONE):
+        """Adds a textured quad to the batch.
+
+        The arguments for this method work the same as those for
+        :meth:`Renderer.copy`, except that rotation is always performed around
+        the center of the destination rectangle. If a
+        :obj:`~sdl2.ext.TextureSprite` is given, its position, angle, and
+        flip will be used by default.
+
+        Args:
+            src (:obj:`~sdl2.ext.Texture`, :obj:`~sdl2.SDL_Texture`): The
+                source texture for the quad.
+            dstrect (tuple, optional): An ``(x, y)`` location or ``(x, y, w, h)``
+                rectangle defining where to draw the quad.
+            srcrect (tuple, optional): An ``(x, y, w, h)`` rectangle defining
+                the subset of the source texture to use for the quad. Defaults
+                to the entire texture.
+            angle (float, optional): The clockwise rotation (in degrees) to
+                apply to the quad. Defaults to no rotation.
+            color (:obj:`~sdl2.ext.Color`, optional): The color with which to
+                modulate the texture for the quad. Defaults to no modulation.
+            flip (int, optional): A flag indicating whether the quad should be
+                flipped horizontally or vertically.
+
+        """
+        texture, (tw, th) = _get_texture(src)
+        if isinstance(src, TextureSprite):
+            if dstrect is None:
+                dstrect = (src.x, src.y)
+            angle = angle if angle != 0 else src.angle
+            flip = flip if flip != 0 else src.flip
+
+        sx, sy, sw, sh = (0, 0, tw, th)
+        if getattr(src, "srcrect", None) is not None:
+            sx, sy, sw, sh = _offset_srcrect(src.srcrect, srcrect)
+        elif srcrect:
+            sx, sy, sw, sh = _sanitize_rects([srcrect])[0]
+        if dstrect is None:
+            dx, dy = (0, 0)
+            dw, dh = self._renderer.logical_size
+        elif _is_point(dstrect):
+            dx, dy = dstrect
+            dw, dh = (sw, sh)
+        elif _is_rect(dstrect):
+            dx, dy, dw, dh = dstrect
+        else:
+            raise ValueError("'dstrect' must be a valid point or rectangle.")
+
+        # Calculate the texture coordinates for the corners of the quad
+        u0, v0 = (sx / float(tw), sy / float(th))
+        u1, v1 = ((sx + sw) / float(tw), (sy + sh) / float(th))
+        if flip & render.SDL_FLIP_HORIZONTAL:
+            u0, u1 = (u1, u0)
+        if flip & render.SDL_FLIP_VERTICAL:
+            v0, v1 = (v1, v0)
+
+        # Calculate the positions of the corners, rotating if needed
+        x0, y0, x1, y1 = (dx, dy, dx + dw, dy + dh)
+        if angle:
+            cx, cy = (dx + dw / 2.0, dy + dh / 2.0)
+            rad = math.radians(angle)
+            cos_a, sin_a = (math.cos(rad), math.sin(rad))
+            corners = []
+            for px, py in ((x0, y0), (x1, y0), (x1, y1), (x0, y1)):
+                ox, oy = (px - cx, py - cy)
+                corners.append(cx + ox * cos_a - oy * sin_a)
+                corners.append(cy + ox * sin_a + oy * cos_a)
+        else:
+            corners = (x0, y0, x1, y0, x1, y1, x0, y1)
+
+        c = convert_to_color(color) if color is not None else None
+        rgba = (c.r, c.g, c.b, c.a) if c else (255, 255, 255, 255)
+        _, xy, colors, uv = self._get_batch(texture)
+        xy.extend(corners)
+        uv.extend((u0, v0, u1, v0, u1, v1, u0, v1))
+        colors.extend(rgba * 4)
+
+    def clear(self):
+        """Removes all quads from the batch without drawing them."""
+        self._batches = {}
+        self._order = []
+
+    def draw(self):
+        """Draws all quads in the batch and clears it.
+
+        Each texture in the batch is drawn with a single call to
+        :meth:`Renderer.draw_geometry`.
+
+        """
+        for key in self._order:
+            texture, xy, colors, uv = self._batches[key]
+            quads = len(xy) // 8
+            # Extend the shared index buffer as needed (2 triangles per quad)
+            for q in range(len(self._indices) // 6, quads):
+                i = q * 4
+                self._indices.extend((i, i + 1, i + 2, i + 2, i + 3, i))
+            indices = self._indices
+            if len(indices) > quads * 6:
+                indices = indices[:quads * 6]
+            self._renderer.draw_geometry(texture, xy, colors, uv, indices)
+        self.clear()
+
+
+class QuadRenderer(object):
+    """Draws large numbers of axis-aligned quads from Numpy arrays.
+
+    A ``QuadRenderer`` is meant for drawing particles and other instanced
+    quads whose positions, sizes, colors and texture regions are stored in
+    Numpy arrays (e.g. the fields of a
+    :obj:`~sdl2.ext.particles.ParticleBuffer`). On each call to
+    :meth:`draw`, the per-quad arrays are expanded into vertex and index
+    buffers with vectorized operations, which are then submitted with a
+    single call to :func:`~sdl2.SDL_RenderGeometryRaw`::
+
+       quads = QuadRenderer(renderer)
+       regions = [(0, 0, 16, 16), (16, 0, 16, 16), (32, 0, 16, 16)]
+       while running:
+           ...
+           quads.draw(atlas, buf.x, buf.y, 8, regions=regions, types=buf.type)
+
+    The vertex and index buffers are kept between calls and only grow if
+    more quads than ever before are drawn, so drawing doesn't allocate any
+    memory for the vertex data in the common case.
+
+    .. note::
+       This class requires Numpy and SDL 2.0.18 or newer.
+
+    Args:
+        renderer (:obj:`~sdl2.ext.Renderer`): The renderer with which the
+            quads will be drawn.
+        capacity (int, optional): The number of quads to allocate buffers
+            for initially. Defaults to 1024.
+
+    """
+    def __init__(self, renderer, capacity=1024):
+        if not _HASNUMPY:
+            raise UnsupportedError("QuadRenderer requires Numpy")
+        if not isinstance(renderer, Renderer):
+            raise TypeError("'renderer' must be a valid Renderer object.")
+        self._renderer = renderer
+        self._capacity = 0
+        self._reserve(max(1, int(capacity)))
+
+    @property
+    def capacity(self):
+        """int: The number of quads the current buffers can hold."""
+        return self._capacity
+
+    def _reserve(self, count):
+        # Grows the vertex, index and scratch buffers to hold count quads
+        if count <= self._capacity:
+            return
+        capacity = max(count, self._capacity * 2)
+        self._xy = numpy.zeros((capacity, 4, 2), numpy.float32)
+        self._uv = numpy.zeros((capacity, 4, 2), numpy.float32)
+        self._colors = numpy.zeros((capacity, 4, 4), numpy.uint8)
+        self._scratch = numpy.zeros((2, capacity), numpy.float32)
+        # Two triangles per quad, sharing the quad's first and third corner
+        quads = numpy.arange(capacity, dtype=numpy.uint32) * 4
+        pattern = numpy.array([0, 1, 2, 2, 3, 0], dtype=numpy.uint32)
+        self._indices = (quads[:, None] + pattern).ravel()
+        self._capacity = capacity
+
+    def _fill_corners(self, axis, pos, size, centered, count):
+        # Fills the x (axis 0) or y (axis 1) coordinates of all quad corners
+        corners = self._xy[:count, :, axis]
+        lo, hi = (0, 3), (1, 2)
+        if axis == 1:
+            lo, hi = (0, 1), (2, 3)
+        start = corners[:, lo[0]]
+        end = corners[:, hi[0]]
+        if numpy.ndim(size):
+            half = self._scratch[axis, :count]
+            if centered:
+                numpy.multiply(size, 0.5, out=half)
+                numpy.subtract(pos, half, out=start)
+                numpy.add(pos, half, out=end)
+            else:
+                start[:] = pos
+                numpy.add(pos, size, out=end)
+        elif centered:
+            numpy.subtract(pos, size * 0.5, out=start)
+            numpy.add(pos, size * 0.5, out=end)
+        else:
+            start[:] = pos
+            numpy.add(pos, size, out=end)
+        corners[:, lo[1]] = start
+        corners[:, hi[1]] = end
+
+    def _fill_uv(self, regions, types, texsize, count):
+        # Fills the texture coordinates of all quad corners
+        uv = self._uv[:count]
+        if regions is None:
+            uv[:] = ((0, 0), (1, 0), (1, 1), (0, 1))
+            return
+        tw, th = texsize
+        regions = numpy.asarray(regions, dtype=numpy.float32)
+        if regions.ndim == 1:
+            regions = regions.reshape(1, 4)
+        if regions.ndim != 2 or regions.shape[1] != 4:
+            raise ValueError("'regions' must contain (x, y, w, h) rectangles")
+        # Get the normalized corner coordinates of each region
+        u0 = regions[:, 0] / tw
+        v0 = regions[:, 1] / th
+        u1 = (regions[:, 0] + regions[:, 2]) / tw
+        v1 = (regions[:, 1] + regions[:, 3]) / th
+        table = numpy.stack([
+            numpy.stack([u0, v0], 1), numpy.stack([u1, v0], 1),
+            numpy.stack([u1, v1], 1), numpy.stack([u0, v1], 1)
+        ], 1)
+        if types is not None:
+            numpy.take(table, types, axis=0, out=uv, mode="clip")
+        elif len(table) == 1:
+            uv[:] = table[0]
+        elif len(table) == count:
+            uv[:] = table
+        else:
+            e = "'regions' must contain 1 or {0} rectangles (got {1})"
+            raise ValueError(e.format(count, len(table)))
+
+    def _fill_colors(self, colors, count):
+        # Fills the colors of all quad corners
+        out = self._colors[:count]
+        if colors is None or _is_color(colors):
+            c = convert_to_color(colors if colors is not None else 0xFFFFFFFF)
+            out[:] = (c.r, c.g, c.b, c.a)
+            return
+        colors = numpy.asarray(colors)
+        if colors.shape != (count, 4):
+            e = "'colors' must have a shape of ({0}, 4) (got {1})"
+            raise ValueError(e.format(count, colors.shape))
+        out[:] = colors[:, None, :]
+
+    def draw(self, texture, x, y, w, h=None, colors=None, regions=None,
+             types=None, centered=True):
+        """Draws a quad for each of the given positions.
+
+        All per-quad arguments can either be Numpy arrays (or sequences)
+        with one value per quad, or single values to use for all quads.
+
+        Args:
+            texture (:obj:`~sdl2.ext.Texture`, :obj:`~sdl2.SDL_Texture`): The
+                texture to draw the quads with, or ``None`` to draw solid
+                colored quads.
+            x: The x coordinates of the quads.
+            y: The y coordinates of the quads.
+            w: The widths of the quads.
+            h (optional): The heights of the quads. Defaults to the widths.
+            colors (optional): The ``(r, g, b, a)`` colors of the quads as an
+                ``(N, 4)`` array, or a single color for all quads. Defaults to
+                opaque white (i.e. no color modulation).
+            regions (optional): The ``(x, y, w, h)`` source rectangles (in
+                pixels) within the texture for the quads, either one for all
+                quads, one per quad, or a table of rectangles to be selected
+                by ``types``. Defaults to the full texture.
+            types (optional): An array with the index of the rectangle in
+                ``regions`` to use for each quad.
+            centered (bool, optional): Whether the x and y coordinates are the
+                centers of the quads (the default) or their top-left corners.
+
+        """
+        try:
+            x, y = numpy.broadcast_arrays(x, y)
+        except ValueError:
+            raise ValueError("'x' and 'y' must have the same length")
+        if x.ndim != 1:
+            raise ValueError("'x' and 'y' must be 1-D arrays")
+        count = len(x)
+        if not count:
+            return
+        if h is None:
+            h = w
+        texsize = (1, 1)
+        if texture is not None:
+            texture, texsize = _get_texture(texture)
+        if types is not None and regions is None:
+            raise ValueError("'types' requires a table of 'regions'")
+        self._reserve(count)
+        self._fill_corners(0, x, w, centered, count)
+        self._fill_corners(1, y, h, centered, count)
+        self._fill_uv(regions, types, texsize, count)
+        self._fill_colors(colors, count)
+        verts = count * 4
+        self._renderer.draw_geometry(
+            texture, self._xy.reshape(-1, 2)[:verts],
+            self._colors.reshape(-1, 4)[:verts],
+            self._uv.reshape(-1, 2)[:verts] if texture is not None else None,
+            self._indices[:count * 6]
+        )
+
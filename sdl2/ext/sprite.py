@@ -107,6 +107,7 @@ class TextureSprite(Sprite):
         self.free = free
         self.angle = 0.0
         self.flip = render.SDL_FLIP_NONE
+        self.srcrect = None
         self._size = w.value, h.value
         self._center = None
 
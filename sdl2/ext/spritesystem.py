@@ -1,13 +1,17 @@
-from .. import surface, rect, video, pixels, render, rwops
+import bisect
+from ctypes import addressof, byref
+
+from .. import surface, rect, video, pixels, render, rwops, blendmode, dll
 
 from .color import convert_to_color
 from .err import SDLError
 from .compat import isiterable
 from .ebs import System
 from .image import load_image, pillow_to_surface, _HASPIL
-from .renderer import Renderer
+from .renderer import Renderer, _texture_key
 from .sprite import Sprite, SoftwareSprite, TextureSprite
-from .window import Window
+from .surface import _get_target_surface
+from .window import Window, _merge_rects, _update_window_rects
 
 __all__ = [
     "SpriteFactory", "SoftwareSpriteRenderSystem", "SpriteRenderSystem",
@@ -196,6 +200,93 @@ class SpriteFactory(object):
         return TextureSprite(texture.contents)
 
 
+def _get_depth(sprite):
+    # The default sort key for sprite rendering systems
+    return sprite.depth
+
+
+class _DepthLayers(object):
+    """Persistent depth-ordered storage for the sprites of a render system.
+
+    Sprites are stored in buckets by depth, with each bucket further grouped
+    by texture so that sprites sharing a texture are drawn consecutively.
+    Each frame, only sprites that have been added, removed, or had their depth
+    changed since the last frame are moved between buckets, and the flattened
+    draw order is only rebuilt when something has changed.
+
+    """
+    def __init__(self):
+        self._depths = []  # sorted list of depths with at least one sprite
+        self._layers = {}  # depth -> {texture key: {id(sprite): sprite}}
+        self._info = {}  # id(sprite) -> [sprite, depth, texture key, stamp]
+        self._stamp = 0
+        self._order = []
+        self._changed = False
+
+    def __len__(self):
+        return len(self._info)
+
+    def _insert(self, sprite):
+        depth = sprite.depth
+        texkey = _texture_key(sprite.texture)
+        layer = self._layers.get(depth)
+        if layer is None:
+            layer = {}
+            self._layers[depth] = layer
+            bisect.insort(self._depths, depth)
+        group = layer.get(texkey)
+        if group is None:
+            group = layer[texkey] = {}
+        group[id(sprite)] = sprite
+        self._info[id(sprite)] = [sprite, depth, texkey, self._stamp]
+        self._changed = True
+
+    def _discard(self, key):
+        _, depth, texkey, _ = self._info.pop(key)
+        layer = self._layers[depth]
+        group = layer[texkey]
+        del group[key]
+        if not len(group):
+            del layer[texkey]
+            if not len(layer):
+                del self._layers[depth]
+                self._depths.remove(depth)
+        self._changed = True
+
+    def update(self, sprites):
+        """Updates the layers for the current frame's sprites, returning the
+        sprites in draw order.
+
+        """
+        self._stamp += 1
+        stamp = self._stamp
+        info = self._info
+        seen = 0
+        for sprite in sprites:
+            key = id(sprite)
+            entry = info.get(key)
+            if entry is None:
+                self._insert(sprite)
+            elif entry[0] is not sprite or entry[1] != sprite.depth:
+                self._discard(key)
+                self._insert(sprite)
+            else:
+                entry[3] = stamp
+            seen += 1
+        if seen != len(info):
+            # Only scan for removed sprites if any are actually missing
+            for key in [k for k, e in info.items() if e[3] != stamp]:
+                self._discard(key)
+        if self._changed:
+            order = []
+            for depth in self._depths:
+                for group in self._layers[depth].values():
+                    order.extend(group.values())
+            self._order = order
+            self._changed = False
+        return self._order
+
+
 class SpriteRenderSystem(System):
     """A rendering system for Sprite components.
 
@@ -207,7 +298,7 @@ class SpriteRenderSystem(System):
     def __init__(self):
         super(SpriteRenderSystem, self).__init__()
         self.componenttypes = (Sprite,)
-        self._sortfunc = lambda e: e.depth
+        self._sortfunc = _get_depth
 
     def render(self, sprites, x=None, y=None):
         """Renders the passed sprites.
@@ -251,8 +342,34 @@ class SoftwareSpriteRenderSystem(SpriteRenderSystem):
     display Sprite surfaces. It uses the Window's internal SDL surface as
     drawing context, so that GL operations, such as texture handling or
     using SDL renderers is not possible.
+
+    By default, the entire window surface is copied to the screen every time
+    sprites are rendered. If ``dirty_rects`` is True, the system instead keeps
+    track of the areas of the window that have changed since the last frame
+    (i.e. the old and new bounds of every sprite that was moved, added,
+    removed, or had its surface or depth changed) and only updates those
+    areas, which can be much faster for large windows where only a few
+    sprites move each frame. In this mode, each call to :meth:`render` must
+    be passed all sprites to be shown in the window, and any changes made to
+    the window surface or sprite pixels outside of the system need to be
+    marked using :meth:`invalidate`.
+
+    If a ``background`` surface is provided, the parts of the window behind
+    any changed sprites will be restored from it before the sprites are
+    drawn. When combined with ``dirty_rects``, only the changed areas of the
+    window are restored and redrawn.
+
+    Args:
+        window (:obj:`~sdl2.ext.Window`, :obj:`~sdl2.SDL_Window`): The window
+            on which to draw sprites.
+        dirty_rects (bool, optional): Whether to only update the areas of the
+            window that have changed since the last frame. Defaults to False.
+        background (:obj:`~sdl2.SDL_Surface`, optional): An optional surface
+            with which to redraw the window behind the sprites every frame.
+            Defaults to None.
+
     """
-    def __init__(self, window):
+    def __init__(self, window, dirty_rects=False, background=None):
         """Creates a new SoftwareSpriteRenderSystem for a specific Window."""
         super(SoftwareSpriteRenderSystem, self).__init__()
         if isinstance(window, Window):
@@ -267,6 +384,95 @@ class SoftwareSpriteRenderSystem(SpriteRenderSystem):
             raise SDLError()
         self.surface = sfc.contents
         self.componenttypes = (SoftwareSprite,)
+        self.dirty_rects = dirty_rects
+        self.background = background
+        self._prev_state = None
+        self._pending = []
+
+    @property
+    def background(self):
+        """:obj:`~sdl2.SDL_Surface`: The surface with which to redraw the
+        window behind the sprites, or None if not set.
+
+        """
+        return self._background
+
+    @background.setter
+    def background(self, value):
+        if value is not None:
+            value = _get_target_surface(value, "background")
+        self._background = value
+        self.invalidate()
+
+    def invalidate(self, area=None):
+        """Marks an area of the window to be redrawn on the next frame.
+
+        This only has an effect if the system is tracking dirty areas or has a
+        background, and is needed whenever the window surface or the pixels of
+        a sprite are modified outside of the rendering system. Partial areas
+        are ignored while ``dirty_rects`` is disabled, since the whole window
+        is redrawn on every frame anyway.
+
+        Args:
+            area (tuple, optional): The ``(x, y, w, h)`` area of the window to
+                redraw. Defaults to redrawing the entire window.
+
+        """
+        if area is None:
+            self._prev_state = None
+        elif not self.dirty_rects:
+            return
+        elif isinstance(area, rect.SDL_Rect):
+            self._pending.append((area.x, area.y, area.w, area.h))
+        else:
+            self._pending.append(tuple(area))
+
+    def _get_dirty(self, items):
+        # Compares the bounds, surfaces, and depths of the sprites to those of
+        # the previous frame, returning the merged list of changed areas
+        sf = self.surface
+        state = {}
+        for sprite, x, y in items:
+            w, h = sprite.size
+            state[id(sprite)] = (
+                (x, y, w, h), addressof(sprite.surface), sprite.depth
+            )
+        prev = self._prev_state
+        self._prev_state = state
+        if prev is None:
+            self._pending = []
+            return None
+        dirty = self._pending
+        self._pending = []
+        for key, current in state.items():
+            old = prev.get(key)
+            if old != current:
+                dirty.append(current[0])
+                if old is not None:
+                    dirty.append(old[0])
+        for key, old in prev.items():
+            if key not in state:
+                dirty.append(old[0])
+        dirty = _merge_rects(dirty, (sf.w, sf.h))
+        total = sum([r[2] * r[3] for r in dirty])
+        if total >= sf.w * sf.h:
+            return None  # Just redraw everything if it's all changed anyway
+        return dirty
+
+    def _restore_background(self, rects):
+        # Copies the background onto the window without blending
+        bg = self._background
+        mode = blendmode.SDL_BlendMode()
+        surface.SDL_GetSurfaceBlendMode(bg, byref(mode))
+        surface.SDL_SetSurfaceBlendMode(bg, blendmode.SDL_BLENDMODE_NONE)
+        if rects is None:
+            surface.SDL_BlitSurface(bg, None, self.surface, None)
+        else:
+            for r in rects:
+                surface.SDL_BlitSurface(
+                    bg, rect.SDL_Rect(*r), self.surface, rect.SDL_Rect(*r)
+                )
+        surface.SDL_SetSurfaceBlendMode(bg, mode)
 
     def render(self, sprites, x=None, y=None):
         """Draws the passed sprites (or sprite) on the Window's surface.
@@ -280,23 +486,61 @@ class SoftwareSpriteRenderSystem(SpriteRenderSystem):
         SoftwareSprite, if set.
         """
         r = rect.SDL_Rect(0, 0, 0, 0)
+        if not (self.dirty_rects or self._background is not None):
+            if isiterable(sprites):
+                blit_surface = surface.SDL_BlitSurface
+                imgsurface = self.surface
+                x = x or 0
+                y = y or 0
+                for sprite in sprites:
+                    r.x = x + sprite.x
+                    r.y = y + sprite.y
+                    blit_surface(sprite.surface, None, imgsurface, r)
+            else:
+                r.x = sprites.x
+                r.y = sprites.y
+                if x is not None and y is not None:
+                    r.x = x
+                    r.y = y
+                surface.SDL_BlitSurface(sprites.surface, None, self.surface, r)
+            video.SDL_UpdateWindowSurface(self.window)
+            return
+
+        # Get the drawing positions of all sprites
         if isiterable(sprites):
-            blit_surface = surface.SDL_BlitSurface
-            imgsurface = self.surface
             x = x or 0
             y = y or 0
-            for sprite in sprites:
-                r.x = x + sprite.x
-                r.y = y + sprite.y
+            items = [(s, x + s.x, y + s.y) for s in sprites]
+        elif x is not None and y is not None:
+            items = [(sprites, x, y)]
+        else:
+            items = [(sprites, sprites.x, sprites.y)]
+
+        dirty = self._get_dirty(items) if self.dirty_rects else None
+        if dirty is not None and not len(dirty):
+            return  # Nothing has changed since the last frame
+        blit_surface = surface.SDL_BlitSurface
+        imgsurface = self.surface
+        if self._background is not None:
+            self._restore_background(dirty)
+        if dirty is None or self._background is None:
+            for sprite, sx, sy in items:
+                r.x, r.y = sx, sy
                 blit_surface(sprite.surface, None, imgsurface, r)
         else:
-            r.x = sprites.x
-            r.y = sprites.y
-            if x is not None and y is not None:
-                r.x = x
-                r.y = y
-            surface.SDL_BlitSurface(sprites.surface, None, self.surface, r)
-        video.SDL_UpdateWindowSurface(self.window)
+            # Only redraw the parts of the sprites within the changed areas
+            for dx, dy, dw, dh in dirty:
+                surface.SDL_SetClipRect(imgsurface, rect.SDL_Rect(dx, dy, dw, dh))
+                for sprite, sx, sy in items:
+                    w, h = sprite.size
+                    if sx < dx + dw and dx < sx + w and sy < dy + dh and dy < sy + h:
+                        r.x, r.y = sx, sy
+                        blit_surface(sprite.surface, None, imgsurface, r)
+            surface.SDL_SetClipRect(imgsurface, None)
+        if dirty is None:
+            video.SDL_UpdateWindowSurface(self.window)
+        else:
+            _update_window_rects(self.window, dirty)
 
 
 class TextureSpriteRenderSystem(SpriteRenderSystem):
@@ -326,12 +570,29 @@ class TextureSpriteRenderSystem(SpriteRenderSystem):
             raise TypeError("unsupported object type")
         self.sdlrenderer = sdlrenderer
         self.componenttypes = (TextureSprite,)
+        self._layers = _DepthLayers()
 
     def __del__(self):
         self.sdlrenderer = None
         if hasattr(self, "_renderer"):
             self._renderer = None
 
+    def process(self, world, components):
+        """Draws the passed TextureSprite objects in order of depth.
+
+        With the default :attr:`sortfunc`, the depth order of the sprites is
+        kept between frames and only updated for sprites that have been added,
+        removed, or had their depth changed. Sprites with the same depth are
+        grouped by texture, allowing SDL to batch their draw calls together.
+        If a custom :attr:`sortfunc` is set, the sprites are fully sorted
+        every frame instead.
+
+        """
+        if self._sortfunc is not _get_depth:
+            self.render(sorted(components, key=self._sortfunc))
+            return
+        self.render(self._layers.update(components))
+
     def render(self, sprites, x=None, y=None):
         """Draws the passed sprites (or sprite).
 
@@ -343,27 +604,38 @@ class TextureSpriteRenderSystem(SpriteRenderSystem):
         sprite's position. If sprites is a single TextureSprite, x and y
         denote the absolute position of the TextureSprite, if set.
         """
-        r = rect.SDL_Rect(0, 0, 0, 0)
-        rcopy = render.SDL_RenderCopyEx
+        if hasattr(self, "_renderer"):
+            self._renderer.flush()  # Submit any deferred draw calls first
+        if dll.version >= 2010:
+            r = rect.SDL_FRect(0, 0, 0, 0)
+            copy, copy_ex = render.SDL_RenderCopyF, render.SDL_RenderCopyExF
+        else:
+            r = rect.SDL_Rect(0, 0, 0, 0)
+            copy, copy_ex = render.SDL_RenderCopy, render.SDL_RenderCopyEx
         if isiterable(sprites):
-            renderer = self.sdlrenderer
             x = x or 0
             y = y or 0
-            for sprite in sprites:
-                r.x = x + sprite.x
-                r.y = y + sprite.y
-                r.w, r.h = sprite.size
-                if rcopy(renderer, sprite.texture, None, r, sprite.angle,
-                         sprite.center, sprite.flip) == -1:
-                    raise SDLError()
         else:
-            r.x = sprites.x
-            r.y = sprites.y
-            r.w, r.h = sprites.size
-            if x is not None and y is not None:
-                r.x = x
-                r.y = y
-            if rcopy(self.sdlrenderer, sprites.texture, None, r, sprites.angle,
-                     sprites.center, sprites.flip) == -1:
+            if x is None or y is None:
+                x, y = (0, 0)
+            else:
+                x, y = (x - sprites.x, y - sprites.y)
+            sprites = [sprites]
+        renderer = self.sdlrenderer
+        flip_none = render.SDL_FLIP_NONE
+        for sprite in sprites:
+            r.x = x + sprite.x
+            r.y = y + sprite.y
+            r.w, r.h = sprite.size
+            if sprite.angle == 0 and sprite.flip == flip_none:
+                # Use the simpler copy function when no transforms are needed
+                ret = copy(renderer, sprite.texture, sprite.srcrect, r)
+            else:
+                center = sprite.center
+                if center is not None and copy_ex is render.SDL_RenderCopyExF:
+                    center = rect.SDL_FPoint(center.x, center.y)
+                ret = copy_ex(renderer, sprite.texture, sprite.srcrect, r,
+                              sprite.angle, center, sprite.flip)
+            if ret == -1:
                 raise SDLError()
         render.SDL_RenderPresent(self.sdlrenderer)
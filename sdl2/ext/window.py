@@ -1,9 +1,9 @@
 """Window routines to manage on-screen windows."""
 from ctypes import c_int, byref
-from .compat import stringify, utf8
+from .compat import stringify, utf8, isiterable
 from .err import SDLError, raise_sdl_err
 from .displays import _check_video_init
-from .. import video
+from .. import video, rect
 
 __all__ = ["Window"]
 
@@ -19,6 +19,44 @@ def _get_sdl_window(w, argname="window"):
     return w
 
 
+def _merge_rects(rects, bounds=None):
+    # Clips a list of (x, y, w, h) rects to a (w, h) area (if given) and merges
+    # any overlapping rects into their bounding boxes, so that no area is
+    # covered by more than one of the returned rects
+    out = []
+    for r in rects:
+        if isinstance(r, rect.SDL_Rect):
+            r = (r.x, r.y, r.w, r.h)
+        x1, y1, x2, y2 = r[0], r[1], r[0] + r[2], r[1] + r[3]
+        if bounds:
+            x1, y1 = max(x1, 0), max(y1, 0)
+            x2, y2 = min(x2, bounds[0]), min(y2, bounds[1])
+        if x2 <= x1 or y2 <= y1:
+            continue
+        merged = True
+        while merged:
+            merged = False
+            for i, (ox1, oy1, ox2, oy2) in enumerate(out):
+                if x1 < ox2 and ox1 < x2 and y1 < oy2 and oy1 < y2:
+                    x1, y1 = min(x1, ox1), min(y1, oy1)
+                    x2, y2 = max(x2, ox2), max(y2, oy2)
+                    del out[i]
+                    merged = True
+                    break
+        out.append((x1, y1, x2, y2))
+    return [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in out]
+
+
+def _update_window_rects(window, rects):
+    # Updates the given (already merged) areas of a window surface
+    if not len(rects):
+        return
+    arr = (rect.SDL_Rect * len(rects))(*[rect.SDL_Rect(*r) for r in rects])
+    ret = video.SDL_UpdateWindowSurfaceRects(window, arr, len(rects))
+    if ret < 0:
+        raise_sdl_err("updating the window surface")
+
+
 class Window(object):
     """Creates a visible window with an optional border and title text.
 
@@ -241,16 +279,34 @@ class Window(object):
         self._ensure_window("restore")
         video.SDL_RestoreWindow(self.window)
 
-    def refresh(self):
+    def refresh(self, rects=None):
         """Updates the window to reflect any changes made to its surface.
 
+        By default, the entire window surface is copied to the screen. If only
+        a few small areas of the surface have changed since the last refresh,
+        it can be much faster to only update those areas by passing a list of
+        'dirty' rectangles. Overlapping rectangles are merged before updating,
+        so each part of the window is copied at most once.
+
         .. note::
            This only needs to be called if the window surface was acquired and
            modified using :meth:`get_surface`.
 
+        Args:
+            rects (list, optional): A list of ``(x, y, w, h)`` tuples or
+                :obj:`~sdl2.SDL_Rect` objects specifying the areas of the
+                window to update. Defaults to updating the whole window.
+
         """
         self._ensure_window("refresh")
-        video.SDL_UpdateWindowSurface(self.window)
+        if rects is None:
+            video.SDL_UpdateWindowSurface(self.window)
+            return
+        if isinstance(rects, rect.SDL_Rect) or (
+                isiterable(rects) and len(rects) == 4 and
+                not isiterable(rects[0])):
+            rects = [rects]
+        _update_window_rects(self.window, _merge_rects(rects, self.size))
 
     def get_surface(self):
         """Gets the :obj:`~sdl2.SDL_Surface` used by the window.
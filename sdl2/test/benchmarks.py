@@ -0,0 +1,590 @@
+"""Micro-benchmarks for the hot paths of the sdl2.ext package.
+
+The benchmarks run headlessly using SDL's dummy video driver and software
+renderer, so they can be run on any machine (including CI servers) with::
+
+   python -m sdl2.test.benchmarks
+
+For each benchmark, the number of calls per second (the best of several timed
+rounds) is reported along with the memory allocated by a single call, as
+measured with :mod:`tracemalloc`. Since Python doesn't expose a count of the
+individual allocations made by a call, the latter is given as the peak number
+of bytes allocated during the call and the number of bytes still allocated
+after it returns (which should be zero unless the call caches or leaks data).
+
+Results can be saved as a JSON baseline with ``--save``, and a later run can
+be compared against a saved baseline with ``--compare``. In compare mode, any
+benchmark that is slower than its baseline by more than ``--threshold``
+(10% by default) is flagged as a regression and the script exits with a
+non-zero status.
+
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import sdl2
+from sdl2 import ext as sdl2ext
+from sdl2.ext import particles
+from sdl2.ext.renderer import _sanitize_points
+
+try:
+    import numpy
+    _HASNUMPY = True
+except ImportError:
+    _HASNUMPY = False
+
+__all__ = ["SkipBenchmark", "benchmark", "run_benchmarks", "compare",
+           "main"]
+
+
+RESOURCES = sdl2ext.Resources(__file__, "resources")
+
+_clock = getattr(time, "perf_counter", time.time)
+
+_BENCHMARKS = []
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark's setup function if it can't run here."""
+    pass
+
+
+def benchmark(name):
+    """Registers a benchmark setup function under a given name.
+
+    The setup function takes no arguments and returns a tuple containing a
+    function to benchmark (called with no arguments) and a cleanup function
+    (or ``None``). If the benchmark can't run in the current environment
+    (e.g. due to a missing optional dependency), the setup function should
+    raise :exc:`SkipBenchmark`.
+
+    """
+    def decorator(func):
+        _BENCHMARKS.append((name, func))
+        return func
+    return decorator
+
+
+@benchmark("renderer_copy")
+def _bench_renderer_copy():
+    target = sdl2ext.surface._create_surface((256, 256), fmt="ARGB8888")
+    renderer = sdl2ext.Renderer(target)
+    sprite = sdl2ext.surface._create_surface((32, 32), (255, 0, 0))
+    tx = sdl2ext.Texture(renderer, sprite)
+    sdl2.SDL_FreeSurface(sprite)
+
+    def run():
+        renderer.copy(tx, dstrect=(16, 16))
+
+    def cleanup():
+        tx.destroy()
+        renderer.destroy()
+        sdl2.SDL_FreeSurface(target)
+
+    return run, cleanup
+
+
+@benchmark("quad_renderer")
+def _bench_quad_renderer():
+    if not _HASNUMPY:
+        raise SkipBenchmark("numpy is not available")
+    if sdl2.dll.version < 2018:
+        raise SkipBenchmark("SDL 2.0.18 or newer is required")
+    target = sdl2ext.surface._create_surface((256, 256), fmt="ARGB8888")
+    renderer = sdl2ext.Renderer(target)
+    sprite = sdl2ext.surface._create_surface((4, 4), (255, 0, 0))
+    tx = sdl2ext.Texture(renderer, sprite)
+    sdl2.SDL_FreeSurface(sprite)
+    quads = sdl2ext.QuadRenderer(renderer)
+    x = numpy.arange(1000, dtype=numpy.float32) % 256
+    y = numpy.arange(1000, dtype=numpy.float32) // 4
+
+    def run():
+        quads.draw(tx, x, y, 4)
+
+    def cleanup():
+        tx.destroy()
+        renderer.destroy()
+        sdl2.SDL_FreeSurface(target)
+
+    return run, cleanup
+
+
+@benchmark("renderer_fill")
+def _bench_renderer_fill():
+    target = sdl2ext.surface._create_surface((256, 256), fmt="ARGB8888")
+    renderer = sdl2ext.Renderer(target)
+    rects = [(x * 8, x * 4, 16, 16) for x in range(32)]
+
+    def run():
+        renderer.fill(rects, (0, 255, 0))
+
+    def cleanup():
+        renderer.destroy()
+        sdl2.SDL_FreeSurface(target)
+
+    return run, cleanup
+
+
+@benchmark("sanitize_points")
+def _bench_sanitize_points():
+    points = [(x, x * 2) for x in range(100)]
+
+    def run():
+        _sanitize_points(points)
+
+    return run, None
+
+
+class _Position(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class _Velocity(object):
+    def __init__(self, vx, vy):
+        self.vx = vx
+        self.vy = vy
+
+
+class _DampingSystem(sdl2ext.System):
+    def __init__(self):
+        super(_DampingSystem, self).__init__()
+        self.componenttypes = (_Velocity,)
+
+    def process(self, world, components):
+        for vel in components:
+            vel.vx *= 0.99
+            vel.vy *= 0.99
+
+
+class _MovementSystem(sdl2ext.Applicator):
+    def __init__(self):
+        super(_MovementSystem, self).__init__()
+        self.componenttypes = (_Position, _Velocity)
+
+    def process(self, world, componentsets):
+        for pos, vel in componentsets:
+            pos.x += vel.vx
+            pos.y += vel.vy
+
+
+class _Mover(sdl2ext.Entity):
+    def __init__(self, world, i):
+        self.position = _Position(i, i)
+        self.velocity = _Velocity(1.0, -1.0)
+
+
+def _create_world(storage):
+    world = sdl2ext.World(storage=storage)
+    world.add_system(_DampingSystem())
+    world.add_system(_MovementSystem())
+    for i in range(1000):
+        _Mover(world, i)
+    return world
+
+
+@benchmark("world_process")
+def _bench_world_process():
+    return _create_world("dict").process, None
+
+
+@benchmark("world_process_archetype")
+def _bench_world_process_archetype():
+    return _create_world("archetype").process, None
+
+
+class _ArrayPosition(sdl2ext.ArrayComponent):
+    _fields_ = [("x", "f8"), ("y", "f8")]
+
+
+class _ArrayVelocity(sdl2ext.ArrayComponent):
+    _fields_ = [("vx", "f8"), ("vy", "f8")]
+
+
+class _ArrayMovementSystem(sdl2ext.ArraySystem):
+    def __init__(self):
+        super(_ArrayMovementSystem, self).__init__()
+        self.componenttypes = (_ArrayPosition, _ArrayVelocity)
+
+    def process(self, world, arrays):
+        pos, vel = arrays
+        vel.vx *= 0.99
+        vel.vy *= 0.99
+        pos.x += vel.vx
+        pos.y += vel.vy
+
+
+class _ArrayMover(sdl2ext.Entity):
+    def __init__(self, world, i):
+        self._arrayposition = _ArrayPosition(i, i)
+        self._arrayvelocity = _ArrayVelocity(1.0, -1.0)
+
+
+@benchmark("world_process_arrays")
+def _bench_world_process_arrays():
+    if not _HASNUMPY:
+        raise SkipBenchmark("numpy is not available")
+    world = sdl2ext.World()
+    world.add_system(_ArrayMovementSystem())
+    for i in range(1000):
+        _ArrayMover(world, i)
+    return world.process, None
+
+
+@benchmark("entity_churn")
+def _bench_entity_churn():
+    world = sdl2ext.World()
+
+    def run():
+        movers = [_Mover(world, i) for i in range(100)]
+        world.delete_entities(movers)
+
+    return run, None
+
+
+@benchmark("entity_churn_bulk")
+def _bench_entity_churn_bulk():
+    world = sdl2ext.World()
+
+    def run():
+        movers = [sdl2ext.Entity(world) for i in range(100)]
+        world.add_components(movers, [_Position(i, i) for i in range(100)])
+        world.add_components(movers, [_Velocity(1.0, -1.0)] * 100)
+        world.delete_entities(movers)
+
+    return run, None
+
+
+@benchmark("world_snapshot")
+def _bench_world_snapshot():
+    return _create_world("dict").snapshot, None
+
+
+@benchmark("world_restore")
+def _bench_world_restore():
+    world = _create_world("dict")
+    snapshot = world.snapshot()
+    return lambda: world.restore(snapshot), None
+
+
+def _respawn(world, deadones):
+    for p in deadones:
+        p.life = 100
+
+
+def _noop(world, particles):
+    pass
+
+
+@benchmark("particles")
+def _bench_particles():
+    engine = particles.ParticleEngine()
+    engine.createfunc = _respawn
+    engine.updatefunc = _noop
+    engine.deletefunc = _noop
+    plist = [particles.Particle(i, i, i % 100 + 1) for i in range(10000)]
+    return lambda: engine.process(None, plist), None
+
+
+@benchmark("particles_array")
+def _bench_particles_array():
+    if not _HASNUMPY:
+        raise SkipBenchmark("numpy is not available")
+    engine = particles.ArrayParticleEngine()
+    engine.createfunc = lambda world, buf, ndead: buf.emit(ndead, life=100)
+    buf = particles.ParticleBuffer(100000)
+    buf.emit(100000, vx=1, vy=-1, life=numpy.arange(100000) % 100 + 1)
+    return lambda: engine.process(None, [buf]), None
+
+
+@benchmark("pixels2d")
+def _bench_pixels2d():
+    if not _HASNUMPY:
+        raise SkipBenchmark("numpy is not available")
+    sf = sdl2ext.surface._create_surface((256, 256), fmt="ARGB8888")
+
+    def run():
+        sdl2ext.pixels2d(sf)
+
+    def cleanup():
+        sdl2.SDL_FreeSurface(sf)
+
+    return run, cleanup
+
+
+@benchmark("ndarray_to_surface")
+def _bench_ndarray_to_surface():
+    if not _HASNUMPY:
+        raise SkipBenchmark("numpy is not available")
+    arr = numpy.zeros((512, 512), dtype=numpy.uint32)
+
+    def run():
+        sdl2.SDL_FreeSurface(sdl2ext.ndarray_to_surface(arr))
+
+    return run, None
+
+
+@benchmark("pixelview")
+def _bench_pixelview():
+    sf = sdl2ext.surface._create_surface((64, 64), fmt="ARGB8888")
+    view = sdl2ext.PixelView(sf)
+
+    def run():
+        for y in range(64):
+            row = view[y]
+            for x in range(64):
+                row[x]
+        view[16:48, 16:48] = 0
+
+    def cleanup():
+        sdl2.SDL_FreeSurface(sf)
+
+    return run, cleanup
+
+
+@benchmark("fontttf_render_text")
+def _bench_fontttf_render_text():
+    if not sdl2ext.ttf._HASSDLTTF:
+        raise SkipBenchmark("SDL_ttf is not available")
+    font = sdl2ext.FontTTF(RESOURCES.get_path("tuffy.ttf"), 20, (255, 255, 255))
+
+    def run():
+        sf = font.render_text("The quick brown fox jumps over the lazy dog")
+        sdl2.SDL_FreeSurface(sf)
+
+    return run, font.close
+
+
+@benchmark("get_events")
+def _bench_get_events():
+    event = sdl2.SDL_Event()
+    event.type = sdl2.SDL_USEREVENT
+
+    def run():
+        for i in range(25):
+            sdl2.SDL_PushEvent(event)
+        sdl2ext.get_events()
+
+    return run, None
+
+
+def _time_calls(func, duration, rounds=5):
+    # Calibrate the number of calls per round so that each round takes about
+    # duration / rounds seconds, then return the best rate over all rounds
+    target = duration / float(rounds)
+    n = 1
+    while True:
+        start = _clock()
+        for i in range(n):
+            func()
+        elapsed = _clock() - start
+        if elapsed >= target * 0.2 or n >= 10 ** 7:
+            break
+        n *= 10 if elapsed < target * 0.02 else 2
+    best = n / max(elapsed, 1e-9)
+    n = max(1, int(best * target))
+    for r in range(rounds):
+        start = _clock()
+        for i in range(n):
+            func()
+        elapsed = _clock() - start
+        best = max(best, n / max(elapsed, 1e-9))
+    return best
+
+
+def _measure_memory(func, calls=20):
+    # Returns the average peak and retained bytes allocated per call
+    if tracemalloc is None or not hasattr(tracemalloc, "reset_peak"):
+        return None, None
+    func()  # Make sure any lazy caches are initialized first
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        peaks = 0
+        for i in range(calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks += tracemalloc.get_traced_memory()[1] - before
+        retained = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    return peaks // calls, max(0, retained // calls)
+
+
+def run_benchmarks(duration=1.0, names=None, out=None):
+    """Runs the registered benchmarks and returns their results.
+
+    SDL is initialized before and quit after running the benchmarks.
+
+    Args:
+        duration (float, optional): The approximate number of seconds to
+            spend timing each benchmark. Defaults to 1 second.
+        names (list, optional): If specified, only benchmarks whose names
+            contain one of the given strings will be run.
+        out (file, optional): A file-like object to which progress should be
+            written. Defaults to not writing any progress.
+
+    Returns:
+        dict: A dict mapping the name of each benchmark to a dict containing
+        its ``ops_per_sec``, ``peak_bytes`` and ``retained_bytes`` results,
+        or ``None`` for each benchmark that was skipped.
+
+    """
+    results = {}
+    ret = sdl2.SDL_Init(sdl2.SDL_INIT_VIDEO | sdl2.SDL_INIT_EVENTS)
+    if ret != 0:
+        sdl2ext.raise_sdl_err("initializing SDL for the benchmarks")
+    try:
+        for name, setup in _BENCHMARKS:
+            if names and not any(n in name for n in names):
+                continue
+            try:
+                func, cleanup = setup()
+            except SkipBenchmark as e:
+                results[name] = None
+                if out:
+                    out.write("{0:<24} skipped ({1})\n".format(name, e))
+                continue
+            try:
+                ops = _time_calls(func, duration)
+                peak, retained = _measure_memory(func)
+            finally:
+                if cleanup:
+                    cleanup()
+            results[name] = {
+                "ops_per_sec": ops,
+                "peak_bytes": peak,
+                "retained_bytes": retained,
+            }
+            if out:
+                out.write(_format_result(name, results[name]) + "\n")
+    finally:
+        sdl2.SDL_Quit()
+    return results
+
+
+def _format_result(name, result):
+    line = "{0:<24} {1:>14,.1f} ops/sec".format(name, result["ops_per_sec"])
+    if result["peak_bytes"] is not None:
+        line += "  {0:>9,} B peak  {1:>7,} B retained".format(
+            result["peak_bytes"], result["retained_bytes"]
+        )
+    return line
+
+
+def compare(baseline, results, threshold=0.1):
+    """Compares benchmark results against a saved baseline.
+
+    Benchmarks that were skipped or are missing from either set of results
+    are ignored.
+
+    Args:
+        baseline (dict): The baseline results, in the format returned by
+            :func:`run_benchmarks`.
+        results (dict): The new results, in the same format.
+        threshold (float, optional): The relative slowdown (e.g. ``0.1`` for
+            10% fewer ops/sec) above which a benchmark is considered to have
+            regressed. Defaults to 0.1.
+
+    Returns:
+        list: A list of ``(name, baseline_ops, new_ops, change)`` tuples for
+        each compared benchmark, where ``change`` is the relative change in
+        ops/sec (negative for slowdowns), sorted from slowest to fastest.
+
+    """
+    diffs = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not (base and result):
+            continue
+        old, new = base["ops_per_sec"], result["ops_per_sec"]
+        diffs.append((name, old, new, (new - old) / float(old)))
+    return sorted(diffs, key=lambda d: d[3])
+
+
+def _environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "sdl": "{0}.{1}.{2}".format(*sdl2.version_info[:3]),
+        "pysdl2": sdl2.__version__,
+    }
+
+
+def main(argv=None):
+    """Runs the benchmarks from the command line.
+
+    Returns:
+        int: 0 on success, or 1 if any regressions were found when comparing
+        against a baseline.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sdl2.test.benchmarks",
+        description="Headless micro-benchmarks for sdl2.ext."
+    )
+    parser.add_argument("filter", nargs="*",
+        help="only run benchmarks whose names contain these strings")
+    parser.add_argument("-d", "--duration", type=float, default=1.0,
+        help="seconds to spend timing each benchmark (default: 1.0)")
+    parser.add_argument("-s", "--save", metavar="PATH",
+        help="save the results as a JSON baseline")
+    parser.add_argument("-c", "--compare", metavar="PATH",
+        help="compare the results against a saved JSON baseline")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+        help="relative slowdown flagged as a regression (default: 0.1)")
+    parser.add_argument("-l", "--list", action="store_true",
+        help="list the available benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, setup in _BENCHMARKS:
+            print(name)
+        return 0
+
+    results = run_benchmarks(args.duration, args.filter, sys.stdout)
+    if args.save:
+        with open(args.save, "w") as f:
+            data = {"environment": _environment(), "benchmarks": results}
+            json.dump(data, f, indent=2, sort_keys=True)
+        print("\nSaved results to '{0}'".format(args.save))
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["benchmarks"]
+        print("\nComparison against '{0}':".format(args.compare))
+        for name, old, new, change in compare(baseline, results):
+            flag = ""
+            if change < -args.threshold:
+                flag = "  <-- REGRESSION"
+                regressions += 1
+            print("{0:<24} {1:>14,.1f} -> {2:>14,.1f} ops/sec ({3:+.1%}){4}"
+                  .format(name, old, new, change, flag))
+        if regressions:
+            print("\n{0} benchmark(s) regressed by more than {1:.0%}".format(
+                regressions, args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    # Make sure we run headlessly unless explicitly told otherwise. This is
+    # only done here so that importing the module or calling main() (e.g.
+    # from the test suite) doesn't change the SDL drivers of the process.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("SDL_RENDER_DRIVER", "software")
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+from sdl2.test import benchmarks
+
+# NOTE: These tests only make sure that the benchmark suite itself works, they
+# don't check the performance of anything.
+
+
+def test_run_benchmarks():
+    results = benchmarks.run_benchmarks(0.01, ["sanitize_points", "world"])
+    assert "sanitize_points" in results
+    assert "world_process" in results
+    for name, result in results.items():
+        assert result["ops_per_sec"] > 0
+        if result["peak_bytes"] is not None:
+            assert result["peak_bytes"] >= 0
+            assert result["retained_bytes"] >= 0
+
+def test_skip_benchmark():
+    @benchmarks.benchmark("_test_skipped")
+    def _skipped():
+        raise benchmarks.SkipBenchmark("testing")
+    try:
+        results = benchmarks.run_benchmarks(0.01, ["_test_skipped"])
+        assert results == {"_test_skipped": None}
+    finally:
+        benchmarks._BENCHMARKS.pop()
+
+def test_compare():
+    baseline = {
+        "a": {"ops_per_sec": 100.0},
+        "b": {"ops_per_sec": 100.0},
+        "c": None,
+        "d": {"ops_per_sec": 100.0},
+    }
+    results = {
+        "a": {"ops_per_sec": 150.0},
+        "b": {"ops_per_sec": 80.0},
+        "c": {"ops_per_sec": 80.0},
+        "e": {"ops_per_sec": 80.0},
+    }
+    diffs = benchmarks.compare(baseline, results)
+    assert [d[0] for d in diffs] == ["b", "a"]
+    assert diffs[0][1:] == (100.0, 80.0, pytest.approx(-0.2))
+    assert diffs[1][3] == pytest.approx(0.5)
+
+def test_main(tmpdir, capsys):
+    path = str(tmpdir.join("baseline.json"))
+    args = ["sanitize_points", "-d", "0.01"]
+    assert benchmarks.main(args + ["--save", path]) == 0
+    with open(path, "r") as f:
+        data = json.load(f)
+    assert "sanitize_points" in data["benchmarks"]
+    assert "python" in data["environment"]
+    # Make the baseline impossibly fast to force a regression
+    data["benchmarks"]["sanitize_points"]["ops_per_sec"] = 1e15
+    with open(path, "w") as f:
+        json.dump(data, f)
+    assert benchmarks.main(args + ["--compare", path]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+def test_import_keeps_environment():
+    # Importing the benchmarks must not change the SDL drivers of the process
+    env = dict(os.environ)
+    for name in ("SDL_VIDEODRIVER", "SDL_AUDIODRIVER", "SDL_RENDER_DRIVER"):
+        env.pop(name, None)
+    code = (
+        "import os, sdl2.test.benchmarks; "
+        "print(os.environ.get('SDL_RENDER_DRIVER'))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    )))
+    out = subprocess.check_output(
+        [sys.executable, "-c", code], env=env, cwd=root
+    )
+    assert out.decode("utf-8").strip().splitlines()[-1] == "None"
@@ -312,6 +312,65 @@ class TestExtMemoryView(object):
         with pytest.raises(IndexError):
             view[10]
 
+    def test_slicing(self):
+        source = bytearray(range(80))
+        view = sdlextarray.MemoryView(source, 4, (4, 5))
+        item = lambda i: source[i * 4:(i + 1) * 4]
+        assert view[1][2] == view[1, 2] == item(7)
+        assert view[-1, -1] == item(19)
+        rows = view[1:3]
+        assert rows.strides == (2, 5)
+        assert rows[0, 0] == item(5)
+        assert view[1:3, 1:3].tolist() == [
+            [item(6), item(7)], [item(11), item(12)]
+        ]
+        assert view[:, 2].tolist() == [item(i) for i in (2, 7, 12, 17)]
+        assert view[::-2, ::2].tolist() == [
+            [item(15), item(17), item(19)], [item(5), item(7), item(9)]
+        ]
+        assert view[2:2].strides == (0, 5)
+        assert view[1:3].tobytes() == bytes(source[20:60])
+        assert view[:, 0].tobytes() == bytes(
+            item(0) + item(5) + item(10) + item(15)
+        )
+        assert bytes(view[1:3].to_memoryview()) == bytes(source[20:60])
+        assert view[1:3].to_memoryview().shape == (2, 5)
+        with pytest.raises(BufferError):
+            view[:, 1:3].to_memoryview()
+        with pytest.raises(IndexError):
+            view[4, 0]
+        with pytest.raises(IndexError):
+            view[0, 0, 0]
+        with pytest.raises(TypeError):
+            view[0, "a"]
+
+    def test_assign(self):
+        buf = (ctypes.c_ubyte * 48)()
+        view = sdlextarray.MemoryView(buf, 4, (3, 4))
+        # Single items are still set from itemsize-byte sequences
+        flat = sdlextarray.MemoryView(buf, 4, (12,))
+        flat[0] = b"\x01\x02\x03\x04"
+        assert list(buf[:4]) == [1, 2, 3, 4]
+        assert flat[0] == [1, 2, 3, 4]
+        assert view[0, 0] == [1, 2, 3, 4]
+        view[0, 1] = [5, 6, 7, 8]
+        assert list(buf[4:8]) == [5, 6, 7, 8]
+        # Multiple items are set from bytes-like objects or sequences of items
+        view[1:3, 2:4] = b"\x09" * 16
+        assert list(buf[24:32]) == [9] * 8
+        assert list(buf[40:48]) == [9] * 8
+        assert list(buf[32:40]) == [0] * 8
+        view[:, 0] = bytearray(range(12))
+        assert list(buf[16:20]) == [4, 5, 6, 7]
+        view[2, ::-1] = struct.pack("=4I", 1, 2, 3, 4)
+        assert view[2].tobytes() == struct.pack("=4I", 4, 3, 2, 1)
+        view[0:2] = [[b"\x01" * 4] * 4, [b"\x02" * 4] * 4]
+        assert list(buf[:32]) == [1] * 16 + [2] * 16
+        with pytest.raises(ValueError):
+            view[0] = [b"\x01" * 4] * 2
+        with pytest.raises(ValueError):
+            view[0:1] = bytes(4)
+
     def test_ndim_strides(self):
         source = "Example buffer"
         view = sdlextarray.MemoryView(source, 1, (len(source),))
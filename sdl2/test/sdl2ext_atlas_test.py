@@ -0,0 +1,191 @@
+import pytest
+
+import sdl2
+from sdl2 import ext as sdl2ext
+from sdl2.ext.atlas import _SkylinePacker
+from sdl2.surface import SDL_CreateRGBSurface, SDL_FreeSurface
+
+
+def _solid_surface(w, h, color):
+    sf = SDL_CreateRGBSurface(0, w, h, 32, 0, 0, 0, 0)
+    sdl2ext.fill(sf, color)
+    return sf
+
+def _rgb(view, x, y):
+    return view[y][x] & 0xFFFFFF
+
+
+class TestSkylinePacker(object):
+    __tags__ = ["sdl2ext"]
+
+    def test_insert(self):
+        packer = _SkylinePacker(16, 16)
+        assert packer.insert(8, 4) == (0, 0)
+        assert packer.insert(8, 8) == (8, 0)
+        assert packer.insert(8, 4) == (0, 4)
+        assert packer.insert(16, 8) == (0, 8)
+        assert packer.insert(1, 1) is None
+        assert packer.insert(32, 1) is None
+
+    def test_grow(self):
+        packer = _SkylinePacker(8, 8)
+        assert packer.insert(8, 8) == (0, 0)
+        assert packer.insert(8, 8) is None
+        packer.grow(16, 8)
+        assert packer.insert(8, 8) == (8, 0)
+        packer.grow(16, 16)
+        assert packer.insert(16, 8) == (0, 8)
+
+
+class TestExtTextureAtlas(object):
+    __tags__ = ["sdl", "sdl2ext"]
+
+    def test_init(self, with_sdl):
+        sf = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        atlas = sdl2ext.TextureAtlas(renderer, size=(32, 32))
+        assert len(atlas) == 0
+        assert atlas.pages == []
+        with pytest.raises(TypeError):
+            sdl2ext.TextureAtlas(sf)
+        atlas.destroy()
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_add_remove(self, with_sdl):
+        sf = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        atlas = sdl2ext.TextureAtlas(renderer, size=(32, 32), padding=0)
+        img = _solid_surface(16, 16, 0xFF0000)
+        sp1 = atlas.add("red", img)
+        sp2 = atlas.add("red2", img)
+        assert isinstance(sp1, sdl2ext.AtlasSprite)
+        assert isinstance(sp1, sdl2ext.TextureSprite)
+        assert len(atlas) == 2 and "red" in atlas
+        assert len(atlas.pages) == 1
+        assert sp1.size == (16, 16)
+        assert sp1.texture_size == (32, 32)
+        assert sp1.texture == sp2.texture
+        assert (sp1.srcrect.x, sp1.srcrect.y) != (sp2.srcrect.x, sp2.srcrect.y)
+        assert atlas.sprite("red").srcrect == sp1.srcrect
+        with pytest.raises(KeyError):
+            atlas.sprite("blue")
+
+        # Test growing the page when full
+        for i in range(3):
+            atlas.add(i, img)
+        assert len(atlas.pages) == 1
+        assert sp1.texture_size in ((64, 32), (32, 64))
+        assert sp1.texture == sp2.texture
+
+        # Test creating a new page once the page can't grow any further
+        atlas2 = sdl2ext.TextureAtlas(
+            renderer, size=(16, 16), max_size=(16, 16), padding=0
+        )
+        a = atlas2.add("a", img)
+        b = atlas2.add("b", img)
+        assert len(atlas2.pages) == 2
+        assert a.texture != b.texture
+        with pytest.raises(ValueError):
+            atlas2.add("big", _solid_surface(32, 8, 0xFF0000))
+
+        # Test removing images and repacking
+        for i in range(3):
+            atlas.remove(i)
+        atlas.remove("red")
+        assert len(atlas) == 1 and "red" not in atlas
+        atlas.repack()
+        assert atlas.sprite("red2").srcrect.x == 0
+        assert atlas.sprite("red2").srcrect.y == 0
+        assert sp2.srcrect.x == 0
+        atlas2.remove("a")
+        atlas2.repack()
+        assert len(atlas2.pages) == 1
+
+        atlas.destroy()
+        atlas2.destroy()
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_render(self, with_sdl):
+        target = SDL_CreateRGBSurface(0, 64, 64, 32, 0, 0, 0, 0)
+        sdl2ext.fill(target, 0x0)
+        renderer = sdl2ext.Renderer(target.contents)
+        view = sdl2ext.PixelView(target.contents)
+        atlas = sdl2ext.TextureAtlas(renderer, size=(16, 16))
+        red = atlas.add("red", _solid_surface(8, 8, 0xFF0000))
+        green = atlas.add("green", _solid_surface(8, 8, 0x00FF00))
+        blue = atlas.add("blue", _solid_surface(16, 16, 0x0000FF))
+        assert red.texture == blue.texture
+
+        # Test rendering with Renderer.copy
+        renderer.copy(red, dstrect=(0, 0))
+        renderer.copy(blue, dstrect=(8, 0))
+        renderer.copy(green, srcrect=(0, 0, 4, 4), dstrect=(0, 8, 8, 8))
+        renderer.present()
+        assert _rgb(view, 0, 0) == 0xFF0000
+        assert _rgb(view, 7, 7) == 0xFF0000
+        assert _rgb(view, 8, 0) == 0x0000FF
+        assert _rgb(view, 23, 15) == 0x0000FF
+        assert _rgb(view, 24, 0) == 0x0
+        assert _rgb(view, 7, 15) == 0x00FF00
+
+        # Test rendering with a TextureSpriteRenderSystem
+        sdl2ext.fill(target, 0x0)
+        spriterenderer = sdl2ext.TextureSpriteRenderSystem(renderer)
+        red.position = (32, 32)
+        green.position = (40, 40)
+        spriterenderer.render([red, green])
+        assert _rgb(view, 32, 32) == 0xFF0000
+        assert _rgb(view, 40, 40) == 0x00FF00
+        assert _rgb(view, 48, 48) == 0x0
+
+        # Test rendering with a SpriteBatch
+        if sdl2.dll.version >= 2018:
+            sdl2ext.fill(target, 0x0)
+            batch = sdl2ext.SpriteBatch(renderer)
+            batch.add(red)
+            batch.add(blue, (0, 0))
+            batch.draw()
+            assert _rgb(view, 32, 32) == 0xFF0000
+            assert _rgb(view, 15, 15) == 0x0000FF
+            assert _rgb(view, 16, 16) == 0x0
+
+        atlas.destroy()
+        renderer.destroy()
+        SDL_FreeSurface(target)
+
+    def test_deferred(self, with_sdl):
+        target = SDL_CreateRGBSurface(0, 64, 64, 32, 0, 0, 0, 0)
+        sdl2ext.fill(target, 0x0)
+        renderer = sdl2ext.Renderer(target.contents)
+        renderer.deferred = True
+        view = sdl2ext.PixelView(target.contents)
+        atlas = sdl2ext.TextureAtlas(renderer, size=(16, 16), padding=0)
+        red = atlas.add("red", _solid_surface(8, 8, 0xFF0000))
+
+        # Test that deferred copies are drawn before a page is resized
+        renderer.copy(red, dstrect=(0, 0))
+        blue = atlas.add("blue", _solid_surface(16, 16, 0x0000FF))
+        assert red.texture == blue.texture
+        renderer.copy(blue, dstrect=(8, 0))
+        renderer.flush()
+        assert _rgb(view, 0, 0) == 0xFF0000
+        assert _rgb(view, 8, 0) == 0x0000FF
+
+        # Test that deferred copies are drawn before a page is repacked
+        sdl2ext.fill(target, 0x0)
+        renderer.copy(blue, dstrect=(0, 0))
+        atlas.remove("red")
+        atlas.repack()
+        renderer.flush()
+        assert _rgb(view, 0, 0) == 0x0000FF
+
+        # Test that deferred copies are drawn before the atlas is destroyed
+        sdl2ext.fill(target, 0x0)
+        renderer.copy(blue, dstrect=(0, 0))
+        atlas.destroy()
+        renderer.flush()
+        assert _rgb(view, 15, 15) == 0x0000FF
+        renderer.destroy()
+        SDL_FreeSurface(target)
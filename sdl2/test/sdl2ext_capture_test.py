@@ -0,0 +1,94 @@
+import threading
+import pytest
+
+from sdl2 import ext as sdl2ext
+from sdl2.surface import SDL_CreateRGBSurface, SDL_FreeSurface
+
+
+class TestExtCaptureRing(object):
+    __tags__ = ["sdl", "sdl2ext"]
+
+    def test_init(self, with_sdl):
+        sf = SDL_CreateRGBSurface(0, 16, 8, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        ring = sdl2ext.CaptureRing(renderer)
+        assert ring.size == (16, 8)
+        assert len(ring) == 0
+        assert ring.dropped == 0
+        assert not ring.closed
+        ring = sdl2ext.CaptureRing(renderer, slots=1, rect=(2, 2, 4, 4))
+        assert ring.size == (4, 4)
+        with pytest.raises(TypeError):
+            sdl2ext.CaptureRing(sf)
+        with pytest.raises(ValueError):
+            sdl2ext.CaptureRing(renderer, slots=0)
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_capture_get(self, with_sdl):
+        sf = SDL_CreateRGBSurface(0, 8, 8, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        ring = sdl2ext.CaptureRing(renderer, slots=2)
+        assert ring.get(timeout=0) is None
+
+        # Test capturing frames until the ring is full
+        renderer.clear(0xFF0000)
+        assert ring.capture()
+        renderer.clear(0x0000FF)
+        assert ring.capture()
+        assert not ring.capture()
+        assert ring.dropped == 1
+        assert len(ring) == 2
+
+        # Test retrieving frames in order and reusing released slots
+        frame = ring.get()
+        assert frame.number == 0
+        assert frame.size == (8, 8)
+        assert frame.pitch == 32
+        assert bytearray(frame.pixels)[0:3] == bytearray(b"\x00\x00\xFF")
+        sfc = frame.to_surface()
+        view = sdl2ext.PixelView(sfc.contents)
+        assert view[7][7] & 0xFFFFFF == 0xFF0000
+        del view
+        SDL_FreeSurface(sfc)
+        frame.release()
+        renderer.clear(0x00FF00)
+        assert ring.capture()
+        with ring.get() as frame:
+            assert frame.number == 1
+        with ring.get() as frame:
+            assert frame.number == 2
+            assert bytearray(frame.pixels)[0:3] == bytearray(b"\x00\xFF\x00")
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_background_thread(self, with_sdl):
+        sf = SDL_CreateRGBSurface(0, 8, 8, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        ring = sdl2ext.CaptureRing(renderer, slots=3)
+        numbers = []
+
+        def consume():
+            while True:
+                frame = ring.get()
+                if frame is None:
+                    break
+                with frame:
+                    numbers.append(frame.number)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        captured = 0
+        for i in range(20):
+            renderer.clear((i, i, i))
+            captured += int(ring.capture())
+        ring.close()
+        consumer.join(5)
+        assert not consumer.is_alive()
+        assert len(numbers) == captured
+        assert numbers == sorted(numbers)
+        assert captured + ring.dropped == 20
+        with pytest.raises(RuntimeError):
+            ring.capture()
+        renderer.destroy()
+        SDL_FreeSurface(sf)
@@ -1,6 +1,16 @@
 import sys
+import time
+import threading
 import pytest
-from sdl2.ext.ebs import Entity, System, Applicator, World
+from sdl2.ext.ebs import (Entity, System, Applicator, World, ArrayComponent,
+    ArraySystem, SystemScheduler, CommandBuffer, Query, TrackedComponent,
+    SystemProfiler)
+
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
 
 
 # Define some classes for testing the module
@@ -18,6 +28,14 @@ class Movement(object):
         self.vx = vx
         self.vy = vy
 
+class Health(TrackedComponent):
+    def __init__(self, hp=100):
+        self.hp = hp
+
+class Mana(TrackedComponent):
+    def __init__(self, mp=50):
+        self.mp = mp
+
 class PositionEntity(Entity):
     def __init__(self, world, x=0, y=0):
         self.position = Position(x, y)
@@ -51,6 +69,30 @@ class MovementApplicator(Applicator):
             p.x += m.vx
             p.y += m.vy
 
+class ArrayPosition(ArrayComponent):
+    _fields_ = [("x", "f8"), ("y", "f8")]
+
+class ArrayVelocity(ArrayComponent):
+    _fields_ = [("vx", "f8"), ("vy", "f8")]
+
+class Life(ArrayComponent):
+    _fields_ = [("life", "i4")]
+
+class ArrayMovingEntity(Entity):
+    def __init__(self, world, x=0, y=0, vx=0, vy=0):
+        self.arrayposition = ArrayPosition(x, y)
+        self.arrayvelocity = ArrayVelocity(vx, vy)
+
+class ArrayMovementSystem(ArraySystem):
+    def __init__(self):
+        super(ArrayMovementSystem, self).__init__()
+        self.componenttypes = (ArrayPosition, ArrayVelocity)
+
+    def process(self, world, arrays):
+        pos, vel = arrays
+        pos.x += vel.vx
+        pos.y = pos.y + vel.vy
+
 
 # Test the classes of the module
 
@@ -76,6 +118,20 @@ class TestExtEntity(object):
         ent1 = Entity(world)
         ent2 = Entity(world)
         assert ent1.id != ent2.id
+        assert (ent1.id, ent2.id) == (0, 1)
+
+        # Make sure ids of deleted entities are recycled with a new generation
+        old_ids = [ent1.id, ent2.id]
+        world.delete_entities([ent1, ent2])
+        ent3 = Entity(world)
+        ent4 = Entity(world)
+        assert ent3.id not in old_ids and ent4.id not in old_ids
+        assert ent3.id & 0xFFFFFFFF == 0
+        assert ent4.id & 0xFFFFFFFF == 1
+        ent3.delete()
+        ent3.delete()
+        assert Entity(world).id == (2 << 32)
+        assert Entity(world).id == 2
 
     def test_world(self):
         world = World()
@@ -208,6 +264,88 @@ class TestExtWorld(object):
         # The next should have no effect
         w.delete_entities((e1, e2))
 
+    def test_storage(self):
+        assert World().storage == "dict"
+        assert World(storage="archetype").storage == "archetype"
+        with pytest.raises(ValueError):
+            World(storage="columns")
+
+    def test_archetype_storage(self):
+        worlds = [World(), World(storage="archetype")]
+        for w in worlds:
+            w.add_system(MovementApplicator())
+            moving = [MovingEntity(w, x, 0, 1, 2) for x in range(10)]
+            static = [PositionEntity(w, x, 5) for x in range(5)]
+            # Add and remove components to move entities between tables
+            static[0].movement = Movement(3, 3)
+            del moving[0].movement
+            moving[1].position = Position(100, 100)
+            w.delete(moving[2])
+            w.delete_entities(moving[3:5])
+            w.process()
+
+            combined = w.combined_components((Position, Movement))
+            results = sorted((p.x, p.y, m.vx) for p, m in combined)
+            expected = [(x + 1, 2, 1) for x in range(5, 10)]
+            assert results == [(3, 8, 3)] + expected + [(101, 102, 1)]
+            assert moving[0].position.x == 0
+            assert len(w.components[Position]) == 12
+            assert len(w.components[Movement]) == 7
+
+        # Make sure entities with the same components share a table
+        w = worlds[1]
+        assert len(w._archetypes) == 2
+        tables = w._get_matching_archetypes((Movement,))
+        assert len(tables) == 1
+        assert len(tables[0]) == 7
+        MovingEntity(w)
+        assert len(tables[0]) == 8
+
+    def test_componenttype_cache(self):
+        class SubPosition(Position):
+            pass
+
+        w = World()
+        e = Entity(w)
+        e.subposition = SubPosition(1, 2)
+        assert w._typecache[SubPosition] == (SubPosition, Position)
+        assert e.position is e.subposition
+        e.subposition = SubPosition(3, 4)
+        assert e.position.x == 3
+        w.add_componenttype(Movement)
+        assert len(w._typecache) == 0
+        e.position = Position(5, 6)
+        assert e.subposition.x == 3
+        assert w._typecache[Position] == (Position,)
+
+    def test_add_components(self):
+        for storage in ("dict", "archetype"):
+            w = World(storage=storage)
+            w.add_system(MovementApplicator())
+            entities = [Entity(w) for i in range(10)]
+            w.add_components(entities, (Position(i, 0) for i in range(10)))
+            w.add_components(entities[5:], [Movement(1, 1)] * 5)
+            assert [e.position.x for e in entities] == list(range(10))
+            assert len(w.components[Movement]) == 5
+            w.process()
+            assert [e.position.y for e in entities] == [0] * 5 + [1] * 5
+            with pytest.raises(ValueError):
+                w.add_components(entities, [Position()])
+
+    def test_get_entity(self):
+        w = World()
+        e1 = Entity(w)
+        e2 = PositionEntity(w)
+        assert w.get_entity(e1.id) is e1
+        assert w.get_entity(e2.id) is e2
+        assert w.get_entity(1000) is None
+        old_id = e1.id
+        e1.delete()
+        assert w.get_entity(old_id) is None
+        e3 = Entity(w)
+        assert w.get_entity(old_id) is None
+        assert w.get_entity(e3.id) is e3
+
     def test_get_entities(self):
         w = World()
         e1 = PositionEntity(w, 1, 1)
@@ -325,3 +463,828 @@ class TestExtApplicator(object):
         for c in world2.components[Position].values():
             assert c.x == 2
             assert c.y == 2
+
+    @pytest.mark.parametrize("storage", ["dict", "archetype"])
+    def test_process_mutation(self, storage):
+        # Applicators must see every entity exactly once, even if they add
+        # or remove components or entities while processing them
+        class Tag(object):
+            pass
+
+        class MutatingApplicator(Applicator):
+            def __init__(self, mutate):
+                super(MutatingApplicator, self).__init__()
+                self.componenttypes = (Position, Movement)
+                self.mutate = mutate
+                self.seen = []
+
+            def process(self, world, componentsets):
+                for p, m in componentsets:
+                    self.seen.append(p.x)
+                    self.mutate(entities[p.x])
+
+        def add_tag(e):
+            e.tag = Tag()
+
+        def delete_even(e):
+            if e.position.x % 2 == 0:
+                e.delete()
+
+        for mutate in (add_tag, delete_even):
+            world = World(storage)
+            entities = [MovingEntity(world, x=i) for i in range(10)]
+            applicator = MutatingApplicator(mutate)
+            world.add_system(applicator)
+            world.process()
+            assert sorted(applicator.seen) == list(range(10))
+        assert len(world.entities) == 5
+        assert sorted(p.x for p in world.components[Position].values()) == \
+            [1, 3, 5, 7, 9]
+
+
+@pytest.mark.skipif(not _HASNUMPY, reason="numpy module is not supported")
+class TestExtArrayComponents(object):
+    __tags__ = ["ebs", "sdl2ext"]
+
+    def test_arraycomponent(self):
+        p = ArrayPosition(1, y=2)
+        assert (p.x, p.y) == (1, 2)
+        assert ArrayPosition().x == 0
+        assert repr(p) == "ArrayPosition(x=1, y=2)"
+        with pytest.raises(TypeError):
+            ArrayPosition(1, 2, 3)
+        with pytest.raises(TypeError):
+            ArrayPosition(z=1)
+
+        world = World()
+        e1 = ArrayMovingEntity(world, 1, 2, 3, 4)
+        e2 = ArrayMovingEntity(world, 5, 6)
+        store = world._arraystores[ArrayPosition]
+        assert list(store.columns["x"][:2]) == [1, 5]
+        assert e1.arrayposition.x == 1
+        assert e2.arrayposition.y == 6
+        assert repr(e2.arrayposition) == "ArrayPosition(x=5.0, y=6.0)"
+
+        # Make sure component objects write to and read from the arrays
+        pos = e1.arrayposition
+        pos.x += 10
+        assert store.columns["x"][0] == 11
+        store.columns["y"][0] = 20
+        assert pos.y == 20
+
+        # Make sure components keep their values after removal
+        del e1.arrayposition
+        assert (pos.x, pos.y) == (11, 20)
+        assert len(store) == 1
+        assert e2.arrayposition.x == 5
+        pos.x = 0
+        assert e2.arrayposition.x == 5
+
+        # Make sure bound components are copied when assigned again
+        e1.arrayposition = e2.arrayposition
+        assert e1.arrayposition is not e2.arrayposition
+        e1.arrayposition.x = 7
+        assert e2.arrayposition.x == 5
+
+        # Make sure the arrays grow and shrink as needed
+        entities = [ArrayMovingEntity(world, i) for i in range(200)]
+        assert len(store) == 202
+        assert store.columns["x"].shape[0] >= 202
+        assert entities[150].arrayposition.x == 150
+        world.delete_entities(entities[:100])
+        e2.delete()
+        assert len(store) == 101
+        assert entities[150].arrayposition.x == 150
+        assert e1.arrayposition.x == 7
+
+    def test_arraysystem(self):
+        world = World()
+        bad = ArrayMovementSystem()
+        bad.componenttypes = (Position, ArrayVelocity)
+        with pytest.raises(ValueError):
+            world.add_system(bad)
+        assert len(world.systems) == 0
+        world.add_system(ArrayMovementSystem())
+        entities = [ArrayMovingEntity(world, i, 0, 1, 2) for i in range(10)]
+        world.process()
+        assert [e.arrayposition.x for e in entities] == list(range(1, 11))
+        assert all(e.arrayposition.y == 2 for e in entities)
+
+        # Test processing of entities that don't have all types
+        other = Entity(world)
+        other.arrayvelocity = ArrayVelocity(5, 5)
+        for e in entities[:5]:
+            del e.arrayvelocity
+        world.process()
+        xs = [e.arrayposition.x for e in entities]
+        assert xs == [1, 2, 3, 4, 5, 7, 8, 9, 10, 11]
+        assert all(e.arrayposition.y == 4 for e in entities[5:])
+
+        class LifeSystem(ArraySystem):
+            def __init__(self):
+                super(LifeSystem, self).__init__()
+                self.componenttypes = (Life,)
+                self.dead = []
+
+            def process(self, world, arrays):
+                life = arrays[0]
+                life.life -= 1
+                dead = numpy.nonzero(life.life <= 0)[0]
+                self.dead = [life.entities[i] for i in dead]
+
+        lsystem = LifeSystem()
+        world.add_system(lsystem)
+        for i, e in enumerate(entities):
+            e.life = Life(i + 1)
+        world.process()
+        assert lsystem.dead == [entities[0]]
+        assert entities[1].life.life == 1
+
+
+class TestExtSystemScheduler(object):
+    __tags__ = ["ebs", "sdl2ext"]
+
+    def _make_system(self, reads=None, writes=None, func=None):
+        class TestSystem(System):
+            def __init__(self):
+                super(TestSystem, self).__init__()
+                self.componenttypes = (Position,)
+                self.reads = reads
+                self.writes = writes
+
+            def process(self, world, components):
+                if func:
+                    func(self)
+        return TestSystem()
+
+    def test_init(self):
+        sched = SystemScheduler(workers=4)
+        assert sched.workers == 4
+        assert SystemScheduler().workers >= 2
+        assert SystemScheduler(workers=1).serial
+        for bad in (0, -1, 1.5):
+            with pytest.raises(ValueError):
+                SystemScheduler(workers=bad)
+        world = World()
+        assert world.scheduler is None
+        world.scheduler = sched
+        assert world.scheduler is sched
+        with pytest.raises(TypeError):
+            world.scheduler = "serial"
+
+    def test_get_stages(self):
+        sched = SystemScheduler()
+        a = self._make_system(reads=[Movement], writes=[Position])
+        b = self._make_system(reads=[Position])
+        c = self._make_system(writes=[Movement])
+        d = self._make_system(reads=[Movement])
+        e = self._make_system()
+        f = self._make_system(writes=[Life])
+        stages = sched.get_stages([a, b, c, d, e, f])
+        assert stages == [[a], [b, c], [d], [e], [f]]
+        assert sched.get_stages([b, d, f]) == [[b, d, f]]
+        assert sched.get_stages([]) == []
+
+    @pytest.mark.skipif(sys.version_info[0] < 3, reason="requires Python 3")
+    def test_run(self):
+        # Two systems that can only finish if they run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        order = []
+        def wait(system):
+            barrier.wait()
+            order.append(system)
+        a = self._make_system(reads=[Position], func=wait)
+        b = self._make_system(reads=[Position], func=wait)
+        c = self._make_system(writes=[Position], func=order.append)
+
+        world = World()
+        for system in (a, b, c):
+            world.add_system(system)
+        PositionEntity(world)
+        with SystemScheduler(workers=2) as sched:
+            world.scheduler = sched
+            world.process()
+            assert set(order[:2]) == set([a, b])
+            assert order[2] is c
+            assert set(sched.timings.keys()) == set([a, b, c])
+            assert all(t >= 0 for t in sched.timings.values())
+
+        # Test that errors in parallel systems are raised
+        barrier.reset()
+        def fail(system):
+            barrier.wait()
+            raise RuntimeError("failed")
+        a2 = self._make_system(reads=[Position], func=fail)
+        world.remove_system(a)
+        world.insert_system(0, a2)
+        with SystemScheduler(workers=2) as sched:
+            world.scheduler = sched
+            with pytest.raises(RuntimeError):
+                world.process()
+
+    @pytest.mark.skipif(sys.version_info[0] < 3, reason="requires Python 3")
+    def test_run_changetick(self):
+        # Systems running at the same time must see consistent change ticks
+        # and not have to create any queries on their worker threads
+        barrier = threading.Barrier(2, timeout=5)
+        seen = {}
+
+        class TickApplicator(Applicator):
+            def __init__(self):
+                super(TickApplicator, self).__init__()
+                self.componenttypes = (Position, Movement)
+                self.reads = [Position, Movement]
+
+            def process(self, world, componentsets):
+                key = self.componenttypes
+                seen[self] = (world.changetick, key in world._queries)
+                barrier.wait()
+                list(componentsets)
+
+        a, b = TickApplicator(), TickApplicator()
+        world = World("archetype")
+        world.track_changes(Position)
+        world.add_system(a)
+        world.add_system(b)
+        MovingEntity(world)
+        with SystemScheduler(workers=2) as sched:
+            world.scheduler = sched
+            for i in range(3):
+                world.process()
+                assert seen[a] == seen[b]
+                assert seen[a][1]
+                tick = seen[a][0]
+                assert world.get_lastrun(a) == world.get_lastrun(b) == tick + 1
+                assert world.changetick == tick + 2
+
+    def test_serial(self):
+        order = []
+        systems = [
+            self._make_system(reads=[Position], func=order.append),
+            self._make_system(writes=[Position], func=order.append),
+            self._make_system(writes=[Movement], func=order.append),
+        ]
+        world = World()
+        for system in systems:
+            world.add_system(system)
+        PositionEntity(world)
+        world.scheduler = SystemScheduler(workers=1)
+        world.process()
+        assert order == systems
+        assert len(world.scheduler.timings) == 3
+
+        # Make sure the results match processing without a scheduler
+        world = World()
+        world.add_system(MovementApplicator())
+        world.add_system(PositionSystem())
+        entities = [MovingEntity(world, vx=i) for i in range(5)]
+        world.scheduler = SystemScheduler(workers=1)
+        world.process()
+        world.scheduler = None
+        world.process()
+        assert [e.position.x for e in entities] == [2, 4, 6, 8, 10]
+
+
+class TestExtCommandBuffer(object):
+    __tags__ = ["ebs", "sdl2ext"]
+
+    def test_init(self):
+        world = World()
+        assert isinstance(world.commands, CommandBuffer)
+        assert len(world.commands) == 0
+        buf = CommandBuffer(world)
+        assert len(buf) == 0
+        with pytest.raises(TypeError):
+            CommandBuffer(None)
+
+    def test_apply(self):
+        world = World()
+        buf = CommandBuffer(world)
+        e1 = buf.create(Position(1, 1), Movement(2, 2))
+        assert e1 in world.entities
+        assert len(world.get_components(Position)) == 0
+        e2 = PositionEntity(world)
+        buf.add_component(e2, Movement(3, 3))
+        buf.remove_component(e2, Position)
+        buf.remove_component(e2, Position)
+        e3 = MovingEntity(world)
+        buf.delete(e3)
+        buf.add_component(e3, Position(5, 5))
+        assert len(buf) == 7
+        buf.apply()
+        assert len(buf) == 0
+
+        assert e1.position.x == 1 and e1.movement.vx == 2
+        assert e2.movement.vx == 3
+        with pytest.raises(KeyError):
+            e2.position
+        assert e3 not in world.entities
+        assert len(world.components[Position]) == 1
+        assert len(world.components[Movement]) == 2
+
+        buf.delete_entities([e1, e2])
+        buf.clear()
+        buf.apply()
+        assert len(world.entities) == 2
+        buf.delete_entities([e1, e2])
+        buf.apply()
+        assert len(world.entities) == 0
+
+    def test_process(self):
+        class CountingSystem(System):
+            def __init__(self):
+                super(CountingSystem, self).__init__()
+                self.componenttypes = (Position,)
+                self.counts = []
+
+            def process(self, world, components):
+                self.counts.append(len(components))
+
+        class ReplacingSystem(CountingSystem):
+            def process(self, world, components):
+                self.counts.append(len(components))
+                for entity, pos in world.components[Position].items():
+                    if pos.x > 0:
+                        world.commands.delete(entity)
+                        world.commands.create(Position(0, 0))
+
+        for storage in ("dict", "archetype"):
+            world = World(storage=storage)
+            s1 = ReplacingSystem()
+            s2 = CountingSystem()
+            world.add_system(s1)
+            world.add_system(s2)
+            for x in range(10):
+                PositionEntity(world, x % 2)
+            world.process()
+            assert s1.counts == [10] and s2.counts == [10]
+            assert len(world.entities) == 10
+            assert all(p.x == 0 for p in world.components[Position].values())
+            assert len(world.components[Position]) == 10
+
+            # Make sure commands can be applied after individual systems
+            PositionEntity(world, 1)
+            s1.apply_commands = True
+            world.process()
+            assert s1.counts == [10, 11] and s2.counts == [10, 11]
+            assert len(world.components[Position]) == 11
+
+
+class TestExtQuery(object):
+    __tags__ = ["ebs", "sdl2ext"]
+
+    def test_init(self):
+        world = World()
+        moving = [MovingEntity(world, x) for x in range(5)]
+        static = [PositionEntity(world, x) for x in range(5)]
+        query = world.query(Position, Movement)
+        assert isinstance(query, Query)
+        assert world.query(Position, Movement) is query
+        assert world.query(Movement, Position) is not query
+        assert query.componenttypes == (Position, Movement)
+        assert len(query) == 5
+        assert set(query) == set(moving)
+        assert static[0] not in query
+        assert query.added == frozenset(moving)
+        with pytest.raises(TypeError):
+            Query(None, (Position,))
+
+    def test_update(self):
+        for storage in ("dict", "archetype"):
+            world = World(storage=storage)
+            moving = [MovingEntity(world, x) for x in range(5)]
+            static = [PositionEntity(world, x) for x in range(5)]
+            query = world.query(Position, Movement)
+            assert query.added == frozenset(moving)
+            world.process()
+            assert query.added == frozenset()
+            assert query.removed == frozenset()
+
+            # Make sure the query is updated as components change
+            static[0].movement = Movement(1, 1)
+            del moving[0].movement
+            moving[1].delete()
+            world.delete_entities(moving[2:4])
+            e = MovingEntity(world)
+            static[1].movement = Movement()
+            del static[1].movement
+            del moving[4].position
+            moving[4].position = Position(7, 7)
+            assert set(query) == set([static[0], e, moving[4]])
+            results = sorted(p.x for p, m in query.components())
+            assert results == [0, 0, 7]
+
+            # Make sure added/removed only change once per frame
+            assert query.added == frozenset()
+            world.process()
+            assert query.added == frozenset([static[0], e])
+            assert query.removed == frozenset(moving[:4])
+            world.process()
+            assert query.added == frozenset()
+            assert query.removed == frozenset()
+
+    def test_process(self):
+        class SpawnTracker(Applicator):
+            def __init__(self):
+                super(SpawnTracker, self).__init__()
+                self.componenttypes = (Position, Movement)
+                self.spawned = []
+                self.despawned = []
+
+            def process(self, world, componentsets):
+                query = world.query(*self.componenttypes)
+                self.spawned.append(len(query.added))
+                self.despawned.append(len(query.removed))
+                for entity in query:
+                    if entity.position.x > 2:
+                        world.commands.delete(entity)
+
+        world = World()
+        tracker = SpawnTracker()
+        world.add_system(tracker)
+        world.add_system(MovementApplicator())
+        for x in range(3):
+            MovingEntity(world, x, vx=1)
+        world.process()
+        for x in range(3):
+            world.process()
+        assert tracker.spawned == [3, 0, 0, 0]
+        assert tracker.despawned == [0, 0, 1, 1]
+
+
+class TestExtChangeTracking(object):
+    __tags__ = ["ebs", "sdl2ext"]
+
+    def test_track_changes(self):
+        world = World()
+        e1 = PositionEntity(world, 1, 1)
+        e2 = PositionEntity(world, 2, 2)
+        with pytest.raises(ValueError):
+            world.get_changed(Position)
+        world.track_changes(Position, Health)
+        assert world.get_changed(Position) == [e1, e2]
+        assert world.get_changed(Health) == []
+        world.process()
+        tick = world.changetick
+        assert world.get_changed(Position, since=tick) == []
+        # Plain components are only marked when (re)assigned
+        e1.position.x = 5
+        assert world.get_changed(Position, since=tick) == []
+        e2.position = Position(0, 0)
+        e1.position = e1.position
+        assert world.get_changed(Position, since=tick) == [e2, e1]
+        # Tracked components are also marked when their attributes are set
+        e1.health = Health()
+        e2.health = Health()
+        world.process()
+        tick = world.changetick
+        e2.health.hp -= 10
+        assert world.get_changed(Health, since=tick) == [e2]
+        # Removed or replaced components no longer mark their entities
+        old = e2.health
+        e2.health = Health(50)
+        del e1.health
+        old.hp = 0
+        assert world.get_changed(Health, since=tick) == [e2]
+        world.delete(e2)
+        assert world.get_changed(Health) == []
+        assert world.get_changed(Position) == [e1]
+
+    def test_tracked_component(self):
+        import copy
+        import pickle
+        world = World()
+        e1 = Entity(world)
+        e1.health = Health(80)
+
+        # Worlds without tracked types aren't asked to mark any changes
+        def _fail(entity, ctypes):
+            raise AssertionError("change marked without tracking")
+        world._mark_changed = _fail
+        e1.health.hp = 70
+        del world._mark_changed
+
+        # Copies and pickles don't keep any references to the world
+        world.track_changes(Health)
+        tick = world.changetick
+        world.process()
+        for dup in (copy.copy(e1.health), copy.deepcopy(e1.health),
+                    pickle.loads(pickle.dumps(e1.health))):
+            assert isinstance(dup, Health)
+            assert dup.hp == 70
+            assert dup._ebs_owners == set()
+            dup.hp = 0
+        assert world.get_changed(Health, since=tick + 1) == []
+        assert b"World" not in pickle.dumps(e1.health)
+
+    @pytest.mark.parametrize("storage", ["dict", "archetype"])
+    def test_track_multiple_types(self, storage):
+        world = World(storage)
+        world.track_changes(Health, Mana)
+        e1 = Entity(world)
+        e1.health = Health()
+        e1.mana = Mana()
+        # The TrackedComponent mixin must not be a component type itself
+        assert TrackedComponent not in world.componenttypes
+        assert not hasattr(e1, "trackedcomponent")
+        assert world.components[Health][e1] is e1.health
+        assert world.components[Mana][e1] is e1.mana
+        world.process()
+        tick = world.changetick
+        e1.mana.mp = 0
+        assert world.get_changed(Mana, since=tick) == [e1]
+        assert world.get_changed(Health, since=tick) == []
+        # Removed tracked components no longer mark their entities
+        world.process()
+        tick = world.changetick
+        mana = e1.mana
+        del e1.mana
+        mana.mp = 10
+        assert world.get_changed(Mana, since=tick) == []
+        assert e1 not in world.components[Mana]
+        if storage == "archetype":
+            archetype = world._entity_archetypes[e1]
+            assert archetype.types == frozenset([Health])
+
+    @pytest.mark.skipif(not _HASNUMPY, reason="Numpy is not available")
+    def test_track_array_changes(self):
+        world = World()
+        world.track_changes(ArrayPosition)
+        e1 = ArrayMovingEntity(world, 1, 1)
+        e2 = ArrayMovingEntity(world, 2, 2)
+        world.process()
+        tick = world.changetick
+        e2.arrayposition.x = 10
+        assert world.get_changed(ArrayPosition, since=tick) == [e2]
+
+    def test_changed_only(self):
+        class HealthSystem(System):
+            def __init__(self):
+                super(HealthSystem, self).__init__()
+                self.componenttypes = (Health,)
+                self.changed_only = True
+                self.seen = []
+
+            def process(self, world, components):
+                hps = [c.hp for c in components]
+                self.seen.append(sorted(hps))
+                for c in components:
+                    c.hp = max(c.hp, 0)  # Own changes aren't reported back
+
+        class DamageApplicator(Applicator):
+            def __init__(self):
+                super(DamageApplicator, self).__init__()
+                self.componenttypes = (Health, Position)
+                self.changed_only = True
+                self.seen = []
+
+            def process(self, world, componentsets):
+                self.seen.append(len(list(componentsets)))
+
+        world = World()
+        healthsys = HealthSystem()
+        damagesys = DamageApplicator()
+        world.add_system(healthsys)
+        world.add_system(damagesys)
+        world.track_changes(Health)
+        entities = [PositionEntity(world, x) for x in range(3)]
+        for e in entities:
+            e.health = Health()
+        assert world.get_lastrun(healthsys) == 0
+        world.process()
+        assert healthsys.seen == [[100, 100, 100]]
+        assert damagesys.seen == [3]
+        assert world.get_lastrun(healthsys) < world.get_lastrun(damagesys)
+        world.process()
+        assert healthsys.seen[-1] == []
+        assert damagesys.seen[-1] == 0
+        entities[0].health.hp = -5
+        world.process()
+        assert healthsys.seen[-1] == [-5]
+        # The change made by HealthSystem is seen by later systems
+        assert damagesys.seen[-1] == 1
+        assert entities[0].health.hp == 0
+        world.process()
+        assert healthsys.seen[-1] == []
+        assert damagesys.seen[-1] == 0
+
+
+class TestExtSystemProfiler(object):
+    __tags__ = ["ebs", "sdl2ext"]
+
+    def test_init(self):
+        profiler = SystemProfiler()
+        assert profiler.window == 120
+        assert profiler.budget is None
+        assert profiler.systems == ()
+        assert profiler.get_stats(None) is None
+        with pytest.raises(ValueError):
+            SystemProfiler(window=0)
+        world = World()
+        assert world.profiler is None
+        with pytest.raises(TypeError):
+            world.profiler = "profiler"
+
+    def test_process(self):
+        class SlowSystem(PositionSystem):
+            def process(self, world, components):
+                time.sleep(0.005)
+
+        calls = []
+        world = World()
+        profiler = SystemProfiler(window=2, callback=lambda *a: calls.append(a))
+        world.profiler = profiler
+        possys = PositionSystem()
+        slowsys = SlowSystem()
+        movesys = MovementApplicator()
+        for system in (possys, slowsys, movesys):
+            world.add_system(system)
+        for x in range(3):
+            PositionEntity(world, x)
+        MovingEntity(world)
+        for i in range(3):
+            world.process()
+        assert set(profiler.systems) == set([possys, slowsys, movesys])
+        stats = profiler.get_stats(slowsys)
+        assert stats["calls"] == 3
+        assert stats["components"] == 4
+        assert profiler.get_stats(movesys)["components"] == 1
+        assert 0.004 < stats["min"] <= stats["avg"] <= stats["p99"]
+        assert stats["p99"] == stats["max"]
+        assert stats["total"] >= stats["avg"] * 2
+        frame = profiler.get_stats(None)
+        assert frame["calls"] == 3
+        assert frame["min"] >= stats["min"]
+        assert len(calls) == 12
+        assert calls[1][0] is slowsys and calls[1][2] == 4
+        assert calls[3][0] is None and calls[3][2] == 3
+        report = profiler.report().splitlines()
+        assert len(report) == 5
+        assert report[1].startswith("SlowSystem")
+        assert report[-1].startswith("(frame)")
+        profiler.reset()
+        assert profiler.systems == ()
+        # Nothing is recorded without a profiler
+        world.profiler = None
+        world.process()
+        assert profiler.systems == ()
+
+    def test_budget(self):
+        class SlowSystem(PositionSystem):
+            def process(self, world, components):
+                time.sleep(0.002)
+
+        world = World()
+        slowsys = SlowSystem()
+        possys = PositionSystem()
+        world.add_system(slowsys)
+        world.add_system(possys)
+        world.profiler = SystemProfiler(budget=0.001)
+        world.profiler.set_budget(possys, 1.0)
+        with pytest.warns(RuntimeWarning, match="SlowSystem"):
+            world.process()
+        assert world.profiler.get_stats(slowsys)["overruns"] == 1
+        assert world.profiler.get_stats(possys)["overruns"] == 0
+        world.profiler.set_budget(slowsys, 1.0)
+        world.profiler.frame_budget = 0.001
+        with pytest.warns(RuntimeWarning, match="frame"):
+            world.process()
+        assert world.profiler.get_stats(slowsys)["overruns"] == 1
+        assert world.profiler.get_stats(None)["overruns"] == 1
+
+
+class Tag(object):
+    """A component with non-numeric values, which have to be pickled."""
+    def __init__(self, name, items=None):
+        self.name = name
+        self.items = items or []
+
+
+class TestExtWorldSnapshot(object):
+    __tags__ = ["ebs", "sdl2ext"]
+
+    def test_snapshot_restore(self):
+        world = World()
+        movers = [MovingEntity(world, x, x * 0.5, 1, -1) for x in range(5)]
+        tagged = PositionEntity(world, 7, 7)
+        tagged.tag = Tag("player", [1, 2])
+        tagged.health = Health(50)
+        snap = world.snapshot()
+        assert isinstance(snap, bytes)
+        pos = tagged.position
+        # Change the world in every way that can be rolled back
+        movers[0].delete()
+        world.delete(movers[1])
+        tagged.position.x = 100
+        tagged.tag.name = "enemy"
+        tagged.health.hp = 0
+        del movers[2].movement
+        PositionEntity(world, 20, 20)
+        world.restore(snap)
+        assert len(world.entities) == 6
+        assert len(world.get_components(Movement)) == 5
+        # Surviving entities and components are updated in place
+        assert tagged in world.entities
+        assert tagged.position is pos
+        assert (pos.x, pos.y) == (7, 7)
+        assert tagged.tag.name == "player" and tagged.tag.items == [1, 2]
+        assert tagged.health.hp == 50
+        tagged.health.hp = 10  # Still tracked by the restored world
+        restored = world.get_entity(movers[0].id)
+        assert restored is not movers[0]
+        assert isinstance(restored, MovingEntity)
+        assert (restored.position.x, restored.movement.vy) == (0, -1)
+        # Entity ids continue from the snapshot's state
+        assert PositionEntity(world).id == 6
+        # Restoring a fresh world and snapshotting it again is lossless
+        other = World()
+        with pytest.raises(ValueError):
+            other.restore(snap)
+        classes = [MovingEntity, PositionEntity, Position, Movement, Tag]
+        other.restore(snap, classes=classes + [Health])
+        assert other.snapshot() == snap
+        with pytest.raises(ValueError):
+            world.restore(b"not a snapshot")
+
+    def test_restore_unknown_classes(self):
+        import fractions
+        world = World()
+        e1 = PositionEntity(world, 1, 1)
+        e1.tag = Tag("enemy", [fractions.Fraction(1, 3)])
+        snap = world.snapshot()
+        # Pickled values may only refer to known classes
+        other = World()
+        classes = [PositionEntity, Position, Tag]
+        with pytest.raises(ValueError):
+            other.restore(snap, classes=classes)
+        assert len(other.entities) == 0
+        other.restore(snap, classes=classes + [fractions.Fraction])
+        assert other.get_entity(e1.id).tag.items == [fractions.Fraction(1, 3)]
+
+    def test_restore_queries(self):
+        world = World(storage="archetype")
+        MovingEntity(world, 1)
+        PositionEntity(world, 2)
+        query = world.query(Position, Movement)
+        snap = world.snapshot()
+        MovingEntity(world, 3)
+        world.process()
+        world.restore(snap)
+        assert len(query) == 1
+        world.process()
+        assert len(query.removed) == 1
+        positions = [p.x for p, m in world.combined_components(
+            (Position, Movement))]
+        assert positions == [1]
+
+    def test_delta_snapshot(self):
+        world = World()
+        entities = [MovingEntity(world, x, x) for x in range(100)]
+        base = world.snapshot()
+        # Unchanged blocks are left out of delta snapshots entirely
+        delta = world.snapshot(base=base)
+        assert len(delta) == 10  # Only the header
+        entities[0].position = Position(-1, -1)
+        delta = world.snapshot(base=base)
+        assert len(delta) < len(base) // 3
+        assert b"Movement" not in delta
+        delta = world.snapshot(base=base, compress=True)
+        with pytest.raises(ValueError):
+            world.restore(delta)
+        with pytest.raises(ValueError):
+            world.snapshot(base=delta)
+        other = World()
+        other.restore(delta, base, classes=[MovingEntity, Position, Movement])
+        assert len(other.entities) == 100
+        assert other.get_entity(entities[0].id).position.x == -1
+        assert other.get_entity(entities[1].id).position.x == 1
+        # Blocks that no longer exist are removed from the base
+        for entity in entities:
+            del entity.movement
+        delta = world.snapshot(base=base)
+        other.restore(delta, base)
+        assert len(other.get_components(Movement)) == 0
+        assert other.snapshot() == world.snapshot()
+
+    @pytest.mark.skipif(not _HASNUMPY, reason="Numpy is not available")
+    def test_snapshot_arrays(self):
+        world = World()
+        world.add_system(ArrayMovementSystem())
+        entities = [ArrayMovingEntity(world, x, 0, 1, 2) for x in range(10)]
+        component = entities[0].arrayposition
+        snap = world.snapshot()
+        world.process()
+        entities[1].delete()
+        world.restore(snap)
+        assert component.x == 0 and component.y == 0
+        restored = world.get_entity(entities[1].id)
+        assert restored.arrayposition.x == 1
+        assert restored.arrayvelocity.vy == 2
+        world.process()
+        assert restored.arrayposition.x == 2
+        other = World()
+        other.add_componenttype(ArrayPosition)
+        other.add_componenttype(ArrayVelocity)
+        other.restore(snap, classes=[ArrayMovingEntity])
+        assert other.snapshot() == snap
+        assert len(other.get_components(ArrayPosition)) == 10
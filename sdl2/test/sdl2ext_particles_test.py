@@ -1,6 +1,13 @@
 import sys
 import pytest
 from sdl2.ext import particles
+from sdl2.ext.ebs import World, Entity
+
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
 
 
 class TestExtParticle(object):
@@ -132,3 +139,111 @@ class TestExtParticleEngine(object):
         engine.process(world, plist)
         world["runs"] = 2
         engine.process(world, plist)
+
+
+@pytest.mark.skipif(not _HASNUMPY, reason="Numpy is not available")
+class TestExtParticleBuffer(object):
+    __tags__ = ["sdl2ext"]
+
+    def test_init(self):
+        buf = particles.ParticleBuffer(100, fields=[("size", "f4")])
+        assert len(buf) == 0
+        assert buf.capacity == 100
+        assert buf.fields == ("x", "y", "vx", "vy", "life", "type", "size")
+        assert len(buf.x) == 0
+        assert len(buf.get_array("size")) == 100
+        with pytest.raises(AttributeError):
+            buf.z
+        with pytest.raises(ValueError):
+            particles.ParticleBuffer(0)
+        with pytest.raises(ValueError):
+            particles.ParticleBuffer(10, fields=[("x", "f8")])
+
+    def test_emit(self):
+        buf = particles.ParticleBuffer(10)
+        assert buf.emit(4, x=numpy.arange(4), y=5, life=[1, 2, 3, 4]) == 4
+        assert len(buf) == 4
+        assert list(buf.x) == [0, 1, 2, 3]
+        assert list(buf.y) == [5] * 4
+        assert list(buf.vx) == [0] * 4
+        buf.y += 1
+        assert list(buf.y) == [6] * 4
+        buf.type = 2
+        assert list(buf.type) == [2] * 4
+        assert buf.get_array("type")[4] == 0
+        assert buf.emit(10, x=numpy.arange(10)) == 6
+        assert buf.dropped == 4
+        assert list(buf.x) == [0, 1, 2, 3] + list(range(6))
+        with pytest.raises(ValueError):
+            buf.emit(1, z=1)
+
+    def test_kill(self):
+        buf = particles.ParticleBuffer(10)
+        buf.emit(6, x=numpy.arange(6), life=numpy.arange(6))
+        assert buf.kill(buf.x % 2 == 0) == 3
+        assert sorted(buf.x) == [1, 3, 5]
+        assert sorted(buf.life) == [1, 3, 5]
+        assert (buf.x == buf.life).all()
+        assert buf.kill([0]) == 1
+        assert len(buf) == 2
+        assert buf.kill(numpy.zeros(2, bool)) == 0
+        with pytest.raises(ValueError):
+            buf.kill(numpy.zeros(3, bool))
+        buf.clear()
+        assert len(buf) == 0
+
+
+@pytest.mark.skipif(not _HASNUMPY, reason="Numpy is not available")
+class TestExtArrayParticleEngine(object):
+    __tags__ = ["sdl2ext"]
+
+    def test_init(self):
+        engine = particles.ArrayParticleEngine()
+        assert engine.componenttypes == (particles.ParticleBuffer,)
+        assert engine.createfunc is None
+        engine.createfunc = lambda w, b, n: None
+        engine.createfunc = None
+        with pytest.raises(TypeError):
+            engine.updatefunc = 1234
+        with pytest.raises(TypeError):
+            engine.deletefunc = "Test"
+
+    def test_process(self):
+        calls = []
+
+        def cfunc(world, buf, ndead):
+            calls.append(("create", ndead))
+            buf.emit(ndead, life=10)
+
+        def ufunc(world, buf):
+            calls.append(("update", len(buf)))
+            buf.vy += 1
+
+        def dfunc(world, buf, dead):
+            calls.append(("delete", int(dead.sum())))
+            assert (buf.life[dead] <= 0).all()
+
+        world = World()
+        engine = particles.ArrayParticleEngine()
+        engine.createfunc = cfunc
+        engine.updatefunc = ufunc
+        engine.deletefunc = dfunc
+        world.add_system(engine)
+        emitter = Entity(world)
+        emitter.particlebuffer = particles.ParticleBuffer(1000)
+        buf = emitter.particlebuffer
+        buf.emit(100, x=0, vx=2, life=numpy.arange(1, 101))
+        world.process()
+        assert calls == [("delete", 1), ("update", 99), ("create", 1)]
+        assert len(buf) == 100
+        assert sorted(buf.life)[0] == 1
+        assert (buf.x[buf.vx == 2] == 2).all()
+        assert (buf.vy[buf.vx == 2] == 1).all()
+        engine.step = 0.5
+        engine.decay = 2
+        world.process()
+        assert calls[-3:] == [("delete", 2), ("update", 98), ("create", 2)]
+        assert len(buf) == 100
+        assert (buf.x[buf.vx == 2] == 3).all()
+        assert (buf.y[buf.vx == 2] == 0.5).all()
+
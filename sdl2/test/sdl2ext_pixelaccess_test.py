@@ -1,5 +1,6 @@
 import os
 import sys
+import ctypes
 import pytest
 from sdl2 import ext as sdl2ext
 from sdl2.ext import color
@@ -71,6 +72,43 @@ def test_PixelView(imgsurf, surf_rgb24):
         sdl2ext.PixelView(surf_rgb24)
 
 
+def test_PixelView_slicing(imgsurf):
+    pxview = sdl2ext.PixelView(imgsurf.contents)
+    assert pxview[0, 16] == pxview[0][16]
+    row = pxview[0, 8:24]
+    assert len(row) == 16
+    assert row.tolist() == [pxview[0][x] for x in range(8, 24)]
+    assert color.ARGB(row[8]) == colors['blue']
+
+    # Test filling an area with a color
+    pxview[4:8, 2:6] = colors['white']
+    for y in range(4, 8):
+        for x in range(2, 6):
+            assert color.ARGB(pxview[y, x]) == colors['white']
+    assert color.ARGB(pxview[3, 2]) == colors['red']
+
+    # Test assigning sequences of colors and raw pixel data
+    pxview[0, :4] = [colors['blue'], 0xFF000000, colors['blue'], 0xFF000000]
+    assert color.ARGB(pxview[0, 0]) == colors['blue']
+    assert color.ARGB(pxview[0, 1]) == colors['black']
+    pxview[1] = pxview[2].tobytes()
+    assert pxview[1].tolist() == pxview[2].tolist()
+
+
+def test_PixelView_pitch(with_sdl):
+    # Rows of 8-bit surfaces are padded to multiples of 4 bytes
+    sf = _create_surface((5, 3), fmt="INDEX8")
+    assert sf.contents.pitch == 8
+    pxview = sdl2ext.PixelView(sf)
+    pxview[1] = bytes([1, 2, 3, 4, 5])
+    pxview[2, 4:] = bytes([6])
+    buf = ctypes.string_at(sf.contents.pixels, 24)
+    assert buf[8:13] == bytes([1, 2, 3, 4, 5])
+    assert buf[20] == 6
+    assert pxview[1].tolist() == [1, 2, 3, 4, 5]
+    surface.SDL_FreeSurface(sf)
+
+
 @pytest.mark.skipif(not _HASNUMPY, reason="numpy module is not supported")
 def test_pixels2d(imgsurf, surf_rgb24):
     # Open pixels2d view for test image
@@ -122,6 +160,49 @@ def test_pixels3d(rgbasurf, surf_rgb24):
     assert color.Color(*nparray_rgb24[0][0]) == color.Color(*grey)
 
 
+@pytest.mark.skipif(not _HASNUMPY, reason="numpy module is not supported")
+def test_pixelchannels(with_sdl):
+    c = [10, 20, 30, 40]
+    for fmt in ("ARGB8888", "ABGR8888", "RGBA8888", "BGRA8888"):
+        sf = _create_surface((8, 4), c, fmt=fmt)
+        ch = sdl2ext.pixelchannels(sf)
+        assert ch.r.shape == (8, 4)
+        assert [ch.r[0, 0], ch.g[0, 0], ch.b[0, 0], ch.a[0, 0]] == c
+        assert list(ch.rgb[7, 3]) == c[:3]
+        assert sorted(ch.order) == ["A", "B", "G", "R"]
+        # Test that the channel views modify the surface
+        ch.r[:] = ch.r * 2
+        ch.a[:] = 255
+        arr = sdl2ext.pixels3d(sf)
+        assert list(arr[1, 1][list(ch.indices)]) == [20, 20, 30, 255]
+        surface.SDL_FreeSurface(sf)
+
+    # Test RGBA views for surfaces with evenly-spaced channels
+    sf = _create_surface((8, 4), c, fmt="RGBA32")
+    ch = sdl2ext.pixelchannels(sf, transpose=False)
+    assert ch.order == "RGBA"
+    assert ch.r.shape == (4, 8)
+    assert list(ch.rgba[3, 7]) == c
+    surface.SDL_FreeSurface(sf)
+
+    # Test surfaces without alpha channels
+    sf = _create_surface((8, 4), c, fmt="BGR24")
+    ch = sdl2ext.pixelchannels(sf)
+    assert ch.order == "BGR"
+    assert ch.a is None
+    assert list(ch.rgb[0, 0]) == c[:3]
+    with pytest.raises(ValueError):
+        ch.rgba
+    surface.SDL_FreeSurface(sf)
+
+    # Test exceptions for formats without 8-bit channels
+    for fmt in ("RGB565", "INDEX8"):
+        sf = _create_surface((8, 4), fmt=fmt)
+        with pytest.raises(ValueError):
+            sdl2ext.pixelchannels(sf)
+        surface.SDL_FreeSurface(sf)
+
+
 @pytest.mark.skipif(not _HASNUMPY, reason="numpy module is not supported")
 def test_surface_to_ndarray(imgsurf, rgbasurf):
     # Create a 2D ndarray from the surface & test different coordinates
@@ -144,3 +225,79 @@ def test_surface_to_ndarray(imgsurf, rgbasurf):
     arr_3d[31][0][:] = grey
     arr_view = sdl2ext.pixels3d(rgbasurf, transpose=False)
     assert color.Color(*arr_view[31][0]) != color.Color(*grey)
+
+
+def test_surface_from_buffer(with_sdl):
+    # Test sharing pixel data with a padded buffer
+    buf = bytearray(3 * 8)
+    sf = sdl2ext.surface_from_buffer(buf, (2, 3), "ARGB8888", pitch=8)
+    assert (sf.w, sf.h, sf.pitch) == (2, 3, 8)
+    assert sf.format.contents.format == pixels.SDL_PIXELFORMAT_ARGB8888
+    pxview = sdl2ext.PixelView(sf)
+    pxview[2, 1] = 0xFF808080
+    assert ctypes.c_uint32.from_buffer(buf, 20).value == 0xFF808080
+    ctypes.c_uint32.from_buffer(buf, 8).value = 0xFF000000
+    assert pxview[1, 0] == 0xFF000000
+    surface.SDL_FreeSurface(sf)
+
+    # Test copying pixel data from a read-only buffer
+    data = bytes(range(12))
+    sf = sdl2ext.surface_from_buffer(data, (2, 2), "RGB24", pitch=6, copy=True)
+    pxbuf = ctypes.string_at(sf.pixels, sf.pitch * 2)
+    assert pxbuf[:6] == data[:6]
+    assert pxbuf[sf.pitch:sf.pitch + 6] == data[6:]
+    surface.SDL_FreeSurface(sf)
+
+    # Test exceptions on bad input
+    with pytest.raises(ValueError):
+        sdl2ext.surface_from_buffer(data, (2, 2), "RGB24")
+    with pytest.raises(ValueError):
+        sdl2ext.surface_from_buffer(bytearray(8), (2, 2), "RGB24")
+    with pytest.raises(ValueError):
+        sdl2ext.surface_from_buffer(buf, (2, 2), pitch=4)
+    with pytest.raises(ValueError):
+        sdl2ext.surface_from_buffer(buf, (2, 2), "NOT_A_FORMAT")
+    with pytest.raises(TypeError):
+        sdl2ext.surface_from_buffer([0] * 16, (2, 2))
+
+
+@pytest.mark.skipif(not _HASNUMPY, reason="numpy module is not supported")
+def test_ndarray_to_surface(with_sdl):
+    # Test sharing pixel data with a 2D array
+    arr = numpy.zeros((4, 8), dtype=numpy.uint32)
+    sf = sdl2ext.ndarray_to_surface(arr)
+    assert (sf.w, sf.h) == (8, 4)
+    assert sf.format.contents.format == pixels.SDL_PIXELFORMAT_ARGB8888
+    arr[3, 7] = 0xFF00FF00
+    view = sdl2ext.pixels2d(sf, transpose=False)
+    assert view[3, 7] == 0xFF00FF00
+    view[0, 0] = 0xFFFFFFFF
+    assert arr[0, 0] == 0xFFFFFFFF
+    surface.SDL_FreeSurface(sf)
+
+    # Test that the surface keeps the array alive
+    sf = sdl2ext.ndarray_to_surface(numpy.full((2, 2, 4), 64, numpy.uint8))
+    assert sf.format.contents.format == pixels.SDL_PIXELFORMAT_RGBA32
+    assert list(sdl2ext.surface_to_ndarray(sf).ravel()) == [64] * 16
+    surface.SDL_FreeSurface(sf)
+
+    # Test copying pixel data from a non-contiguous array
+    arr = numpy.arange(24, dtype=numpy.uint8).reshape((2, 4, 3))
+    sf = sdl2ext.ndarray_to_surface(arr[:, ::2], copy=True)
+    assert sf.format.contents.format == pixels.SDL_PIXELFORMAT_RGB24
+    assert numpy.all(sdl2ext.surface_to_ndarray(sf) == arr[:, ::2])
+    arr[0, 0, 0] = 255
+    assert sdl2ext.surface_to_ndarray(sf)[0, 0, 0] == 0
+    surface.SDL_FreeSurface(sf)
+
+    # Test exceptions on bad input
+    with pytest.raises(ValueError):
+        sdl2ext.ndarray_to_surface(arr[:, ::2])
+    with pytest.raises(ValueError):
+        sdl2ext.ndarray_to_surface(arr, fmt="ARGB8888")
+    with pytest.raises(ValueError):
+        sdl2ext.ndarray_to_surface(numpy.zeros((2, 2, 2), numpy.uint8))
+    with pytest.raises(TypeError):
+        sdl2ext.ndarray_to_surface(numpy.zeros((2, 2), numpy.float32))
+    with pytest.raises(TypeError):
+        sdl2ext.ndarray_to_surface([[0, 0], [0, 0]])
@@ -1,16 +1,36 @@
 import gc
 import sys
+import array
 import pytest
-from ctypes import addressof
+from ctypes import addressof, byref
 
+import sdl2
 from sdl2 import ext as sdl2ext
 from sdl2 import dll
+from sdl2.ext.renderer import _vertex_attrib, _index_array
 from sdl2.rect import SDL_Point, SDL_Rect
-from sdl2.render import SDL_Renderer, SDL_Texture
+from sdl2.render import SDL_Renderer, SDL_Texture, SDL_Vertex
 from sdl2.surface import SDL_CreateRGBSurface, SDL_FreeSurface
+from sdl2.stdinc import Uint8
+
+try:
+    import numpy
+    _HASNUMPY = True
+except:
+    _HASNUMPY = False
 
 # NOTE: These tests still have some legacy cruft to clean
 
+class rgb_view(object):
+    # Wraps a PixelView to ignore alpha bits, which some SDL renderers set
+    # when drawing to surfaces without an alpha channel
+    def __init__(self, view):
+        self._view = view
+
+    def __getitem__(self, y):
+        row = self._view[y]
+        return [row[x] & 0xFFFFFF for x in range(len(row))]
+
 def check_pixels(view, w, h, sprite, c1, c2, cx=0, cy=0):
     msg = "color mismatch at %d,%d: %d not in %s"
     cx = cx + sprite.x
@@ -181,13 +201,147 @@ class TestExtRenderer(object):
         renderer.destroy()
         SDL_FreeSurface(sf)
 
-    @pytest.mark.skip("not implemented")
     def test_blendmode(self, with_sdl):
-        pass
+        sf = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        assert renderer.blendmode == sdl2.SDL_BLENDMODE_NONE
+        renderer.blendmode = sdl2.SDL_BLENDMODE_BLEND
+        assert renderer.blendmode == sdl2.SDL_BLENDMODE_BLEND
+        mode = sdl2.SDL_BlendMode()
+        sdl2.SDL_GetRenderDrawBlendMode(renderer.sdlrenderer, byref(mode))
+        assert mode.value == sdl2.SDL_BLENDMODE_BLEND
+        renderer.destroy()
+        SDL_FreeSurface(sf)
 
-    @pytest.mark.skip("not implemented")
     def test_scale(self, with_sdl):
-        pass
+        sf = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        assert renderer.scale == (1.0, 1.0)
+        renderer.scale = (2.0, 0.5)
+        assert renderer.scale == (2.0, 0.5)
+        with pytest.raises(ValueError):
+            renderer.scale = (0, 1)
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_viewport_clip_rect(self, with_sdl):
+        sf = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        view = sdl2ext.PixelView(sf.contents)
+        assert renderer.viewport == (0, 0, 10, 10)
+        assert renderer.clip_rect is None
+        renderer.viewport = (5, 5, 5, 5)
+        assert renderer.viewport == (5, 5, 5, 5)
+        renderer.fill((0, 0, 2, 2), 0xFFFFFF)
+        assert view[5][5] & 0xFFFFFF == 0xFFFFFF
+        assert view[0][0] == 0
+        renderer.viewport = None
+        assert renderer.viewport == (0, 0, 10, 10)
+        renderer.clip_rect = (0, 0, 2, 2)
+        assert renderer.clip_rect == (0, 0, 2, 2)
+        renderer.fill((0, 0, 10, 10), 0xFF0000)
+        assert view[0][0] & 0xFFFFFF == 0xFF0000
+        assert view[5][5] & 0xFFFFFF == 0xFFFFFF
+        renderer.clip_rect = None
+        assert renderer.clip_rect is None
+        del view
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_target(self, with_sdl):
+        sf = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        view = sdl2ext.PixelView(sf.contents)
+        assert renderer.target is None
+        tx = sdl2.SDL_CreateTexture(
+            renderer.sdlrenderer, sdl2.SDL_PIXELFORMAT_ARGB8888,
+            sdl2.SDL_TEXTUREACCESS_TARGET, 4, 4
+        )
+        renderer.target = tx
+        assert renderer.target is tx
+        assert renderer.viewport == (0, 0, 4, 4)
+        renderer.clear(0x00FF00)
+        renderer.target = None
+        assert renderer.viewport == (0, 0, 10, 10)
+        renderer.clear(0x0)
+        renderer.copy(tx.contents, dstrect=(0, 0))
+        assert view[3][3] & 0xFFFFFF == 0x00FF00
+        assert view[4][4] == 0
+        del view
+        sdl2.SDL_DestroyTexture(tx)
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_state_cache(self, with_sdl, monkeypatch):
+        sf = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(sf.contents)
+        calls = []
+
+        def _counted(name):
+            func = getattr(sdl2.render, name)
+            def wrapper(*args):
+                calls.append(name)
+                return func(*args)
+            monkeypatch.setattr(sdl2.render, name, wrapper)
+
+        for name in ("SDL_SetRenderDrawColor", "SDL_GetRenderDrawColor",
+                     "SDL_SetRenderDrawBlendMode", "SDL_RenderSetScale"):
+            _counted(name)
+
+        # Make sure drawing with custom colors doesn't query or restore colors
+        for i in range(5):
+            renderer.fill((0, 0, 2, 2), 0xFF0000)
+            renderer.draw_line((0, 0, 5, 5), 0xFF0000)
+        assert calls == ["SDL_SetRenderDrawColor"]
+        renderer.color = 0x0000FF
+        renderer.clear()
+        renderer.clear()
+        assert renderer.color == sdl2ext.Color(0, 0, 0xFF, 0)
+        assert calls.count("SDL_SetRenderDrawColor") == 2
+
+        # Make sure unchanged state isn't re-sent to SDL
+        assert renderer.blendmode == sdl2.SDL_BLENDMODE_NONE
+        assert renderer.scale == (1.0, 1.0)
+        del calls[:]
+        renderer.blendmode = sdl2.SDL_BLENDMODE_NONE
+        renderer.scale = (1.0, 1.0)
+        assert calls == []
+
+        # Test the raw draw color is synced before being used directly
+        renderer.fill((0, 0, 2, 2), 0xFF0000)
+        sdlrenderer = renderer.sdlrenderer
+        r, g, b, a = Uint8(), Uint8(), Uint8(), Uint8()
+        sdl2.SDL_GetRenderDrawColor(sdlrenderer, byref(r), byref(g), byref(b), byref(a))
+        assert (r.value, g.value, b.value) == (0, 0, 0xFF)
+
+        # Make sure modifying a Color after using it doesn't affect the cache
+        sdl2ext.fill(sf.contents, 0x0)
+        view = sdl2ext.PixelView(sf.contents)
+        c = sdl2ext.Color(0xFF, 0, 0)
+        renderer.color = c
+        renderer.fill((0, 0, 2, 2))
+        c.r, c.g = 0, 0xFF
+        renderer.color = c
+        renderer.fill((0, 0, 2, 2))
+        assert view[0][0] == 0x00FF00
+        c.g, c.b = 0, 0xFF
+        renderer.fill((0, 0, 2, 2), c)
+        assert view[0][0] == 0x0000FF
+        c.r, c.b = 0xFF, 0
+        renderer.fill((0, 0, 2, 2), c)
+        assert view[0][0] == 0xFF0000
+        del view
+
+        # Test resyncing after changing state with the raw API
+        sdl2.SDL_SetRenderDrawColor(sdlrenderer, 1, 2, 3, 4)
+        sdl2.SDL_SetRenderDrawBlendMode(sdlrenderer, sdl2.SDL_BLENDMODE_ADD)
+        sdl2.SDL_RenderSetScale(sdlrenderer, 2.0, 2.0)
+        renderer.resync()
+        assert renderer.color == sdl2ext.Color(1, 2, 3, 4)
+        assert renderer.blendmode == sdl2.SDL_BLENDMODE_ADD
+        assert renderer.scale == (2.0, 2.0)
+        renderer.destroy()
+        SDL_FreeSurface(sf)
 
     def test_clear(self, with_sdl):
         sf = SDL_CreateRGBSurface(0, 10, 10, 32,
@@ -434,6 +588,366 @@ class TestExtRenderer(object):
                          0x0000FF, (0x0,))
         del view
 
+    def test_packed_arrays(self, with_sdl):
+        surface = SDL_CreateRGBSurface(0, 128, 128, 32, 0, 0, 0, 0).contents
+        sdl2ext.fill(surface, 0x0)
+        renderer = sdl2ext.Renderer(surface)
+        view = sdl2ext.PixelView(surface)
+
+        # Test drawing points and rects from flat array.array buffers
+        pts = array.array('f', [1, 1, 3, 3, 8, 8])
+        renderer.draw_point(pts, 0x0000FF)
+        for i in (1, 3, 8):
+            assert view[i][i] == 0x0000FF
+        rects = array.array('f', [5, 5, 10, 10, 20, 15, 8, 10])
+        sdl2ext.fill(surface, 0x0)
+        renderer.fill(rects, 0x0000FF)
+        check_areas(view, 128, 128, [(5, 5, 10, 10), (20, 15, 8, 10)],
+                    0x0000FF, (0x0,))
+
+        # Test drawing from a ctypes array of the native rect type
+        sdl2ext.fill(surface, 0x0)
+        r = (sdl2ext.renderer._Rect * 1)(sdl2ext.renderer._Rect(5, 5, 10, 10))
+        renderer.fill(r, 0x00FF00)
+        check_areas(view, 128, 128, [(5, 5, 10, 10)], 0x00FF00, (0x0,))
+
+        if _HASNUMPY:
+            # Test zero-copy drawing from float32 arrays
+            sdl2ext.fill(surface, 0x0)
+            rects = numpy.asarray([(5, 5, 10, 10), (20, 15, 8, 10)], numpy.float32)
+            renderer.fill(rects, 0xFF0000)
+            check_areas(view, 128, 128, [(5, 5, 10, 10), (20, 15, 8, 10)],
+                        0xFF0000, (0x0,))
+            ptr = sdl2ext.renderer._packed_array(rects, sdl2ext.renderer._Rect, 4)
+            rects[0, 0] = 7.0
+            assert ptr[0].x == 7.0
+
+            # Test drawing from arrays with other dtypes and layouts
+            sdl2ext.fill(surface, 0x0)
+            lines = numpy.asarray([[20, 10], [20, 86]], dtype=numpy.int64)
+            renderer.draw_line(lines, 0x0000FF)
+            check_lines(view, 128, 128, [((20, 10), (20, 86))], 0x0000FF, (0x0,))
+            sdl2ext.fill(surface, 0x0)
+            rects = numpy.asarray([[40], [50], [32], [32]]).T  # non-contiguous
+            renderer.draw_rect(rects, 0x0000FF)
+            check_lines(view, 128, 128, [
+                ((40, 50), (71, 50)),
+                ((40, 50), (40, 81)),
+                ((40, 81), (71, 81)),
+                ((71, 50), (71, 81))], 0x0000FF, (0x0,))
+
+            # Test exceptions on bad array shapes
+            with pytest.raises(ValueError):
+                renderer.fill(numpy.zeros((3, 3), numpy.float32))
+            with pytest.raises(ValueError):
+                renderer.draw_point(numpy.zeros(5, numpy.float32))
+            with pytest.raises(ValueError):
+                renderer.draw_line(numpy.zeros((1, 2), numpy.float32))
+
+        del view
+        renderer.destroy()
+
+    @pytest.mark.skipif(dll.version < 2018, reason="not available")
+    def test_draw_geometry(self, with_sdl):
+        surface = SDL_CreateRGBSurface(0, 32, 32, 32, 0, 0, 0, 0).contents
+        sdl2ext.fill(surface, 0x0)
+        renderer = sdl2ext.Renderer(surface)
+        view = sdl2ext.PixelView(surface)
+
+        # Test drawing an untextured, single-color quad with indices
+        xy = array.array('f', [4, 4, 20, 4, 20, 20, 4, 20])
+        indices = array.array('H', [0, 1, 2, 2, 3, 0])
+        renderer.draw_geometry(None, xy, 0xFFFF0000, indices=indices)
+        check_areas(view, 32, 32, [(4, 4, 16, 16)], 0xFF0000, (0x0,))
+
+        # Test drawing a quad with per-vertex colors and no indices
+        sdl2ext.fill(surface, 0x0)
+        xy = [(0, 0), (32, 0), (32, 32), (32, 32), (0, 32), (0, 0)]
+        colors = [(0, 0, 255, 255)] * 6
+        renderer.draw_geometry(None, xy, colors)
+        check_areas(view, 32, 32, [(0, 0, 32, 32)], 0x0000FF, (0x0,))
+
+        # Test drawing a textured quad using an interleaved SDL_Vertex array
+        sf = SDL_CreateRGBSurface(0, 16, 16, 32, 0, 0, 0, 0)
+        sdl2ext.fill(sf, 0xAABBCC)
+        tx = sdl2ext.Texture(renderer, sf)
+        sdl2ext.fill(surface, 0x0)
+        verts = (SDL_Vertex * 4)(
+            SDL_Vertex((8, 8), (255, 255, 255), (0, 0)),
+            SDL_Vertex((24, 8), (255, 255, 255), (1, 0)),
+            SDL_Vertex((24, 24), (255, 255, 255), (1, 1)),
+            SDL_Vertex((8, 24), (255, 255, 255), (0, 1)),
+        )
+        renderer.draw_geometry(tx, verts, indices=[0, 1, 2, 2, 3, 0])
+        check_areas(rgb_view(view), 32, 32, [(8, 8, 16, 16)], 0xAABBCC, (0x0,))
+
+        if _HASNUMPY:
+            # Test drawing a textured quad from strided, interleaved arrays
+            sdl2ext.fill(surface, 0x0)
+            verts = numpy.asarray([
+                [0, 0, 0, 0], [16, 0, 1, 0], [16, 16, 1, 1], [0, 16, 0, 1]
+            ], dtype=numpy.float32)
+            idx = numpy.asarray([0, 1, 2, 2, 3, 0], dtype=numpy.int64)
+            renderer.draw_geometry(tx, verts[:, 0:2], uv=verts[:, 2:4],
+                                   indices=idx)
+            check_areas(rgb_view(view), 32, 32, [(0, 0, 16, 16)], 0xAABBCC,
+                        (0x0,))
+
+        # Test exceptions on bad input
+        with pytest.raises(ValueError):
+            renderer.draw_geometry(tx, xy)
+        with pytest.raises(ValueError):
+            renderer.draw_geometry(None, array.array('f', [0, 0, 1]))
+        with pytest.raises(sdl2ext.SDLError):
+            renderer.draw_geometry(None, xy, indices=[0, 1, 9])
+        with pytest.raises(ValueError):
+            renderer.draw_geometry(None, array.array('d', [0, 0, 1, 0, 1, 1]))
+        with pytest.raises(ValueError):
+            renderer.draw_geometry(None, xy, indices=array.array('f', [0, 1, 2]))
+
+        # Make sure arrays are used directly instead of through memoryviews,
+        # which Python 2 doesn't support for arrays
+        arr = array.array('f', [0, 0, 1, 0, 1, 1])
+        addr = arr.buffer_info()[0]
+        assert _vertex_attrib(arr, 2, 'f', 'xy') == (addr, 8, 3, arr)
+        idx = array.array('H', [0, 1, 2])
+        addr = idx.buffer_info()[0]
+        assert _index_array(idx) == (addr, 3, 2, idx)
+        del view
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    @pytest.mark.skipif(dll.version < 2018, reason="not available")
+    def test_sprite_batch(self, with_sdl):
+        surface = SDL_CreateRGBSurface(0, 64, 64, 32, 0, 0, 0, 0).contents
+        sdl2ext.fill(surface, 0x0)
+        renderer = sdl2ext.Renderer(surface)
+        view = sdl2ext.PixelView(surface)
+        sf1 = SDL_CreateRGBSurface(0, 8, 8, 32, 0, 0, 0, 0)
+        sdl2ext.fill(sf1, 0xFF0000)
+        sf2 = SDL_CreateRGBSurface(0, 16, 16, 32, 0, 0, 0, 0)
+        sdl2ext.fill(sf2, 0x0000FF)
+        sdl2ext.fill(sf2, 0x00FF00, (0, 0, 8, 8))
+        tx1 = sdl2ext.Texture(renderer, sf1)
+        tx2 = sdl2ext.Texture(renderer, sf2)
+
+        batch = sdl2ext.SpriteBatch(renderer)
+        batch.add(tx1, (0, 0))
+        batch.add(tx2, (8, 8))
+        batch.add(tx1, (40, 40, 16, 16))
+        batch.add(tx2, (40, 0), srcrect=(0, 0, 8, 8))
+        batch.add(tx2, (0, 40), flip=sdl2.SDL_FLIP_HORIZONTAL)
+        assert len(batch) == 5
+        batch.draw()
+        assert len(batch) == 0
+        rgb = rgb_view(view)
+        check_areas(rgb, 64, 64, [(0, 0, 8, 8), (40, 40, 16, 16)],
+                    0xFF0000, (0x0, 0x0000FF, 0x00FF00))
+        assert rgb[8][8] == 0x00FF00
+        assert rgb[20][20] == 0x0000FF
+        assert rgb[4][44] == 0x00FF00
+        assert rgb[44][4] == 0x0000FF
+        assert rgb[44][12] == 0x00FF00
+
+        # Test rotation and batching of TextureSprites
+        sdl2ext.fill(surface, 0x0)
+        factory = sdl2ext.SpriteFactory(sdl2ext.TEXTURE, renderer=renderer)
+        sp = factory.from_color(0xFFFFFF, (32, 8))
+        sp.position = (16, 28)
+        sp.angle = 90
+        batch.add(sp)
+        batch.draw()
+        assert rgb[20][32] == 0xFFFFFF
+        assert rgb[31][20] == 0x0
+        with pytest.raises(TypeError):
+            sdl2ext.SpriteBatch(surface)
+        with pytest.raises(TypeError):
+            batch.add(surface)
+        del view
+        renderer.destroy()
+        SDL_FreeSurface(sf1)
+        SDL_FreeSurface(sf2)
+
+    @pytest.mark.skipif(dll.version < 2018, reason="not available")
+    @pytest.mark.skipif(not _HASNUMPY, reason="Numpy is not available")
+    def test_quad_renderer(self, with_sdl):
+        surface = SDL_CreateRGBSurface(0, 64, 64, 32, 0, 0, 0, 0).contents
+        sdl2ext.fill(surface, 0x0)
+        renderer = sdl2ext.Renderer(surface)
+        view = sdl2ext.PixelView(surface)
+        rgb = rgb_view(view)
+        sf = SDL_CreateRGBSurface(0, 16, 8, 32, 0, 0, 0, 0)
+        sdl2ext.fill(sf, 0xFF0000, (0, 0, 8, 8))
+        sdl2ext.fill(sf, 0x00FF00, (8, 0, 8, 8))
+        tx = sdl2ext.Texture(renderer, sf)
+
+        quads = sdl2ext.QuadRenderer(renderer, capacity=2)
+        assert quads.capacity == 2
+        # Test untextured quads with per-quad sizes and colors
+        x = numpy.array([8, 40], numpy.float32)
+        y = numpy.array([8, 8], numpy.float32)
+        colors = numpy.array([[255, 255, 255, 255], [0, 0, 255, 255]])
+        quads.draw(None, x, y, [8, 16], colors=colors)
+        check_areas(rgb, 64, 64, [(4, 4, 8, 8)], 0xFFFFFF, (0x0, 0x0000FF))
+        assert rgb[1][33] == 0x0000FF
+        # Test texture regions selected by type, and growing the buffers
+        sdl2ext.fill(surface, 0x0)
+        regions = [(0, 0, 8, 8), (8, 0, 8, 8)]
+        x = numpy.array([0, 16, 32], numpy.float32)
+        types = numpy.array([0, 1, 0], numpy.uint16)
+        quads.draw(tx, x, 0, 8, regions=regions, types=types, centered=False)
+        assert quads.capacity >= 3
+        check_areas(rgb, 64, 64, [(0, 0, 8, 8), (32, 0, 8, 8)], 0xFF0000,
+                    (0x0, 0x00FF00))
+        assert rgb[4][20] == 0x00FF00
+        # Test a single region for all quads
+        quads.draw(tx, [48], [48], 8, 4, regions=(8, 0, 8, 8))
+        assert rgb[48][48] == 0x00FF00
+        assert rgb[45][48] == 0x0
+
+        with pytest.raises(TypeError):
+            sdl2ext.QuadRenderer(surface)
+        with pytest.raises(ValueError):
+            quads.draw(tx, [0, 1], [0, 1, 2], 8)
+        with pytest.raises(ValueError):
+            quads.draw(tx, [0], [0], 8, types=[0])
+        with pytest.raises(ValueError):
+            quads.draw(None, [0, 1], [0, 1], 8, colors=[[0, 0, 0, 0]] * 3)
+        del view
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+    def test_read_pixels(self, with_sdl):
+        surface = SDL_CreateRGBSurface(0, 16, 16, 32, 0, 0, 0, 0).contents
+        renderer = sdl2ext.Renderer(surface)
+        renderer.clear(0xFF0000)
+        renderer.fill((4, 4, 4, 4), 0x00FF00)
+
+        # Test reading into the renderer's internal buffer
+        px = renderer.read_pixels()
+        if _HASNUMPY:
+            assert px.shape == (16, 16)
+            assert px[0][0] & 0xFFFFFF == 0xFF0000
+            assert px[4][5] & 0xFFFFFF == 0x00FF00
+        else:
+            assert len(px) == 16 * 16 * 4
+        px2 = renderer.read_pixels((4, 4, 2, 2))
+        if _HASNUMPY:
+            assert px2.shape == (2, 2)
+            assert px2[1][1] & 0xFFFFFF == 0x00FF00
+
+        # Test reading into a bytearray in a different format
+        buf = bytearray(4 * 4 * 3)
+        out = renderer.read_pixels((2, 2, 4, 4), fmt="RGB24", out=buf)
+        assert out is buf
+        assert buf[0:3] == bytearray(b"\xFF\x00\x00")
+        assert buf[-3:] == bytearray(b"\x00\xFF\x00")
+
+        # Test reading into existing Numpy arrays
+        if _HASNUMPY:
+            arr = numpy.zeros((16, 16), dtype=numpy.uint32)
+            out = renderer.read_pixels(out=arr)
+            assert out is arr
+            assert arr[5][5] & 0xFFFFFF == 0x00FF00
+            big = numpy.zeros((8, 10, 4), dtype=numpy.uint8)
+            renderer.read_pixels((0, 0, 4, 4), out=big[2:6, 2:6])
+            assert list(big[2][2][:3]) == [0x00, 0x00, 0xFF]  # BGRA in memory
+            assert big[0][0][2] == 0
+            with pytest.raises(ValueError):
+                renderer.read_pixels(out=numpy.zeros((8, 8), numpy.uint32))
+            with pytest.raises(ValueError):
+                renderer.read_pixels(out=numpy.zeros((16, 16), numpy.uint16))
+
+        # Test exceptions on bad output buffers
+        with pytest.raises(ValueError):
+            renderer.read_pixels(out=bytearray(10))
+        with pytest.raises(ValueError):
+            renderer.read_pixels(out=bytes(16 * 16 * 4))
+        with pytest.raises(ValueError):
+            renderer.read_pixels(fmt="NOTAFORMAT")
+        renderer.destroy()
+
+    def test_deferred(self, with_sdl):
+        surface = SDL_CreateRGBSurface(0, 128, 128, 32, 0, 0, 0, 0).contents
+        sdl2ext.fill(surface, 0x0)
+        renderer = sdl2ext.Renderer(surface)
+        renderer.color = 0x00FF00
+        assert not renderer.deferred
+        renderer.deferred = True
+        assert renderer.deferred
+        assert renderer.color == sdl2ext.Color(0, 0xFF, 0, 0)
+
+        # Make sure nothing is drawn until the buffer is flushed
+        renderer.fill([(5, 5, 10, 10), (20, 15, 8, 10)], 0x0000FF)
+        renderer.fill((40, 40, 4, 4), 0x0000FF)
+        view = sdl2ext.PixelView(surface)
+        assert view[5][5] == 0x0
+        assert len(renderer._cmdbuffer.commands) == 1  # merged fills
+        renderer.flush()
+        check_areas(view, 128, 128, [(5, 5, 10, 10), (20, 15, 8, 10),
+                    (40, 40, 4, 4)], 0x0000FF, (0x0,))
+        assert len(renderer._cmdbuffer.commands) == 0
+
+        # Make sure modifying a Color after recording doesn't change commands
+        c = sdl2ext.Color(0xFF, 0, 0)
+        renderer.fill((0, 0, 4, 4), c)
+        c.r, c.g = 0, 0xFF
+        renderer.fill((4, 0, 4, 4), c)
+        assert len(renderer._cmdbuffer.commands) == 2
+        renderer.flush()
+        assert view[0][0] == 0xFF0000
+        assert view[0][4] == 0x00FF00
+        renderer.clear(c)
+        c.g, c.b = 0, 0xFF
+        renderer.fill((8, 0, 4, 4), c)
+        renderer.flush()
+        assert view[0][0] == 0x00FF00
+        assert view[0][8] == 0x0000FF
+        renderer.clear(0x0)
+        renderer.flush()
+
+        # Test that continuous lines are merged and draw order is preserved
+        renderer.clear(0x0)
+        renderer.draw_line((20, 10, 20, 50), 0xFF0000)
+        renderer.draw_line((20, 50, 20, 86), 0xFF0000)
+        renderer.draw_point((1, 1))
+        assert len(renderer._cmdbuffer.commands) == 3
+        assert view[30][20] == 0x0
+        renderer.present()
+        check_lines(view, 128, 128, [((20, 10), (20, 86))], 0xFF0000,
+                    (0x0, 0x00FF00))
+        assert view[1][1] == 0x00FF00
+        assert renderer.color == sdl2ext.Color(0, 0xFF, 0, 0)
+
+        # Test that texture copies are deferred in order with other commands
+        sf = SDL_CreateRGBSurface(0, 16, 16, 32, 0, 0, 0, 0)
+        sdl2ext.fill(sf, 0xAABBCC)
+        tx = sdl2ext.Texture(renderer, sf)
+        renderer.clear(0x0)
+        renderer.fill((0, 0, 32, 32), 0xFF0000)
+        renderer.copy(tx, dstrect=(8, 8))
+        renderer.draw_rect((0, 0, 32, 32), 0x0000FF)
+        assert view[8][8] == 0x0
+        renderer.deferred = False
+        assert not renderer.deferred
+        assert view[4][4] == 0xFF0000
+        assert view[8][8] == 0xAABBCC
+        assert view[0][0] == 0x0000FF
+        assert renderer.color == sdl2ext.Color(0, 0xFF, 0, 0)
+
+        # Test that destroying a texture draws any pending copies of it first
+        renderer.deferred = True
+        renderer.clear(0x0)
+        renderer.copy(tx, dstrect=(8, 8))
+        tx.destroy()
+        assert view[8][8] == 0xAABBCC
+        renderer.flush()
+        assert view[8][8] == 0xAABBCC
+        del view
+        renderer.destroy()
+        SDL_FreeSurface(sf)
+
+
 
 class TestExtTexture(object):
     __tags__ = ["sdl", "sdl2ext"]
@@ -484,6 +998,143 @@ class TestExtTexture(object):
         pass
 
 
+class TestExtStreamingTexture(object):
+    __tags__ = ["sdl", "sdl2ext"]
+
+    def test_init_destroy(self, with_sdl):
+        rendertarget = SDL_CreateRGBSurface(0, 32, 32, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(rendertarget.contents)
+        tx = sdl2ext.StreamingTexture(renderer, (16, 8))
+        assert isinstance(tx, sdl2ext.Texture)
+        assert isinstance(tx.tx.contents, SDL_Texture)
+        assert tx.size == (16, 8)
+        assert tx.format == sdl2.SDL_PIXELFORMAT_ARGB8888
+        tx.destroy()
+        with pytest.raises(RuntimeError):
+            tx.tx
+        tx = sdl2ext.StreamingTexture(renderer, (4, 4), sdl2.SDL_PIXELFORMAT_RGB24)
+        assert tx.format == sdl2.SDL_PIXELFORMAT_RGB24
+        tx.destroy()
+
+        # Test exceptions on bad input
+        with pytest.raises(TypeError):
+            sdl2ext.StreamingTexture(rendertarget, (4, 4))
+        with pytest.raises(TypeError):
+            sdl2ext.StreamingTexture(renderer, 4)
+        with pytest.raises(ValueError):
+            sdl2ext.StreamingTexture(renderer, (0, 4))
+        with pytest.raises(ValueError):
+            sdl2ext.StreamingTexture(renderer, (4, 4), "NOTAFORMAT")
+        with pytest.raises(ValueError):
+            sdl2ext.StreamingTexture(renderer, (4, 4), "INDEX8")
+        renderer.destroy()
+        SDL_FreeSurface(rendertarget)
+
+    def test_update(self, with_sdl):
+        target = SDL_CreateRGBSurface(0, 16, 16, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(target.contents)
+        view = rgb_view(sdl2ext.PixelView(target.contents))
+        tx = sdl2ext.StreamingTexture(renderer, (8, 8), "RGB888")
+
+        # Test updating from bytes-like objects
+        red = array.array("I", [0xFF0000] * 64)
+        tx.update(red)
+        tx.update(bytes(bytearray(b"\xFF\x00\x00\x00" * 4)), (0, 0, 2, 2))
+        renderer.copy(tx, dstrect=(0, 0))
+        assert view[0][0] == 0x0000FF
+        assert view[1][1] == 0x0000FF
+        assert view[2][2] == 0xFF0000
+        assert view[7][7] == 0xFF0000
+        assert view[8][8] == 0x0
+
+        # Test dirty-rect updates from a full-size buffer
+        green = array.array("I", [0x00FF00] * 64)
+        tx.update(green, (4, 4, 4, 4))
+        tx.update(bytearray(b"\x00" * 32), (0, 0, 2, 2), pitch=16)
+        renderer.copy(tx, dstrect=(0, 0))
+        assert view[0][0] == 0x0
+        assert view[0][2] == 0xFF0000
+        assert view[4][4] == 0x00FF00
+        assert view[3][3] == 0xFF0000
+
+        # Test updating from a surface (with and without conversion)
+        sf = SDL_CreateRGBSurface(0, 8, 8, 32, 0xFF0000, 0xFF00, 0xFF, 0)
+        sdl2ext.fill(sf, 0xFF00FF)
+        tx.update(sf, (0, 0, 4, 4))
+        sf2 = sdl2ext.surface._create_surface((8, 8), 0x00FFFF, fmt="RGB24")
+        tx.update(sf2, (4, 0, 4, 4))
+        renderer.copy(tx, dstrect=(0, 0))
+        assert view[0][0] == 0xFF00FF
+        assert view[0][4] == 0x00FFFF
+        assert view[4][4] == 0x00FF00
+        SDL_FreeSurface(sf)
+        SDL_FreeSurface(sf2)
+
+        # Test updating from Numpy arrays, including non-contiguous ones
+        if _HASNUMPY:
+            arr = numpy.full((8, 8), 0x0000FF, dtype=numpy.uint32)
+            tx.update(arr)
+            tx.update(arr[::2, ::2] * 0 + 0xFFFFFF, (0, 0, 4, 4))
+            renderer.copy(tx, dstrect=(0, 0))
+            assert view[0][0] == 0xFFFFFF
+            assert view[4][4] == 0x0000FF
+            with pytest.raises(ValueError):
+                tx.update(numpy.zeros((8, 8), dtype=numpy.uint8))
+
+        # Test exceptions on bad input
+        with pytest.raises(ValueError):
+            tx.update(b"\x00" * 12)
+        with pytest.raises(ValueError):
+            tx.update(red, (4, 4, 8, 8))
+        with pytest.raises(TypeError):
+            tx.update(12)
+        renderer.destroy()
+        SDL_FreeSurface(target)
+
+    def test_lock(self, with_sdl):
+        target = SDL_CreateRGBSurface(0, 16, 16, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(target.contents)
+        view = rgb_view(sdl2ext.PixelView(target.contents))
+        tx = sdl2ext.StreamingTexture(renderer, (8, 8), "RGB888")
+        with tx.lock() as px:
+            if _HASNUMPY:
+                assert px.shape == (8, 8)
+                px[:, :] = 0xFF0000
+                px[0, 1] = 0x00FF00
+            else:
+                pitch = len(px) // 8
+                for y in range(8):
+                    px[y*pitch:y*pitch+32] = b"\x00\x00\xFF\x00" * 8
+                px[4:8] = b"\x00\xFF\x00\x00"
+            with pytest.raises(RuntimeError):
+                tx.update(b"\x00" * 256)
+        with tx.lock((4, 4, 2, 2)) as px:
+            if _HASNUMPY:
+                assert px.shape == (2, 2)
+                px[:] = 0x0000FF
+            else:
+                pitch = len(px) // 2
+                for y in range(2):
+                    px[y*pitch:y*pitch+8] = b"\xFF\x00\x00\x00" * 2
+        renderer.copy(tx, dstrect=(0, 0))
+        assert view[0][0] == 0xFF0000
+        assert view[0][1] == 0x00FF00
+        assert view[4][4] == 0x0000FF
+        assert view[5][5] == 0x0000FF
+        assert view[6][6] == 0xFF0000
+
+        # Test that deferred copies are drawn before the texture is changed
+        renderer.deferred = True
+        renderer.copy(tx, dstrect=(0, 0))
+        tx.update(array.array("I", [0x00FF00] * 64))
+        renderer.copy(tx, dstrect=(8, 8))
+        renderer.present()
+        assert view[0][0] == 0xFF0000
+        assert view[8][8] == 0x00FF00
+        renderer.destroy()
+        SDL_FreeSurface(target)
+
+
 @pytest.mark.skip("not implemented")
 def test_set_texture_scale_quality(with_sdl):
     pass
@@ -4,6 +4,8 @@ import pytest
 from ctypes import ArgumentError
 from sdl2 import ext as sdl2ext
 from sdl2.ext.resources import Resources
+from sdl2.ext.spritesystem import _DepthLayers
+from sdl2.render import SDL_FLIP_HORIZONTAL
 from sdl2.render import (
     SDL_TEXTUREACCESS_STATIC, SDL_TEXTUREACCESS_STREAMING, SDL_TEXTUREACCESS_TARGET
 )
@@ -23,6 +25,7 @@ RESOURCES = Resources(__file__, "resources")
 BLACK = (0, 0, 0, 255)
 RED = (255, 0, 0, 255)
 BLUE = (0, 0, 255, 255)
+GREEN = (0, 255, 0, 255)
 
 sprite_test_sizes = [
     (1, 1), (100, 100), (16, 32), (55, 77), (20, 4)
@@ -343,6 +346,78 @@ class TestSoftwareSpriteRenderSystem(object):
         check_pixels(renderer.surface, 20, 20, sp1, BLUE, [BLACK])
         check_pixels(renderer.surface, 20, 20, sp2, BLUE, [BLACK])
 
+    def test_render_dirty(self, with_sdl):
+        GREEN = (0, 255, 0, 255)
+        sf1 = SDL_CreateRGBSurface(0, 4, 4, 32, 0, 0, 0, 0)
+        sp1 = sdl2ext.SoftwareSprite(sf1.contents, True)
+        sdl2ext.fill(sp1, RED)
+        sf2 = SDL_CreateRGBSurface(0, 4, 4, 32, 0, 0, 0, 0)
+        sp2 = sdl2ext.SoftwareSprite(sf2.contents, True)
+        sdl2ext.fill(sp2, BLUE)
+        bg = SDL_CreateRGBSurface(0, 20, 20, 32, 0, 0, 0, 0)
+        sdl2ext.fill(bg, GREEN)
+
+        window = sdl2ext.Window("Test", size=(20, 20))
+        renderer = sdl2ext.SoftwareSpriteRenderSystem(
+            window, dirty_rects=True, background=bg
+        )
+        assert renderer.dirty_rects
+        surf = renderer.surface
+        sdl2ext.fill(surf, BLACK)
+
+        # Test that the first frame redraws the whole window
+        sp1.position = 0, 0
+        sp2.position = 10, 10
+        renderer.render([sp1, sp2])
+        check_pixels(surf, 20, 20, sp1, RED, [GREEN, BLUE])
+        check_pixels(surf, 20, 20, sp2, BLUE, [GREEN, RED])
+
+        # Test that unchanged areas aren't redrawn on later frames
+        white = SDL_MapRGBA(surf.format, 255, 255, 255, 255)
+        view = sdl2ext.PixelView(surf)
+        view[19][0] = white
+        renderer.render([sp1, sp2])
+        assert view[19][0] == white
+
+        # Test that moved sprites are redrawn and their old areas restored
+        sp1.position = 2, 2
+        renderer.render([sp1, sp2])
+        check_pixels(surf, 19, 19, sp1, RED, [GREEN, BLUE])
+        assert view[19][0] == white
+
+        # Test that overlapping sprites are clipped to the changed areas
+        sp1.position = 8, 8
+        sp1.depth = 1
+        renderer.render(sorted([sp1, sp2], key=lambda s: s.depth))
+        check_pixels(surf, 19, 19, sp1, RED, [GREEN, BLUE])
+        green = SDL_MapRGBA(surf.format, *GREEN)
+        blue = SDL_MapRGBA(surf.format, *BLUE)
+        assert view[13][13] == blue
+        assert view[2][2] == green
+
+        # Test that removed sprites are erased
+        renderer.render([sp2])
+        assert view[8][8] == green
+        assert view[10][10] == blue
+
+        # Test invalidating the window
+        renderer.invalidate((0, 19, 1, 1))
+        renderer.render([sp2])
+        assert view[19][0] == green
+        sdl2ext.fill(surf, BLACK)
+        renderer.invalidate()
+        renderer.render([sp2])
+        check_pixels(surf, 20, 20, sp2, BLUE, [GREEN])
+
+        # Test that invalidated areas aren't kept without dirty rects
+        renderer.dirty_rects = False
+        for i in range(10):
+            renderer.invalidate((0, 0, 1, 1))
+            renderer.render([sp2])
+        assert len(renderer._pending) == 0
+        del view
+        SDL_FreeSurface(bg)
+
 
 class TestTextureSpriteRenderSystem(object):
     __tags__ = ["sdl", "sdl2ext"]
@@ -355,6 +430,76 @@ class TestTextureSpriteRenderSystem(object):
     def test_render(self, with_sdl):
         pass
 
-    @pytest.mark.skip("not implemented")
     def test_process(self, with_sdl):
-        pass
+        target = SDL_CreateRGBSurface(
+            0, 20, 20, 32, 0xFF0000, 0xFF00, 0xFF, 0xFF000000
+        )
+        renderer = sdl2ext.Renderer(target.contents)
+        factory = sdl2ext.SpriteFactory(sdl2ext.TEXTURE, renderer=renderer)
+        sp1 = factory.from_color(RED, (10, 10))
+        sp2 = factory.from_color(BLUE, (10, 10))
+        sp3 = factory.from_color(GREEN, (4, 4))
+        sp1.depth, sp2.depth, sp3.depth = (5, 1, 5)
+        spriterenderer = sdl2ext.TextureSpriteRenderSystem(renderer)
+        surf = target.contents
+        sdl2ext.fill(surf, BLACK)
+
+        # Make sure sprites are drawn in order of depth
+        spriterenderer.process("fakeworld", [sp1, sp2])
+        check_pixels(surf, 20, 20, sp1, RED, [BLACK])
+        sp1.depth = 0
+        spriterenderer.process("fakeworld", [sp1, sp2])
+        check_pixels(surf, 20, 20, sp2, BLUE, [BLACK])
+
+        # Test adding, removing, moving, and flipping sprites
+        sdl2ext.fill(surf, BLACK)
+        sp3.position = (12, 12)
+        sp3.flip = SDL_FLIP_HORIZONTAL
+        spriterenderer.process("fakeworld", [sp3, sp2])
+        check_pixels(surf, 20, 20, sp2, BLUE, [BLACK, GREEN])
+        check_pixels(surf, 20, 20, sp3, GREEN, [BLACK, BLUE])
+        assert len(spriterenderer._layers) == 2
+
+        # Test that custom sort functions are still respected
+        spriterenderer.sortfunc = lambda e: -e.depth
+        spriterenderer.process("fakeworld", [sp1, sp2])
+        check_pixels(surf, 20, 20, sp1, RED, [BLACK, GREEN])
+        renderer.destroy()
+        SDL_FreeSurface(target)
+
+
+class TestDepthLayers(object):
+    __tags__ = ["sdl", "sdl2ext"]
+
+    def test_update(self, with_sdl):
+        target = SDL_CreateRGBSurface(0, 10, 10, 32, 0, 0, 0, 0)
+        renderer = sdl2ext.Renderer(target.contents)
+        factory = sdl2ext.SpriteFactory(sdl2ext.TEXTURE, renderer=renderer)
+        sprites = [factory.from_color(RED, (2, 2)) for i in range(3)]
+        atlas = sdl2ext.TextureAtlas(renderer, size=(16, 16))
+        img = SDL_CreateRGBSurface(0, 2, 2, 32, 0, 0, 0, 0)
+        sprites += [atlas.add(i, img) for i in range(3)]
+        # Interleave the regular and atlas sprites at the same depth
+        sprites = [sprites[i // 2 + (i % 2) * 3] for i in range(6)]
+        layers = _DepthLayers()
+        order = layers.update(sprites)
+        assert sorted(map(id, order)) == sorted(map(id, sprites))
+        # Make sure atlas sprites (which share a texture) are grouped together
+        atlas_pos = [i for i, sp in enumerate(order)
+                     if isinstance(sp, sdl2ext.AtlasSprite)]
+        assert atlas_pos[-1] - atlas_pos[0] == 2
+        # Make sure the order is cached while nothing changes
+        assert layers.update(sprites) is order
+        # Test depth changes and removals
+        sprites[0].depth = -1
+        sprites[5].depth = 10
+        order = layers.update(sprites[:5] + [sprites[5]])
+        assert order[0] is sprites[0] and order[-1] is sprites[5]
+        order = layers.update(sprites[1:])
+        assert len(order) == len(layers) == 5
+        assert sprites[0] not in order
+        assert layers.update([]) == []
+        atlas.destroy()
+        renderer.destroy()
+        SDL_FreeSurface(img)
+        SDL_FreeSurface(target)
@@ -92,9 +92,29 @@ class TestExtWindow(object):
         with pytest.raises(RuntimeError):
             window.restore()
 
-    @pytest.mark.skip("not implemented")
     def test_refresh(self, with_sdl):
-        pass
+        window = sdl2ext.Window("Refresh", size=(20, 20))
+        window.get_surface()
+        window.refresh()
+        window.refresh((0, 0, 5, 5))
+        window.refresh([(0, 0, 5, 5), sdl2.SDL_Rect(10, 10, 20, 20)])
+        window.refresh([])
+        window.close()
+        with pytest.raises(RuntimeError):
+            window.refresh()
+
+    def test_merge_rects(self):
+        merge = sdl2ext.window._merge_rects
+        assert merge([(0, 0, 5, 5), (10, 10, 5, 5)]) == [
+            (0, 0, 5, 5), (10, 10, 5, 5)
+        ]
+        assert merge([(0, 0, 5, 5), (4, 4, 5, 5)]) == [(0, 0, 9, 9)]
+        # Test chains of overlapping rects and touching (non-overlapping) rects
+        merged = merge([(0, 0, 4, 4), (10, 0, 4, 4), (3, 0, 8, 1), (0, 4, 4, 4)])
+        assert sorted(merged) == [(0, 0, 14, 4), (0, 4, 4, 4)]
+        # Test clipping to bounds and removing empty rects
+        assert merge([(-5, -5, 10, 10), (18, 18, 5, 5), (30, 30, 5, 5)],
+                     (20, 20)) == [(0, 0, 5, 5), (18, 18, 2, 2)]
 
     def test_get_surface(self, with_sdl):
         window = sdl2ext.Window("Surface", size=(200, 200))